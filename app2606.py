@@ -10,14 +10,31 @@ from PIL import Image
 import numpy as np
 import time
 import re
-from dataclasses import dataclass
-from typing import List, Dict, Optional
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Iterator, Tuple
 from enum import Enum
 import requests
-from urllib.parse import quote_plus
+from urllib.parse import quote_plus, unquote_plus
 import asyncio
 import aiohttp
 import uuid
+import sqlite3
+import threading
+import mmap
+import queue
+import copy
+import csv
+import io
+import hashlib
+import bisect
+import heapq
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+try:
+    import fcntl  # POSIX only; without it saves are only serialized within one process
+except ImportError:
+    fcntl = None
 import plotly.express as px  # Add this import for charts
 
 # Set page configuration
@@ -124,6 +141,7 @@ class LearningPreference:
     difficulty_preference: str = "Progressive"  # Beginner, Intermediate, Advanced, Progressive
     specific_skills_requested: List[str] = None
     learning_urgency: str = "Medium"  # Low, Medium, High, Critical
+    budget: float = 0  # Total course cost allowed; 0 means no limit
 
 @dataclass
 class LearningGoal:
@@ -143,6 +161,727 @@ class UdemyCourse:
     duration: str
     level: str
 
+# Append-only journal for learning path persistence
+JOURNAL_COMPACT_EVERY = 500  # Journal entries before they are folded into the shards
+JOURNAL_POLL_INTERVAL = 1.0  # Seconds between checks for changes saved by other processes
+
+class LearningPathShards:
+    """
+    Per-employee snapshot files: `<shard_dir>/<employee_id>.json` holds that employee's
+    record and learning path progress, so a save only rewrites the employees that changed.
+    """
+
+    COMPLETE_MARKER = ".complete"  # Written once the initial full set of shards is on disk
+
+    def __init__(self, shard_dir: str):
+        self.shard_dir = shard_dir
+
+    def exists(self) -> bool:
+        return os.path.exists(os.path.join(self.shard_dir, self.COMPLETE_MARKER))
+
+    def mark_complete(self):
+        os.makedirs(self.shard_dir, exist_ok=True)
+        open(os.path.join(self.shard_dir, self.COMPLETE_MARKER), 'a').close()
+
+    def _path(self, employee_id: str) -> str:
+        return os.path.join(self.shard_dir, f"{quote_plus(employee_id)}.json")
+
+    def employee_ids(self) -> List[str]:
+        if not os.path.isdir(self.shard_dir):
+            return []
+        return [unquote_plus(name[:-len(".json")]) for name in os.listdir(self.shard_dir)
+                if name.endswith(".json")]
+
+    def read(self, employee_id: str) -> Optional[Dict]:
+        try:
+            with open(self._path(employee_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def write(self, employee_id: str, employee: Optional[Dict], progress: Optional[Dict]):
+        """Write one shard, or remove it when the employee has neither a record nor progress"""
+        path = self._path(employee_id)
+        if employee is None and progress is None:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        os.makedirs(self.shard_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"employee": employee, "progress": progress}, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        # Atomic rename: a crash mid-write leaves the previous shard intact
+        os.replace(tmp_path, path)
+
+    def fold(self, employee_id: str, entries: List[Dict]):
+        """Apply journal entries to an employee's shard"""
+        shard = self.read(employee_id) or {}
+        employee_database = {employee_id: shard["employee"]} if shard.get("employee") else {}
+        progress = {employee_id: shard["progress"]} if shard.get("progress") is not None else {}
+        for entry in entries:
+            LearningPathJournal.apply(entry, employee_database, progress)
+        self.write(employee_id, employee_database.get(employee_id), progress.get(employee_id))
+
+# Structural characters the snapshot indexer has to look at; everything else is skipped by the regex
+SNAPSHOT_TOKEN_PATTERN = re.compile(rb'[\\"{}\[\]:,]')
+
+class SnapshotOffsetIndex:
+    """
+    Read-only view of a legacy single-file snapshot that indexes the byte range of every
+    employee's entry in "employee_database" and "learning_path_progress" in one streaming
+    pass over a memory-mapped file, then hydrates individual entries on demand. The index
+    is cached next to the snapshot (keyed by size and mtime) so later startups skip the scan.
+    Exposes the same read()/employee_ids() interface as LearningPathShards.
+    """
+
+    SECTIONS = ("employee_database", "learning_path_progress")
+
+    def __init__(self, snapshot_path: str):
+        self.snapshot_path = snapshot_path
+        self.index_path = f"{snapshot_path}.idx"
+        self.offsets = self._load_or_build_index()
+
+    def _load_or_build_index(self) -> Dict[str, Dict[str, List[int]]]:
+        stat = os.stat(self.snapshot_path)
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get("size") == stat.st_size and cached.get("mtime_ns") == stat.st_mtime_ns:
+                return cached["offsets"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+        offsets = self.scan(self.snapshot_path)
+        try:
+            with open(self.index_path, 'w', encoding='utf-8') as f:
+                json.dump({"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "offsets": offsets}, f)
+        except OSError:
+            pass  # The index is only a cache
+        return offsets
+
+    @classmethod
+    def scan(cls, snapshot_path: str) -> Dict[str, Dict[str, List[int]]]:
+        """
+        Return {section: {employee_id: [start, end]}} byte ranges of each entry's JSON value.
+        learning_data_export.iter_snapshot_section runs the same state machine; keep the two in step.
+        """
+        offsets = {section: {} for section in cls.SECTIONS}
+        if os.path.getsize(snapshot_path) == 0:
+            return offsets
+        with open(snapshot_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            depth = 0
+            in_string = False
+            skip_until = -1
+            string_start = None
+            last_string = None
+            section = None
+            current_key = None
+            value_start = None
+            for match in SNAPSHOT_TOKEN_PATTERN.finditer(mm):
+                pos = match.start()
+                if pos < skip_until:
+                    continue
+                token = match.group()
+                if in_string:
+                    if token == b'\\':
+                        skip_until = pos + 2  # Skip the escaped character
+                    elif token == b'"':
+                        in_string = False
+                        if depth <= 2:
+                            last_string = (string_start, pos)
+                    continue
+                if token == b'"':
+                    in_string = True
+                    string_start = pos + 1
+                elif token in (b'{', b'['):
+                    depth += 1
+                elif token in (b'}', b']'):
+                    if depth == 2 and current_key is not None:
+                        offsets[section][current_key] = [value_start, pos]
+                        current_key = None
+                    depth -= 1
+                elif token == b':' and last_string is not None:
+                    # Only section names and employee ids are decoded; deeper keys are never used
+                    if depth == 1:
+                        key = json.loads(b'"' + mm[last_string[0]:last_string[1]] + b'"')
+                        section = key if key in offsets else None
+                    elif depth == 2 and section is not None:
+                        current_key = json.loads(b'"' + mm[last_string[0]:last_string[1]] + b'"')
+                        value_start = pos + 1
+                elif token == b',' and depth == 2 and current_key is not None:
+                    offsets[section][current_key] = [value_start, pos]
+                    current_key = None
+        return offsets
+
+    def employee_ids(self) -> List[str]:
+        return list(set(self.offsets["employee_database"]) | set(self.offsets["learning_path_progress"]))
+
+    def _read_value(self, section: str, employee_id: str):
+        span = self.offsets[section].get(employee_id)
+        if span is None:
+            return None
+        with open(self.snapshot_path, 'rb') as f:
+            f.seek(span[0])
+            return json.loads(f.read(span[1] - span[0]))
+
+    def read(self, employee_id: str) -> Optional[Dict]:
+        if employee_id not in self.offsets["employee_database"] and \
+           employee_id not in self.offsets["learning_path_progress"]:
+            return None
+        return {
+            "employee": self._read_value("employee_database", employee_id),
+            "progress": self._read_value("learning_path_progress", employee_id)
+        }
+
+class LazyLearningPathProgress:
+    """
+    Drop-in replacement for the learning_path_progress dict that reads an employee's saved
+    state (plus any journal entries recorded after it) the first time that employee is
+    accessed. `source` is a LearningPathShards or a SnapshotOffsetIndex.
+    """
+
+    def __init__(self, source, journal_tail: List[Dict]):
+        self._source = source
+        self._tail = {}
+        for entry in journal_tail:
+            self._tail.setdefault(entry["employee_id"], []).append(entry)
+        self._loaded = {}
+        self._missing = set()  # Hydrated employees without saved progress
+        self._lock = threading.RLock()
+
+    def hydrate(self, employee_id: str) -> Optional[Dict]:
+        """Load an employee's shard into the mapping and return their saved employee record"""
+        with self._lock:
+            shard = self._source.read(employee_id) or {}
+            employee_database = {employee_id: shard["employee"]} if shard.get("employee") else {}
+            progress = {employee_id: shard["progress"]} if shard.get("progress") is not None else {}
+            for entry in self._tail.pop(employee_id, []):
+                LearningPathJournal.apply(entry, employee_database, progress)
+            if employee_id not in self._loaded and employee_id not in self._missing:
+                if employee_id in progress:
+                    self._loaded[employee_id] = progress[employee_id]
+                else:
+                    self._missing.add(employee_id)
+            return employee_database.get(employee_id)
+
+    def saved_employees(self) -> Iterator[Tuple[str, Dict]]:
+        """
+        (employee_id, saved record) for every saved employee, with journal entries applied.
+        Reads one shard at a time and keeps no progress, so the mapping stays lazy.
+        """
+        with self._lock:
+            employee_ids = set(self._source.employee_ids()) | set(self._tail)
+        for employee_id in employee_ids:
+            with self._lock:
+                shard = self._source.read(employee_id) or {}
+                employee_database = {employee_id: shard["employee"]} if shard.get("employee") else {}
+                for entry in self._tail.get(employee_id, []):
+                    LearningPathJournal.apply(entry, employee_database, {})
+            if employee_id in employee_database:
+                yield employee_id, employee_database[employee_id]
+
+    def restore_saved_employees(self, employee_store) -> int:
+        """
+        Re-create saved employees that are absent from the store and put back the saved learning
+        path of employees whose assigned path differs. Returns how many employees were restored.
+        """
+        restored = 0
+        for employee_id, employee in self.saved_employees():
+            current = employee_store.get(employee_id)
+            if current is None:
+                employee_store.upsert(employee_id, employee)
+            elif "assigned_learning_path" in employee and \
+                    employee["assigned_learning_path"] != current.get("assigned_learning_path"):
+                employee_store.set_learning_path(employee_id, employee["assigned_learning_path"])
+            else:
+                continue
+            restored += 1
+        return restored
+
+    def _ensure(self, employee_id):
+        if employee_id not in self._loaded and employee_id not in self._missing:
+            self.hydrate(employee_id)
+
+    def __contains__(self, employee_id):
+        self._ensure(employee_id)
+        return employee_id in self._loaded
+
+    def __getitem__(self, employee_id):
+        self._ensure(employee_id)
+        return self._loaded[employee_id]
+
+    def get(self, employee_id, default=None):
+        self._ensure(employee_id)
+        return self._loaded.get(employee_id, default)
+
+    def __setitem__(self, employee_id, progress):
+        with self._lock:
+            # Overwritten wholesale, so the saved shard no longer matters
+            self._tail.pop(employee_id, None)
+            self._missing.discard(employee_id)
+            self._loaded[employee_id] = progress
+
+    def setdefault(self, employee_id, default=None):
+        self._ensure(employee_id)
+        with self._lock:
+            self._missing.discard(employee_id)
+            return self._loaded.setdefault(employee_id, default)
+
+    def pop(self, employee_id, default=None):
+        self._ensure(employee_id)
+        with self._lock:
+            self._missing.add(employee_id)
+            return self._loaded.pop(employee_id, default)
+
+    def keys(self):
+        """Employee IDs with saved or in-memory progress (hydrates nothing)"""
+        candidates = set(self._loaded) | set(self._tail) | set(self._source.employee_ids())
+        return [employee_id for employee_id in candidates
+                if employee_id in self._loaded or employee_id not in self._missing]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def items(self):
+        for employee_id in self.keys():
+            if employee_id in self:
+                yield employee_id, self._loaded[employee_id]
+
+    def __len__(self):
+        return sum(1 for _ in self.items())
+
+class InterProcessLock:
+    """
+    Exclusive advisory lock (fcntl.flock on `path`) shared by every worker process on the host.
+    Re-entrant within a thread; threads of the same process are serialized as well.
+    Without fcntl (non-POSIX platforms) it only serializes threads of this process.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            self._file = open(self.path, 'a')
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._depth -= 1
+        if self._depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        self._thread_lock.release()
+
+class LearningPathJournal:
+    """
+    Append-only journal of learning path and progress mutations on top of per-employee shards,
+    safe to share between worker processes. Saving appends the mutations recorded since the
+    last save under an inter-process file lock; once the journal grows past `compact_every`
+    entries, the saving process folds it into the shards of the employees it touched and
+    rotates it. Every process follows the journal (poll_changes) to pick up mutations saved
+    by the others. Loading is lazy: shards are read per employee on first access. A legacy
+    single-file snapshot is read the same way through a byte-offset index and migrated to
+    shards by the first save.
+    """
+
+    def __init__(self, snapshot_path: str, compact_every: int = JOURNAL_COMPACT_EVERY,
+                 poll_interval: float = JOURNAL_POLL_INTERVAL):
+        self.snapshot_path = snapshot_path
+        self.journal_path = f"{snapshot_path}.journal"
+        self.shards = LearningPathShards(f"{os.path.splitext(snapshot_path)[0]}_shards")
+        self.compact_every = compact_every
+        self.poll_interval = poll_interval
+        self.file_lock = InterProcessLock(f"{snapshot_path}.lock")
+        # Tags this process's entries so poll_changes() can skip them
+        self.origin = uuid.uuid4().hex
+        self.pending = []
+        self.in_flight = []  # Taken by a save but not yet appended
+        self._lock = threading.Lock()
+        self._follow_position = (None, 0)  # (journal identity, offset) consumed so far
+        self._last_poll = 0.0
+
+    def _read_journal(self, offset: int = 0):
+        """
+        Return (entries, identity, offset after the last complete line) reading from `offset`.
+        `identity` is (inode, generation) of the journal file; it changes on every rotation
+        (the generation guards against the filesystem reusing the inode).
+        """
+        try:
+            f = open(self.journal_path, 'rb')
+        except FileNotFoundError:
+            return [], None, 0
+        entries = []
+        with f:
+            header = f.readline()
+            generation = None
+            if header.endswith(b"\n"):
+                try:
+                    generation = json.loads(header).get("generation")
+                except (ValueError, AttributeError):
+                    pass
+            identity = (os.fstat(f.fileno()).st_ino, generation)
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Entry still being written (or torn by a crash)
+                offset += len(line)
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn write from a crash, followed by later appends
+                if entry.get("op") != "journal_start":
+                    entries.append(entry)
+        return entries, identity, offset
+
+    def record(self, op: str, employee_id: str, **payload):
+        """Queue a mutation; it is written to the journal on the next save"""
+        entry = {"op": op, "employee_id": employee_id, "ts": datetime.now().isoformat(),
+                 "origin": self.origin, **payload}
+        with self._lock:
+            self.pending.append(entry)
+
+    def take_pending(self) -> List[Dict]:
+        """Detach the mutations queued since the last save so they can be appended elsewhere"""
+        with self._lock:
+            entries, self.pending = self.pending, []
+            self.in_flight.extend(entries)
+        return entries
+
+    def unsaved_entries(self) -> List[Dict]:
+        with self._lock:
+            return self.in_flight + self.pending
+
+    def discard_pending(self):
+        with self._lock:
+            self.pending = []
+
+    def append(self, entries: List[Dict]) -> int:
+        """Append entries to the journal file. Returns the number of entries written."""
+        if not entries:
+            return 0
+        try:
+            with self.file_lock, open(self.journal_path, 'ab+') as f:
+                # Terminate a line torn by a crashed writer so it can't swallow our first entry
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+                f.write("".join(json.dumps(entry) + "\n" for entry in entries).encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception:
+            # Keep the entries so the next save can retry them
+            with self._lock:
+                self.pending = entries + self.pending
+                self.in_flight = [entry for entry in self.in_flight if entry not in entries]
+            raise
+        with self._lock:
+            self.in_flight = [entry for entry in self.in_flight if entry not in entries]
+        return len(entries)
+
+    def flush(self) -> int:
+        """Append pending mutations to the journal file. Returns the number of entries written."""
+        return self.append(self.take_pending())
+
+    def capture_state(self, employee_database, learning_path_progress) -> List[tuple]:
+        """
+        Copy every employee's state for the first save, which creates the shards.
+        `learning_path_progress` is the SharedLearningPathProgress.
+        """
+        employee_ids = set(employee_database.keys()) | set(learning_path_progress.keys())
+        # Store records are already copies
+        return [(employee_id,
+                 employee_database.get(employee_id),
+                 learning_path_progress.copy_of(employee_id))
+                for employee_id in employee_ids]
+
+    def save(self, entries: List[Dict], captured: Optional[List[tuple]] = None) -> str:
+        """
+        Append entries and compact when the journal is long enough (or the shards don't exist yet),
+        all under the inter-process lock. Returns a short description of what was written.
+        """
+        with self.file_lock:
+            self.append(entries)
+            if captured is not None or not self.shards.exists() or self._journal_length() >= self.compact_every:
+                return f"{self.compact(captured)} employees written"
+        return f"{len(entries)} changes"
+
+    def _journal_length(self) -> int:
+        try:
+            with open(self.journal_path, 'rb') as f:
+                return f.read().count(b"\n")
+        except FileNotFoundError:
+            return 0
+
+    def compact(self, captured: Optional[List[tuple]] = None) -> int:
+        """
+        Fold the journal (every process's entries) into the shards of the employees it touches,
+        then rotate it. `captured` full state is only written when creating the shards.
+        Returns the number of shards written.
+        """
+        with self.file_lock:
+            entries, _, _ = self._read_journal()
+            written = set()
+            if not self.shards.exists():
+                for employee_id, employee, progress in captured or []:
+                    self.shards.write(employee_id, employee, progress)
+                    written.add(employee_id)
+            by_employee = {}
+            for entry in entries:
+                by_employee.setdefault(entry["employee_id"], []).append(entry)
+            for employee_id, employee_entries in by_employee.items():
+                self.shards.fold(employee_id, employee_entries)
+                written.add(employee_id)
+            self.shards.mark_complete()
+            # Rotate rather than truncate in place, so followers notice the new generation
+            tmp_path = f"{self.journal_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({"op": "journal_start", "generation": uuid.uuid4().hex}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.journal_path)
+        return len(written)
+
+    def poll_changes(self, force: bool = False) -> Optional[List[Dict]]:
+        """
+        Return mutations other processes saved since the last poll, or None when the journal
+        was rotated by a compaction (the caller should reload from the shards). Polls at most
+        once per `poll_interval` unless forced.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_poll < self.poll_interval:
+            return []
+        self._last_poll = now
+        identity, offset = self._follow_position
+        entries, current_identity, new_offset = self._read_journal(offset)
+        if current_identity != identity:
+            return None
+        self._follow_position = (identity, new_offset)
+        return [entry for entry in entries if entry.get("origin") != self.origin]
+
+    def load(self, discard_pending: bool = True) -> Optional[LazyLearningPathProgress]:
+        """
+        Returns a LazyLearningPathProgress over the saved state, or None when nothing has been saved yet.
+        Shards are preferred; a legacy single-file snapshot is read through a byte-offset index.
+        """
+        with self.file_lock:
+            tail, identity, offset = self._read_journal()
+            self._follow_position = (identity, offset)
+            if self.shards.exists() or not os.path.exists(self.snapshot_path):
+                if not self.shards.exists() and identity is None:
+                    return None
+                source = self.shards
+            else:
+                source = SnapshotOffsetIndex(self.snapshot_path)
+        learning_path_progress = LazyLearningPathProgress(source, tail)
+
+        if discard_pending:
+            # Anything queued before the load is superseded by the loaded state
+            self.discard_pending()
+        return learning_path_progress
+
+    @staticmethod
+    def apply(entry: Dict, employee_database: Dict, learning_path_progress: Dict):
+        """Apply a single journal entry to in-memory state"""
+        op = entry["op"]
+        employee_id = entry["employee_id"]
+        if op == "employee":
+            employee_database.setdefault(employee_id, {"employee_id": employee_id}).update(entry["fields"])
+        elif op == "learning_path":
+            employee = employee_database.setdefault(employee_id, {"employee_id": employee_id})
+            employee["assigned_learning_path"] = entry["learning_path"]
+        elif op == "progress":
+            employee_progress = learning_path_progress.setdefault(employee_id, {})
+            if entry["status"] is None:
+                employee_progress.pop(entry["course_id"], None)
+            else:
+                employee_progress[entry["course_id"]] = entry["status"]
+        elif op == "progress_reset":
+            if entry["progress"] is None:
+                learning_path_progress.pop(employee_id, None)
+            else:
+                learning_path_progress[employee_id] = entry["progress"]
+
+
+class BackgroundLearningPathSaver:
+    """
+    Writes learning path saves on a background thread so the Streamlit script run never blocks
+    on serialization or disk I/O. save() takes the pending journal entries (plus a copy of the
+    full state when the shards don't exist yet) synchronously; the writer thread only
+    serializes and writes them (journal appends are fsynced, shards go through temp file +
+    fsync + atomic rename).
+    """
+
+    def __init__(self, journal: LearningPathJournal):
+        self.journal = journal
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._queued = 0
+        self.status = "idle"  # idle, saving, saved or failed
+        self.last_result = None
+        self.last_error = None
+        self.last_saved_at = None
+        self.last_latency_ms = None
+        self._thread = threading.Thread(target=self._run, name="learning-path-saver", daemon=True)
+        self._thread.start()
+
+    def save(self, employee_database, learning_path_progress):
+        """Capture the changes to save and queue them for the writer thread"""
+        captured = None
+        if not self.journal.shards.exists():
+            captured = self.journal.capture_state(employee_database, learning_path_progress)
+        entries = self.journal.take_pending()
+        with self._lock:
+            self._queued += 1
+            self.status = "saving"
+        self._jobs.put((time.perf_counter(), entries, captured))
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until queued saves are written. Returns False on timeout."""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            with self._lock:
+                if self._queued == 0:
+                    return True
+            if deadline is not None and time.perf_counter() >= deadline:
+                return False
+            time.sleep(0.05)
+
+    def _run(self):
+        while True:
+            started, entries, captured = self._jobs.get()
+            error = None
+            try:
+                result = self.journal.save(entries, captured)
+            except Exception as e:
+                error = str(e)
+            latency_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self._queued -= 1
+                self.last_latency_ms = latency_ms
+                if error:
+                    self.status = "failed"
+                    self.last_error = error
+                else:
+                    self.status = "saving" if self._queued else "saved"
+                    self.last_result = result
+                    self.last_saved_at = datetime.now()
+                    self.last_error = None
+
+
+class SharedLearningPathProgress:
+    """
+    Process-wide learning_path_progress mapping: {employee_id: {course_id: status_info}}.
+    Every session holds a reference to the same instance. Each employee's progress has its
+    own lock and a version that changes on every write, so sessions never copy the data
+    and can cheaply tell when another session changed a record.
+    """
+
+    def __init__(self, data=None):
+        # A plain dict or a LazyLearningPathProgress over the saved state
+        self._data = data if data is not None else {}
+        self._guard = threading.Lock()
+        self._locks = {}
+        self._versions = {}
+        self._version_counter = 0
+        self._base_version = 0
+
+    def lock(self, employee_id: str):
+        with self._guard:
+            return self._locks.setdefault(employee_id, threading.RLock())
+
+    def version(self, employee_id: str) -> int:
+        with self._guard:
+            return self._versions.get(employee_id, self._base_version)
+
+    def _bump(self, employee_id: str):
+        with self._guard:
+            self._version_counter += 1
+            self._versions[employee_id] = self._version_counter
+
+    def replace(self, data):
+        """Swap in freshly loaded progress for every session"""
+        with self._guard:
+            self._data = data if data is not None else {}
+            self._version_counter += 1
+            self._base_version = self._version_counter
+            self._versions = {}
+
+    def update_course(self, employee_id: str, course_id: str, status_info: Optional[Dict]):
+        """Update one course's progress (None removes it) under the employee's lock"""
+        with self.lock(employee_id):
+            employee_progress = self._data.setdefault(employee_id, {})
+            if status_info is None:
+                employee_progress.pop(course_id, None)
+            else:
+                employee_progress[course_id] = status_info
+            self._bump(employee_id)
+
+    def apply_entries(self, entries: List[Dict]):
+        """Apply journal entries saved by another worker process"""
+        for entry in entries:
+            employee_id = entry["employee_id"]
+            with self.lock(employee_id):
+                # Employee records live in the employee store (see apply_remote_learning_path_changes)
+                LearningPathJournal.apply(entry, {}, self._data)
+                self._bump(employee_id)
+
+    def copy_of(self, employee_id: str) -> Optional[Dict]:
+        """Deep copy of an employee's progress taken under their lock"""
+        with self.lock(employee_id):
+            return copy.deepcopy(self._data.get(employee_id))
+
+    def __contains__(self, employee_id):
+        return employee_id in self._data
+
+    def __getitem__(self, employee_id):
+        return self._data[employee_id]
+
+    def get(self, employee_id, default=None):
+        return self._data.get(employee_id, default)
+
+    def __setitem__(self, employee_id, progress):
+        with self.lock(employee_id):
+            self._data[employee_id] = progress
+            self._bump(employee_id)
+
+    def setdefault(self, employee_id, default=None):
+        with self.lock(employee_id):
+            if employee_id not in self._data:
+                self._bump(employee_id)
+            return self._data.setdefault(employee_id, default)
+
+    def pop(self, employee_id, default=None):
+        with self.lock(employee_id):
+            self._bump(employee_id)
+            return self._data.pop(employee_id, default)
+
+    def keys(self):
+        return list(self._data.keys())
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def items(self):
+        return self._data.items()
+
+    def __len__(self):
+        return len(self._data)
+
 # Enhanced session state initialization
 def initialize_session_state():
     if 'messages' not in st.session_state:
@@ -184,10 +923,6 @@ def initialize_session_state():
     if 'page' not in st.session_state:
         st.session_state.page = "Employee Portal" # Default page
 
-    if 'learning_path_progress' not in st.session_state:
-        # Stores progress: {employee_id: {course_id: {"status": "Not Started", "start_date": None, "completion_date": None}}}
-        st.session_state.learning_path_progress = {}
-
     if 'saved_learning_paths_file' not in st.session_state:
         st.session_state.saved_learning_paths_file = "learning_paths_data.json"
 
@@ -419,11 +1154,820 @@ def load_employee_database():
     }
 
 
+# --- Employee Store ---
+# Fields that get their own indexed column so portal lookups don't scan every employee
+EMPLOYEE_INDEXED_FIELDS = ("manager_id", "department", "current_role", "experience_level")
+# Fields stored as JSON columns in the SQLite store
+EMPLOYEE_JSON_FIELDS = ("skills", "completed_courses", "career_goals", "skill_proficiency", "assigned_learning_path")
+
+EMPLOYEE_STORE_BACKEND = os.environ.get("EMPLOYEE_STORE_BACKEND", "sqlite")  # sqlite, memory
+EMPLOYEE_STORE_PATH = os.environ.get("EMPLOYEE_STORE_PATH", "employee_store.db")
+
+
+class EmployeeStore:
+    """
+    Base class for employee record storage.
+    Read access mirrors the old employee_database dict (keyed by employee_id) so
+    existing portal code can keep using `in`, `[]`, `.items()` and `.values()`.
+    Records returned by a store are copies - writes must go through update(),
+    set_learning_path() or upsert(). Every write bumps the record's version so
+    concurrent editors can use compare_and_update() instead of last-writer-wins.
+    `shared_across_processes` says whether every worker process sees the same records; a
+    process-local store replays the employee changes other workers journal instead.
+    """
+
+    shared_across_processes = False
+
+    def get(self, employee_id, default=None):
+        raise NotImplementedError
+
+    def get_versioned(self, employee_id):
+        """Return (record, version), or (None, None) when the employee doesn't exist"""
+        raise NotImplementedError
+
+    def version(self, employee_id) -> Optional[int]:
+        return self.get_versioned(employee_id)[1]
+
+    def compare_and_update(self, employee_id, fields, expected_version) -> bool:
+        """Apply `fields` only if the record is still at `expected_version`"""
+        raise NotImplementedError
+
+    def keys(self) -> List[str]:
+        raise NotImplementedError
+
+    def versions(self) -> Dict[str, int]:
+        """{employee_id: version} for every employee (reads no profile data)"""
+        raise NotImplementedError
+
+    def data_version(self):
+        """
+        Cheap fingerprint of the whole store that changes after any write, including writes
+        made by other processes sharing the same database
+        """
+        raise NotImplementedError
+
+    def find(self, **filters) -> Dict[str, Dict]:
+        """Return {employee_id: record} for employees matching all indexed field filters"""
+        raise NotImplementedError
+
+    def employees_with_learning_paths(self) -> Dict[str, Dict]:
+        raise NotImplementedError
+
+    def upsert(self, employee_id, record):
+        raise NotImplementedError
+
+    def upsert_many(self, records: Dict[str, Dict]):
+        """
+        Insert new employees and update existing ones in one batch. Fields missing from a
+        record are left untouched on existing employees.
+        """
+        for employee_id, record in records.items():
+            if not self.update(employee_id, record):
+                self.upsert(employee_id, record)
+
+    def update(self, employee_id, fields) -> bool:
+        raise NotImplementedError
+
+    def set_learning_path(self, employee_id, learning_path) -> bool:
+        return self.update(employee_id, {"assigned_learning_path": learning_path})
+
+    def apply_journal_entries(self, entries: List[Dict]):
+        """Replay "employee" and "learning_path" journal entries, creating employees that don't exist yet"""
+        for entry in entries:
+            employee_id = entry["employee_id"]
+            if entry["op"] == "employee":
+                self.upsert_many({employee_id: dict(entry["fields"], employee_id=employee_id)})
+            elif entry["op"] == "learning_path":
+                if not self.set_learning_path(employee_id, entry["learning_path"]):
+                    self.upsert(employee_id, {"employee_id": employee_id, "assigned_learning_path": entry["learning_path"]})
+
+    def clear(self):
+        raise NotImplementedError
+
+    def replace_all(self, records: Dict[str, Dict]):
+        """Replace the whole store contents (used when loading saved data)"""
+        self.clear()
+        for employee_id, record in records.items():
+            self.upsert(employee_id, record)
+
+    def items(self):
+        return self.find().items()
+
+    def values(self):
+        return self.find().values()
+
+    def summaries(self) -> List[Dict]:
+        """Lightweight rows (no learning paths) for overview tables"""
+        return [
+            {field: record.get(field) for field in ("employee_id", "name") + EMPLOYEE_INDEXED_FIELDS}
+            for record in self.values()
+        ]
+
+    def to_dict(self) -> Dict[str, Dict]:
+        return dict(self.items())
+
+    def __getitem__(self, employee_id):
+        record = self.get(employee_id)
+        if record is None:
+            raise KeyError(employee_id)
+        return record
+
+    def __contains__(self, employee_id):
+        return self.get(employee_id) is not None
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+
+class InMemoryEmployeeStore(EmployeeStore):
+    """Dict-backed store with secondary indexes, for development and tests"""
+
+    def __init__(self, records: Optional[Dict[str, Dict]] = None):
+        self._records = {}
+        self._versions = {}
+        # Versions come from one counter so a deleted and re-created record never reuses one
+        self._version_counter = 0
+        self._indexes = {field: {} for field in EMPLOYEE_INDEXED_FIELDS}
+        self._lock = threading.RLock()
+        for employee_id, record in (records or {}).items():
+            self.upsert(employee_id, record)
+
+    def _unindex(self, employee_id):
+        record = self._records.get(employee_id)
+        if record is None:
+            return
+        for field in EMPLOYEE_INDEXED_FIELDS:
+            bucket = self._indexes[field].get(record.get(field))
+            if bucket:
+                bucket.discard(employee_id)
+
+    def _index(self, employee_id):
+        record = self._records[employee_id]
+        for field in EMPLOYEE_INDEXED_FIELDS:
+            self._indexes[field].setdefault(record.get(field), set()).add(employee_id)
+
+    def _bump_version(self, employee_id):
+        self._version_counter += 1
+        self._versions[employee_id] = self._version_counter
+
+    def get(self, employee_id, default=None):
+        with self._lock:
+            record = self._records.get(employee_id)
+            return json.loads(json.dumps(record)) if record is not None else default
+
+    def get_versioned(self, employee_id):
+        with self._lock:
+            return self.get(employee_id), self._versions.get(employee_id)
+
+    def keys(self):
+        with self._lock:
+            return list(self._records.keys())
+
+    def versions(self):
+        with self._lock:
+            return dict(self._versions)
+
+    def data_version(self):
+        with self._lock:
+            return len(self._records), self._version_counter
+
+    def find(self, **filters):
+        with self._lock:
+            candidate_ids = None
+            for field, value in filters.items():
+                if field not in EMPLOYEE_INDEXED_FIELDS:
+                    raise ValueError(f"Cannot filter employees on non-indexed field '{field}'")
+                matches = self._indexes[field].get(value, set())
+                candidate_ids = matches if candidate_ids is None else candidate_ids & matches
+            if candidate_ids is None:
+                candidate_ids = self._records.keys()
+            return {emp_id: self.get(emp_id) for emp_id in candidate_ids}
+
+    def employees_with_learning_paths(self):
+        with self._lock:
+            return {emp_id: self.get(emp_id) for emp_id, record in self._records.items()
+                    if record.get('assigned_learning_path')}
+
+    def upsert(self, employee_id, record):
+        with self._lock:
+            self._unindex(employee_id)
+            self._records[employee_id] = json.loads(json.dumps(dict(record, employee_id=employee_id)))
+            self._index(employee_id)
+            self._bump_version(employee_id)
+
+    def update(self, employee_id, fields):
+        return self.compare_and_update(employee_id, fields, None)
+
+    def compare_and_update(self, employee_id, fields, expected_version):
+        with self._lock:
+            if employee_id not in self._records:
+                return False
+            if expected_version is not None and self._versions.get(employee_id) != expected_version:
+                return False
+            self._unindex(employee_id)
+            self._records[employee_id].update(json.loads(json.dumps(fields)))
+            self._index(employee_id)
+            self._bump_version(employee_id)
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+            self._versions.clear()
+            self._indexes = {field: {} for field in EMPLOYEE_INDEXED_FIELDS}
+
+
+class SQLiteEmployeeStore(EmployeeStore):
+    """
+    SQLite-backed employee store. Indexed fields and the name get their own columns,
+    list/dict fields are stored as JSON, and anything else goes into an `extra` JSON column.
+    Updates only touch the columns that changed on a single row. The database runs in WAL
+    mode so several worker processes can share the file: readers never block the writer
+    and writers wait (up to `busy_timeout` seconds) instead of failing.
+    """
+
+    shared_across_processes = True
+
+    def __init__(self, path: str = EMPLOYEE_STORE_PATH, busy_timeout: float = 30.0):
+        self.path = path
+        self._lock = threading.RLock()
+        # Streamlit reruns scripts on different threads; access is serialized with self._lock
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=busy_timeout)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS employees (
+                    employee_id TEXT PRIMARY KEY,
+                    name TEXT,
+                    manager_id TEXT,
+                    department TEXT,
+                    current_role TEXT,
+                    experience_level TEXT,
+                    skills TEXT,
+                    completed_courses TEXT,
+                    career_goals TEXT,
+                    skill_proficiency TEXT,
+                    assigned_learning_path TEXT,
+                    extra TEXT,
+                    version INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            existing_columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(employees)")}
+            if "version" not in existing_columns:
+                self._conn.execute("ALTER TABLE employees ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+            for field in EMPLOYEE_INDEXED_FIELDS:
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_employees_{field} ON employees({field})")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_employees_with_path ON employees(employee_id) "
+                "WHERE assigned_learning_path IS NOT NULL"
+            )
+
+    @staticmethod
+    def _row_to_record(row) -> Dict:
+        record = {"employee_id": row["employee_id"], "name": row["name"]}
+        for field in EMPLOYEE_INDEXED_FIELDS:
+            record[field] = row[field]
+        for field in EMPLOYEE_JSON_FIELDS:
+            record[field] = json.loads(row[field]) if row[field] is not None else None
+        for field in ("skills", "completed_courses", "career_goals"):
+            if record[field] is None:
+                record[field] = []
+        if record["skill_proficiency"] is None:
+            record["skill_proficiency"] = {}
+        if row["extra"]:
+            record.update(json.loads(row["extra"]))
+        return record
+
+    @staticmethod
+    def _to_columns(fields: Dict):
+        """Split a (partial) record into column values, collecting unknown fields into `extra`"""
+        columns = {}
+        extra = {}
+        for field, value in fields.items():
+            if field == "employee_id":
+                continue
+            if field == "name" or field in EMPLOYEE_INDEXED_FIELDS:
+                columns[field] = value
+            elif field in EMPLOYEE_JSON_FIELDS:
+                columns[field] = json.dumps(value) if value is not None else None
+            else:
+                extra[field] = value
+        return columns, extra
+
+    def _query(self, where: str = "", params=()) -> Dict[str, Dict]:
+        with self._lock:
+            rows = self._conn.execute(f"SELECT * FROM employees {where} ORDER BY rowid", params).fetchall()
+        return {row["employee_id"]: self._row_to_record(row) for row in rows}
+
+    def get(self, employee_id, default=None):
+        return self.get_versioned(employee_id)[0] or default
+
+    def get_versioned(self, employee_id):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM employees WHERE employee_id = ?", (employee_id,)).fetchone()
+        if row is None:
+            return None, None
+        return self._row_to_record(row), row["version"]
+
+    def __contains__(self, employee_id):
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM employees WHERE employee_id = ?", (employee_id,)).fetchone()
+        return row is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM employees").fetchone()[0]
+
+    def keys(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT employee_id FROM employees ORDER BY rowid")]
+
+    def versions(self):
+        with self._lock:
+            return dict(self._conn.execute("SELECT employee_id, version FROM employees").fetchall())
+
+    def data_version(self):
+        # Every write bumps a row version; row count and max rowid catch inserts and deletes
+        with self._lock:
+            return tuple(self._conn.execute(
+                "SELECT COUNT(*), COALESCE(MAX(rowid), 0), COALESCE(SUM(version), 0) FROM employees"
+            ).fetchone())
+
+    def find(self, **filters):
+        for field in filters:
+            if field not in EMPLOYEE_INDEXED_FIELDS:
+                raise ValueError(f"Cannot filter employees on non-indexed field '{field}'")
+        if not filters:
+            return self._query()
+        where = "WHERE " + " AND ".join(f"{field} = ?" for field in filters)
+        return self._query(where, tuple(filters.values()))
+
+    def employees_with_learning_paths(self):
+        return self._query("WHERE assigned_learning_path IS NOT NULL")
+
+    def summaries(self):
+        columns = ("employee_id", "name") + EMPLOYEE_INDEXED_FIELDS
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {', '.join(columns)} FROM employees ORDER BY rowid").fetchall()
+        return [dict(row) for row in rows]
+
+    def upsert(self, employee_id, record):
+        columns, extra = self._to_columns(record)
+        columns["extra"] = json.dumps(extra) if extra else None
+        names = ["employee_id"] + list(columns.keys())
+        placeholders = ", ".join("?" for _ in names)
+        assignments = ", ".join(f"{name} = excluded.{name}" for name in columns)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO employees ({', '.join(names)}, version) VALUES ({placeholders}, 1) "
+                f"ON CONFLICT(employee_id) DO UPDATE SET {assignments}, version = employees.version + 1",
+                (employee_id, *columns.values())
+            )
+
+    def upsert_many(self, records):
+        # Group rows by the columns they carry so each group is a single executemany
+        groups = {}
+        for employee_id, record in records.items():
+            columns, extra = self._to_columns(record)
+            if extra:
+                columns["extra"] = json.dumps(extra)
+            groups.setdefault(tuple(columns), []).append((employee_id, *columns.values()))
+        with self._lock, self._conn:
+            for column_names, rows in groups.items():
+                names = ("employee_id",) + column_names
+                assignments = "".join(f"{name} = excluded.{name}, " for name in column_names)
+                self._conn.executemany(
+                    f"INSERT INTO employees ({', '.join(names)}, version) VALUES ({', '.join('?' for _ in names)}, 1) "
+                    f"ON CONFLICT(employee_id) DO UPDATE SET {assignments}version = employees.version + 1",
+                    rows
+                )
+
+    def update(self, employee_id, fields):
+        return self.compare_and_update(employee_id, fields, None)
+
+    def compare_and_update(self, employee_id, fields, expected_version):
+        columns, extra = self._to_columns(fields)
+        where = "WHERE employee_id = ?"
+        params = (employee_id,)
+        if expected_version is not None:
+            where += " AND version = ?"
+            params += (expected_version,)
+        with self._lock, self._conn:
+            if extra:
+                row = self._conn.execute(f"SELECT extra FROM employees {where}", params).fetchone()
+                if row is None:
+                    return False
+                merged_extra = json.loads(row["extra"]) if row["extra"] else {}
+                merged_extra.update(extra)
+                columns["extra"] = json.dumps(merged_extra)
+            assignments = "".join(f"{name} = ?, " for name in columns) + "version = version + 1"
+            cursor = self._conn.execute(
+                f"UPDATE employees SET {assignments} {where}",
+                (*columns.values(), *params)
+            )
+            return cursor.rowcount > 0
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM employees")
+
+    def replace_all(self, records):
+        # One transaction instead of a commit per employee
+        with self._lock, self._conn:
+            # Take the write lock up front so other processes can't write between the read and the delete
+            self._conn.execute("BEGIN IMMEDIATE")
+            # Carry versions forward so editors holding an old version see a conflict
+            old_versions = dict(self._conn.execute("SELECT employee_id, version FROM employees").fetchall())
+            self._conn.execute("DELETE FROM employees")
+            for employee_id, record in records.items():
+                columns, extra = self._to_columns(record)
+                columns["extra"] = json.dumps(extra) if extra else None
+                columns["version"] = old_versions.get(employee_id, 0) + 1
+                names = ["employee_id"] + list(columns.keys())
+                self._conn.execute(
+                    f"INSERT INTO employees ({', '.join(names)}) VALUES ({', '.join('?' for _ in names)})",
+                    (employee_id, *columns.values())
+                )
+
+
+def create_employee_store(backend: str = EMPLOYEE_STORE_BACKEND, path: str = EMPLOYEE_STORE_PATH) -> EmployeeStore:
+    """Create the configured employee store, seeding it with the sample employees when empty"""
+    if backend == "memory":
+        store = InMemoryEmployeeStore()
+    elif backend == "sqlite":
+        store = SQLiteEmployeeStore(path)
+    else:
+        raise ValueError(f"Unknown employee store backend: {backend}")
+
+    if len(store) == 0:
+        store.replace_all(load_employee_database())
+    return store
+
+@dataclass
+class SharedLearningData:
+    """Process-wide data shared by every session; sessions only hold references to it"""
+    employee_database: EmployeeStore
+    learning_path_progress: SharedLearningPathProgress
+    progress_journal: LearningPathJournal
+    learning_path_saver: BackgroundLearningPathSaver
+
+@st.cache_resource
+def get_shared_learning_data(saved_learning_paths_file: str = "learning_paths_data.json") -> SharedLearningData:
+    """Create the shared employee store, progress, journal and saver once per process"""
+    journal = LearningPathJournal(saved_learning_paths_file)
+    return SharedLearningData(
+        employee_database=create_employee_store(),
+        # Once anything is saved this is a lazy view over it, so saves never drop unloaded progress
+        learning_path_progress=SharedLearningPathProgress(journal.load()),
+        progress_journal=journal,
+        learning_path_saver=BackgroundLearningPathSaver(journal)
+    )
+
+def initialize_shared_session_state():
+    """Point the session at the process-wide shared data (references, not copies)"""
+    shared = get_shared_learning_data(st.session_state.saved_learning_paths_file)
+    st.session_state.employee_database = shared.employee_database
+    st.session_state.learning_path_progress = shared.learning_path_progress
+    st.session_state.progress_journal = shared.progress_journal
+    st.session_state.learning_path_saver = shared.learning_path_saver
+    apply_remote_learning_path_changes(shared)
+
+def apply_remote_learning_path_changes(shared: SharedLearningData, force: bool = False):
+    """
+    Pick up learning path progress saved by other worker processes since the last check. A
+    process-local employee store also replays their employee and learning path changes; the
+    SQLite store already holds them.
+    """
+    employee_store = shared.employee_database
+    changes = shared.progress_journal.poll_changes(force)
+    if changes is None:
+        # Another process compacted the journal: reload from the shards, keeping unsaved changes
+        learning_path_progress = shared.progress_journal.load(discard_pending=False)
+        shared.learning_path_progress.replace(learning_path_progress)
+        if learning_path_progress is not None and not employee_store.shared_across_processes:
+            # Changes folded into the shards are no longer in the journal; re-read every saved record
+            employee_store.upsert_many(dict(learning_path_progress.saved_employees()))
+        changes = shared.progress_journal.unsaved_entries()
+    if changes:
+        shared.learning_path_progress.apply_entries(changes)
+        if not employee_store.shared_across_processes:
+            employee_store.apply_journal_entries(changes)
+
+
+# --- Skill Taxonomy ---
+# Alternate spellings -> canonical skill name (matched after lower-casing and whitespace folding)
+SKILL_ALIASES = {
+    "py": "Python", "python3": "Python",
+    "js": "JavaScript", "ts": "TypeScript", "reactjs": "React", "react.js": "React", "nextjs": "Next.js",
+    "ml": "Machine Learning", "dl": "Deep Learning", "natural language processing": "NLP", "cv": "Computer Vision",
+    "k8s": "Kubernetes", "cicd": "CI/CD", "ci cd": "CI/CD", "iac": "Infrastructure as Code",
+    "amazon web services": "AWS", "spark": "Apache Spark", "powerbi": "Power BI",
+    "ab testing": "A/B Testing", "data viz": "Data Visualization", "stats": "Statistics", "ux": "UI/UX Design",
+    "git version control": "Git"
+}
+# Free-text mentions shorter than this are ignored ("r" is usually a typo or a list marker, not the R language)
+SKILL_MENTION_MIN_LENGTH = 2
+SKILL_MENTION_SHORT_NAMES = frozenset()  # skill_key()s still matched below the minimum length, e.g. {"c"}
+SKILL_VERSION_SUFFIX = re.compile(r"^(?P<name>.*?\S)\s+v?\d+(?:\.[\dx]+)*$")  # "Python 3", "Angular v17"
+SKILL_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9.+#/-]*[a-z0-9+#]|[a-z0-9]")
+
+def _canonical_spelling(name: str) -> str:
+    text = " ".join(str(name).split())
+    match = SKILL_VERSION_SUFFIX.match(text)
+    if match:
+        text = match.group("name")
+    return SKILL_ALIASES.get(text.lower(), text)
+
+def skill_key(name: str) -> str:
+    """Case-, whitespace-, version- and alias-insensitive key for a skill name"""
+    return _canonical_spelling(name).lower()
+
+class SkillTaxonomy:
+    """
+    Skills interned to integer ids on skill_key(), so "Python 3", "python" and "Py" share one
+    id and comparisons and set operations run on ints. Append-only and shared by all sessions,
+    so ids stay stable across catalog reloads.
+
+    Role-requirement and catalog skills are registered as known skills; they make up the skill
+    pickers and are what mentioned_in() finds in free text. Other names are interned on first
+    comparison but never listed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = {}  # skill key -> id
+        self._spelling_ids = {}  # exact spelling -> id, skips skill_key() for repeated spellings
+        self.names = []  # id -> canonical display name
+        self._known_ids = set()
+        self._sorted_names = ()
+        self._max_words = 1  # Longest known skill name, in tokens
+
+    def resolve(self, name: str) -> Optional[int]:
+        """Id of an already interned skill, or None"""
+        skill_id = self._spelling_ids.get(name)
+        if skill_id is not None:
+            return skill_id
+        return self._ids.get(skill_key(name))
+
+    def intern(self, name: str) -> int:
+        skill_id = self._spelling_ids.get(name)
+        if skill_id is not None:
+            return skill_id
+        key = skill_key(name)
+        skill_id = self._ids.get(key)
+        if skill_id is None:
+            with self._lock:
+                skill_id = self._ids.get(key)
+                if skill_id is None:
+                    skill_id = len(self.names)
+                    self.names.append(_canonical_spelling(name))
+                    self._ids[key] = skill_id
+        self._spelling_ids[name] = skill_id
+        return skill_id
+
+    def ids(self, names) -> set:
+        return {self.intern(name) for name in names}
+
+    def register(self, names):
+        """Interns skills and lists them as known (role requirements, course catalog)"""
+        new_ids = self.ids(names) - self._known_ids
+        if new_ids:
+            with self._lock:
+                self._known_ids |= new_ids
+                self._sorted_names = tuple(sorted(self.names[skill_id] for skill_id in self._known_ids))
+                self._max_words = max(self._max_words, *(
+                    len(SKILL_TOKEN_PATTERN.findall(self.names[skill_id].lower())) for skill_id in new_ids
+                ))
+
+    def canonical(self, name: str) -> str:
+        """Canonical spelling of a skill ("python 3" -> "Python")"""
+        return self.names[self.intern(name)]
+
+    @property
+    def sorted_names(self) -> tuple:
+        """Known skills in display order, for skill pickers"""
+        return self._sorted_names
+
+    def mentioned_in(self, text: str) -> List[str]:
+        """
+        Known skills mentioned in free text, in order of first mention (longest match wins:
+        "Cloud Security" over "Security"). Phrases shorter than SKILL_MENTION_MIN_LENGTH only
+        match when listed in SKILL_MENTION_SHORT_NAMES.
+        """
+        tokens = SKILL_TOKEN_PATTERN.findall(str(text).lower())
+        found = {}
+        start = 0
+        while start < len(tokens):
+            length = min(self._max_words, len(tokens) - start)
+            while length > 0:
+                key = skill_key(" ".join(tokens[start:start + length]))
+                skill_id = self._ids.get(key)
+                if skill_id in self._known_ids and (len(key) >= SKILL_MENTION_MIN_LENGTH or key in SKILL_MENTION_SHORT_NAMES):
+                    found.setdefault(skill_id, None)
+                    break
+                length -= 1
+            start += max(length, 1)
+        return [self.names[skill_id] for skill_id in found]
+
+@st.cache_resource
+def get_skill_taxonomy() -> SkillTaxonomy:
+    """Process-wide taxonomy, seeded with the role requirement skills; catalog skills are registered on load"""
+    taxonomy = SkillTaxonomy()
+    for role_data in load_enhanced_role_requirements().values():
+        taxonomy.register(role_data["required_skills"])
+        taxonomy.register(role_data["preferred_skills"])
+    return taxonomy
+
+
+# --- Bulk Employee Import ---
+EMPLOYEE_IMPORT_BATCH_SIZE = 1000  # Rows per store transaction
+EMPLOYEE_IMPORT_MAX_REJECTED_SAMPLES = 500  # Rejected rows kept for the report; the rest are only counted
+EXPERIENCE_LEVELS = ["Entry Level", "Junior", "Mid-level", "Senior", "Expert"]
+PROFICIENCY_LABEL_ALIASES = {
+    "beginner": "Beginner", "basic": "Beginner", "novice": "Beginner",
+    "intermediate": "Intermediate", "mid": "Intermediate",
+    "advanced": "Advanced",
+    "expert": "Expert"
+}
+
+@dataclass
+class EmployeeImportReport:
+    rows_read: int = 0
+    rows_imported: int = 0
+    rejected_count: int = 0
+    rejected_rows: List[Dict] = field(default_factory=list)  # Sample of {"line", "employee_id", "reason"}
+    elapsed_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_read / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+def normalize_proficiency_label(raw_label) -> Optional[str]:
+    """Map HRIS proficiency values ("advanced", "3", "Basic") to our labels; None if unrecognized"""
+    text = str(raw_label).strip()
+    if text.isdigit():
+        label = get_proficiency_label_from_value(int(text))
+    else:
+        label = PROFICIENCY_LABEL_ALIASES.get(text.lower(), text)
+    return label if get_proficiency_value(label) > 0 else None
+
+def _split_import_list(value) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if str(item).strip()]
+    return [item.strip() for item in re.split(r"[;|]", str(value)) if item.strip()]
+
+def normalize_employee_import_row(row: Dict, skill_taxonomy: SkillTaxonomy) -> Dict:
+    """Validate and normalize one HRIS row into an employee record. Raises ValueError with the reason."""
+    employee_id = str(row.get("employee_id") or "").strip()
+    name = str(row.get("name") or "").strip()
+    if not employee_id:
+        raise ValueError("missing employee_id")
+    if not name:
+        raise ValueError("missing name")
+
+    experience_level = str(row.get("experience_level") or "Mid-level").strip()
+    if experience_level not in EXPERIENCE_LEVELS:
+        raise ValueError(f"unknown experience_level '{experience_level}'")
+
+    # skill_proficiency is a dict (JSONL) or "Python:Advanced; SQL:Intermediate" (CSV);
+    # skills listed without a level start at Beginner
+    raw_proficiency = row.get("skill_proficiency") or {}
+    if not isinstance(raw_proficiency, dict):
+        pairs = [re.split(r"[:=]", item, maxsplit=1) for item in _split_import_list(raw_proficiency)]
+        raw_proficiency = {pair[0]: (pair[1] if len(pair) > 1 else "Beginner") for pair in pairs}
+    for skill in _split_import_list(row.get("skills")):
+        raw_proficiency.setdefault(skill, "Beginner")
+
+    skill_proficiency = {}
+    for raw_skill, raw_label in raw_proficiency.items():
+        skill = skill_taxonomy.canonical(raw_skill)
+        label = normalize_proficiency_label(raw_label)
+        if label is None:
+            raise ValueError(f"unknown proficiency '{raw_label}' for skill '{skill}'")
+        skill_proficiency[skill] = label
+
+    return {
+        "employee_id": employee_id,
+        "name": name,
+        "manager_id": str(row.get("manager_id") or "").strip() or None,
+        "department": str(row.get("department") or "").strip(),
+        "current_role": str(row.get("current_role") or "").strip(),
+        "experience_level": experience_level,
+        "skills": list(skill_proficiency.keys()),
+        "skill_proficiency": skill_proficiency,
+        "completed_courses": _split_import_list(row.get("completed_courses")),
+        "career_goals": _split_import_list(row.get("career_goals"))
+    }
+
+def iter_employee_import_rows(source, file_format: str):
+    """Yield (line_number, raw_row) from a CSV or JSONL binary stream without reading it all"""
+    text_stream = io.TextIOWrapper(source, encoding='utf-8-sig', newline='')
+    try:
+        if file_format == "csv":
+            reader = csv.DictReader(text_stream)
+            for row in reader:
+                yield reader.line_num, row
+        elif file_format == "jsonl":
+            for line_number, line in enumerate(text_stream, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, {"_parse_error": str(e)}
+        else:
+            raise ValueError(f"Unsupported import format: {file_format}")
+    finally:
+        text_stream.detach()  # Leave closing the underlying stream to the caller
+
+def import_employees(source, file_format: str, employee_store: EmployeeStore,
+                     batch_size: int = EMPLOYEE_IMPORT_BATCH_SIZE, progress_callback=None) -> EmployeeImportReport:
+    """
+    Stream an HRIS export (CSV or JSONL) into the employee store in batches.
+    Only one batch of normalized rows is held in memory at a time. Existing employees keep
+    fields the export doesn't carry (e.g. assigned learning paths).
+    """
+    report = EmployeeImportReport()
+    taxonomy = get_skill_taxonomy()
+    started = time.perf_counter()
+    batch = {}
+
+    def write_batch():
+        employee_store.upsert_many(batch)
+        batch.clear()
+        report.elapsed_seconds = time.perf_counter() - started
+        if progress_callback:
+            progress_callback(report)
+
+    for line_number, row in iter_employee_import_rows(source, file_format):
+        report.rows_read += 1
+        try:
+            if not isinstance(row, dict) or "_parse_error" in row:
+                raise ValueError(f"unparseable row: {row.get('_parse_error') if isinstance(row, dict) else row}")
+            record = normalize_employee_import_row(row, taxonomy)
+        except ValueError as e:
+            report.rejected_count += 1
+            if len(report.rejected_rows) < EMPLOYEE_IMPORT_MAX_REJECTED_SAMPLES:
+                report.rejected_rows.append({
+                    "line": line_number,
+                    "employee_id": row.get("employee_id") if isinstance(row, dict) else None,
+                    "reason": str(e)
+                })
+            continue
+        # Later rows for the same employee replace earlier ones
+        batch[record["employee_id"]] = record
+        report.rows_imported += 1
+        if len(batch) >= batch_size:
+            write_batch()
+    if batch:
+        write_batch()
+    report.elapsed_seconds = time.perf_counter() - started
+    return report
+
+def display_employee_import():
+    """Admin UI for bulk importing employees from an HRIS export"""
+    with st.expander("📥 Bulk Import Employees (CSV / JSONL HRIS export)"):
+        st.caption("Columns: employee_id, name, manager_id, department, current_role, experience_level, "
+                   "skill_proficiency (e.g. `Python:Advanced; SQL:Intermediate`), and `;`-separated "
+                   "skills, completed_courses, career_goals. Existing employees are updated in place.")
+        uploaded_file = st.file_uploader("HRIS export", type=["csv", "jsonl"], key="employee_import_file")
+        if uploaded_file is not None and st.button("📥 Import Employees", key="run_employee_import"):
+            file_format = "jsonl" if uploaded_file.name.lower().endswith(".jsonl") else "csv"
+            status = st.empty()
+            report = import_employees(
+                uploaded_file, file_format, st.session_state.employee_database,
+                progress_callback=lambda r: status.text(
+                    f"Imported {r.rows_imported:,} of {r.rows_read:,} rows ({r.rows_per_second:,.0f} rows/s)..."
+                )
+            )
+            status.empty()
+            get_skill_gap_rollups().reset()
+
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Rows Read", f"{report.rows_read:,}")
+            col2.metric("Imported", f"{report.rows_imported:,}")
+            col3.metric("Rejected", f"{report.rejected_count:,}")
+            col4.metric("Throughput", f"{report.rows_per_second:,.0f} rows/s")
+            if report.rejected_rows:
+                st.warning(f"{report.rejected_count:,} rows were rejected"
+                           + (f" (showing the first {len(report.rejected_rows)})"
+                              if report.rejected_count > len(report.rejected_rows) else ""))
+                st.dataframe(pd.DataFrame(report.rejected_rows), use_container_width=True)
+            else:
+                st.success(f"✅ Imported {report.rows_imported:,} employees in {report.elapsed_seconds:.1f}s")
+
+
 def initialize_manager_session_state():
     """Initialize manager-specific session state"""
-    if 'employee_database' not in st.session_state:
-        st.session_state.employee_database = load_employee_database()
-    
     if 'current_manager_id' not in st.session_state:
         st.session_state.current_manager_id = "MGR001" # Default manager
     
@@ -443,23 +1987,126 @@ def initialize_manager_session_state():
 
 def get_manager_employees(manager_id):
     """Get all employees under a specific manager"""
-    return {emp_id: emp_data for emp_id, emp_data in st.session_state.employee_database.items() 
-            if emp_data.get('manager_id') == manager_id}
+    return st.session_state.employee_database.find(manager_id=manager_id)
 
-def update_employee_in_database(employee_id, updated_profile):
-    """Update employee profile in database"""
-    if employee_id in st.session_state.employee_database:
-        st.session_state.employee_database[employee_id].update(updated_profile)
-        return True
-    return False
+def merge_profile_edit(base_record, edited_profile, current_record):
+    """
+    Three-way merge of an editor's changes (base_record -> edited_profile) onto the current record.
+    List and dict fields are merged item by item; when both sides changed a scalar field the
+    edit wins and the field is reported as a conflict.
+    Returns (fields to write, conflicting field names).
+    """
+    updates = {}
+    conflicts = []
+    for field, value in edited_profile.items():
+        base_value = base_record.get(field)
+        current_value = current_record.get(field)
+        if value == base_value or value == current_value:
+            continue  # Not changed by this editor, or already identical
+        if current_value == base_value:
+            updates[field] = value
+        elif all(isinstance(v, list) for v in (base_value, value, current_value)):
+            removed = [item for item in base_value if item not in value]
+            added = [item for item in value if item not in base_value and item not in current_value]
+            updates[field] = [item for item in current_value if item not in removed] + added
+        elif all(isinstance(v, dict) for v in (base_value, value, current_value)):
+            merged = dict(current_value)
+            for key in set(base_value) | set(value):
+                if key not in value:
+                    merged.pop(key, None)
+                elif value[key] != base_value.get(key):
+                    merged[key] = value[key]
+            updates[field] = merged
+        else:
+            updates[field] = value
+            conflicts.append(field)
+    return updates, conflicts
+
+def update_employee_with_merge(employee_id, updated_profile, base_record, base_version, max_retries=5):
+    """
+    Compare-and-swap update of a record that was edited starting from `base_record` at `base_version`.
+    If another session wrote the record in the meantime, the edit is merged onto the latest
+    version and retried. Returns (success, conflicting field names).
+    """
+    store = st.session_state.employee_database
+    for _ in range(max_retries):
+        current_record, version = store.get_versioned(employee_id)
+        if current_record is None:
+            return False, []
+        if version == base_version:
+            updates, conflicts = updated_profile, []
+        else:
+            updates, conflicts = merge_profile_edit(base_record, updated_profile, current_record)
+        if not updates:
+            return True, conflicts
+        if store.compare_and_update(employee_id, updates, version):
+            record_learning_path_mutation("employee", employee_id, fields=updates)
+            return True, conflicts
+    return False, []
+
+def track_profile_edit_base(editor_key, employee_id):
+    """
+    Return the (record, version) the editor's current edit session started from. It is recorded
+    on the first render and kept across reruns until the edit is saved or discarded, so changes
+    saved elsewhere in the meantime are merged instead of silently becoming the new base.
+    """
+    bases = st.session_state.setdefault('profile_edit_bases', {})
+    base = bases.get((editor_key, employee_id))
+    if base is None or base[0] is None:
+        base = st.session_state.employee_database.get_versioned(employee_id)
+        bases[(editor_key, employee_id)] = base
+    return base
+
+def discard_profile_edit_base(editor_key, employee_id, widget_keys=()):
+    """End an edit session after a save or reset; the next render starts from the saved profile"""
+    st.session_state.setdefault('profile_edit_bases', {}).pop((editor_key, employee_id), None)
+    for key in widget_keys:
+        st.session_state.pop(key, None)
+
+def show_profile_merge_notice(employee_id):
+    """Show (once) which fields of a saved edit collided with a concurrent change"""
+    conflicts = st.session_state.get('profile_merge_notices', {}).pop(employee_id, None)
+    if conflicts:
+        st.warning(f"⚠️ {', '.join(conflicts)} also changed in another session; your values were kept "
+                   "and all other changes were merged.")
 
 def assign_learning_path_to_employee(employee_id, learning_path):
     """Assign a learning path to an employee"""
-    if employee_id in st.session_state.employee_database:
-        st.session_state.employee_database[employee_id]['assigned_learning_path'] = learning_path
+    if st.session_state.employee_database.set_learning_path(employee_id, learning_path):
+        record_learning_path_mutation("learning_path", employee_id, learning_path=learning_path)
         return True
     return False
 
+def record_learning_path_mutation(op, employee_id, **payload):
+    """Queue a mutation in the progress journal so the next save only writes what changed"""
+    st.session_state.progress_journal.record(op, employee_id, **payload)
+
+def set_employee_progress(employee_id, progress):
+    """Replace all course progress for an employee (None removes it)"""
+    if progress is None:
+        st.session_state.learning_path_progress.pop(employee_id, None)
+    else:
+        st.session_state.learning_path_progress[employee_id] = progress
+    record_learning_path_mutation("progress_reset", employee_id, progress=progress)
+
+def set_course_progress(employee_id, course_id, status_info):
+    """Update the progress of a single course (None removes it)"""
+    st.session_state.learning_path_progress.update_course(employee_id, course_id, status_info)
+    record_learning_path_mutation("progress", employee_id, course_id=course_id, status=status_info)
+
+def initialize_learning_path_progress(employee_id, learning_path, start_date=None):
+    """Reset progress to 'Not Started' for every internal and Udemy course in a learning path"""
+    progress = {}
+    for course in learning_path.get('learning_path', []) + learning_path.get('udemy_courses', []):
+        course_id = course.get('id')
+        if course_id:
+            progress[course_id] = {
+                "status": "Not Started", 
+                "start_date": start_date, 
+                "completion_date": None
+            }
+    set_employee_progress(employee_id, progress)
+
 # 4. Add manager portal page function
 
 def manager_portal_page():
@@ -484,6 +2131,9 @@ def manager_portal_page():
     if not manager_employees:
         st.warning("No employees found under your management.")
         return
+
+    with st.expander("🔥 Team Skill Gaps"):
+        display_skill_gap_heatmap("manager", st.session_state.current_manager_id)
     
     # Employee selection dropdown
     employee_options = {f"{emp_data['name']} ({emp_id})": emp_id 
@@ -518,6 +2168,8 @@ def manager_portal_page():
 def display_and_edit_employee_profile(employee_id, employee_data):
     """Display and allow editing of employee profile with enhanced synchronization"""
     st.markdown(f"### 👤 Profile: {employee_data['name']}")
+    edit_base = track_profile_edit_base(f"profile_{employee_id}", employee_id)
+    show_profile_merge_notice(employee_id)
     
     # Show sync status
     current_employee_id = get_current_employee_id()
@@ -558,15 +2210,9 @@ def display_and_edit_employee_profile(employee_id, employee_data):
     with col2:
         st.markdown("#### Skills & Proficiency")
         
-        # Get all available skills from role requirements
-        all_skills = set()
-        for role_data in role_requirements.values():
-            all_skills.update(role_data["required_skills"].keys())
-            all_skills.update(role_data["preferred_skills"].keys())
-        
         skills = st.multiselect(
             "Current Skills", 
-            options=sorted(list(all_skills)), 
+            options=list(skill_taxonomy.sorted_names), 
             default=list(employee_data["skill_proficiency"].keys()), # Use keys from skill_proficiency
             key=f"skills_{employee_id}"
         )
@@ -630,7 +2276,8 @@ def display_and_edit_employee_profile(employee_id, employee_data):
             }
             
             # Use enhanced sync function
-            if sync_employee_profile_changes(employee_id, updated_profile):
+            if sync_employee_profile_changes(employee_id, updated_profile, edit_base):
+                discard_profile_edit_base(f"profile_{employee_id}", employee_id)
                 st.success(f"✅ Profile updated and synchronized for {name}!")
                 
                 # If this employee's learning path exists, consider regenerating it
@@ -658,7 +2305,8 @@ def display_and_edit_employee_profile(employee_id, employee_data):
                     "department": department
                 }
                 
-                if sync_employee_profile_changes(employee_id, updated_profile):
+                if sync_employee_profile_changes(employee_id, updated_profile, edit_base):
+                    discard_profile_edit_base(f"profile_{employee_id}", employee_id)
                     st.success("🔄 Profile synchronized with Employee Portal!")
                     st.rerun()
             else:
@@ -666,6 +2314,11 @@ def display_and_edit_employee_profile(employee_id, employee_data):
     
     with col_reset:
         if st.button("🔄 Reset Changes", key=f"reset_{employee_id}"):
+            # Drop the edited widget values too, or they would be saved against the fresh base
+            widget_keys = [f"{field}_{employee_id}" for field in ("name", "role", "exp", "dept", "skills", "goals", "courses")]
+            widget_keys += [key for key in st.session_state
+                            if isinstance(key, str) and key.startswith("prof_") and key.endswith(f"_{employee_id}")]
+            discard_profile_edit_base(f"profile_{employee_id}", employee_id, widget_keys)
             st.rerun()
 
 
@@ -698,6 +2351,14 @@ def generate_learning_path_for_employee(employee_id, employee_data):
             ["Progressive", "Beginner", "Intermediate", "Advanced"],
             key=f"difficulty_{employee_id}"
         )
+
+        budget = st.number_input(
+            "Training Budget (0 = no limit)",
+            min_value=0.0,
+            value=0.0,
+            step=100.0,
+            key=f"budget_{employee_id}"
+        )
     
     with col2:
         st.markdown("#### Focus Areas")
@@ -709,14 +2370,9 @@ def generate_learning_path_for_employee(employee_id, employee_data):
         )
         
         # Additional skills to focus on
-        all_skills = set()
-        for role_data in role_requirements.values():
-            all_skills.update(role_data["required_skills"].keys())
-            all_skills.update(role_data["preferred_skills"].keys())
-        
         focus_skills = st.multiselect(
             "Additional Skills to Focus On",
-            options=sorted(list(all_skills)),
+            options=list(skill_taxonomy.sorted_names),
             key=f"focus_{employee_id}"
         )
     
@@ -729,7 +2385,8 @@ def generate_learning_path_for_employee(employee_id, employee_data):
                 preferred_learning_style=learning_style,
                 difficulty_preference=difficulty_preference,
                 specific_skills_requested=focus_skills,
-                learning_urgency=urgency
+                learning_urgency=urgency,
+                budget=budget
             )
             
             # Generate learning path
@@ -743,23 +2400,7 @@ def generate_learning_path_for_employee(employee_id, employee_data):
                 assign_learning_path_to_employee(employee_id, learning_path)
                 
                 # Initialize progress for the new path
-                st.session_state.learning_path_progress[employee_id] = {}
-                for course in learning_path.get('learning_path', []):
-                    course_id = course.get('id')
-                    if course_id:
-                        st.session_state.learning_path_progress[employee_id][course_id] = {
-                            "status": "Not Started", 
-                            "start_date": None, 
-                            "completion_date": None
-                        }
-                for course in learning_path.get('udemy_courses', []):
-                    course_id = course.get('id')
-                    if course_id:
-                        st.session_state.learning_path_progress[employee_id][course_id] = {
-                            "status": "Not Started", 
-                            "start_date": None, 
-                            "completion_date": None
-                        }
+                initialize_learning_path_progress(employee_id, learning_path)
 
                 st.success(f"✅ Learning path generated and assigned to {employee_data['name']}!")
                 
@@ -845,9 +2486,9 @@ def display_assigned_learning_path(employee_id, employee_data):
     
     with col_remove:
         if st.button("🗑️ Remove Learning Path", key=f"remove_{employee_id}"):
-            st.session_state.employee_database[employee_id]['assigned_learning_path'] = None
+            assign_learning_path_to_employee(employee_id, None)
             if employee_id in st.session_state.learning_path_progress:
-                del st.session_state.learning_path_progress[employee_id]
+                set_employee_progress(employee_id, None)
             st.success("Learning path removed successfully!")
             st.rerun()
     
@@ -858,10 +2499,8 @@ def display_assigned_learning_path(employee_id, employee_data):
 # employee sync
 def sync_employee_learning_path(employee_id, learning_path):
     """Synchronize learning path between employee and manager portals"""
-    if employee_id and employee_id in st.session_state.employee_database:
-        # Update the employee database with the new learning path
-        st.session_state.employee_database[employee_id]['assigned_learning_path'] = learning_path
-        
+    # Update the employee database with the new learning path
+    if employee_id and assign_learning_path_to_employee(employee_id, learning_path):
         # Also update the current session learning path
         # Only update if the current employee profile matches the one being synced
         if st.session_state.employee_profile.get('employee_id') == employee_id:
@@ -890,13 +2529,15 @@ def admin_hr_portal_page():
         with col_load:
             if st.button("📂 Load All Paths", help="Load all employee learning paths and progress"):
                 load_all_learning_paths()
+        display_save_status()
+        display_course_catalog_status()
     """Admin/HR Portal page to manage all employees and generate default learning paths."""
     st.title("🏢 Admin/HR Portal - Employee Learning Overview")
     st.markdown("*Manage all employee profiles and assign default learning paths.*")
 
     # Display all employees
     st.markdown("### 👥 All Employees Overview")
-    employees_df = pd.DataFrame(st.session_state.employee_database.values())
+    employees_df = pd.DataFrame(st.session_state.employee_database.summaries())
     
     # Select relevant columns for display
     display_cols = ['employee_id', 'name', 'current_role', 'department', 'manager_id', 'experience_level']
@@ -905,17 +2546,21 @@ def admin_hr_portal_page():
     else:
         st.info("No employee data available.")
 
+    display_employee_import()
+    display_workforce_skill_gaps()
+
     st.markdown("---")
     st.markdown("### 🚀 Generate Default Learning Paths for Selected Employees")
 
     # Individual employee selection for default path generation
-    all_employees = st.session_state.employee_database
-    if not all_employees:
+    # Id/name rows only - the dropdowns don't need full records or their learning paths
+    employee_summaries = st.session_state.employee_database.summaries()
+    if not employee_summaries:
         st.info("No employees to generate paths for.")
         return
 
-    employee_options_for_multiselect = {f"{emp_data['name']} ({emp_id})": emp_id 
-                                       for emp_id, emp_data in all_employees.items()}
+    employee_options_for_multiselect = {f"{summary['name']} ({summary['employee_id']})": summary['employee_id']
+                                       for summary in employee_summaries}
     
     selected_employee_ids_for_default_lp = st.multiselect(
         "Select employees for default learning path generation:",
@@ -932,53 +2577,41 @@ def admin_hr_portal_page():
         if not selected_ids:
             st.warning("Please select at least one employee to generate a default learning path.")
         else:
-            with st.spinner(f"Generating default learning paths for {len(selected_ids)} employees... This may take a moment."):
-                generated_count = 0
-                for emp_id in selected_ids:
-                    emp_data = st.session_state.employee_database[emp_id]
-                    # Create a default learning preference for the general path
-                    default_learning_preferences = LearningPreference(
-                        time_available_weeks=20,  # 12-week default
-                        preferred_learning_style="Mixed",
-                        difficulty_preference="Progressive",
-                        specific_skills_requested=["Data Analysis", "Project Management", "Communication"], # Generic skills
-                        learning_urgency="Medium"
-                    )
-                    
-                    # Generate a learning path based on the employee's current role and the default focus
-                    # Use a copy of employee data to avoid modifying it during generation
-                    employee_data_copy = emp_data.copy()
-                    # For default paths, focus on current role's requirements
-                    #employee_data_copy["career_goals"] = [employee_data_copy["current_role"]] 
-                    
-                    default_path = generate_enhanced_learning_path(
-                        employee_data_copy,
-                        default_learning_preferences,
-                        specific_requirements={"mentioned_skills": default_learning_preferences.specific_skills_requested}
-                    )
-                    
-                    if default_path:
-                        assign_learning_path_to_employee(emp_id, default_path)
-                        # Initialize progress for the new path
-                        st.session_state.learning_path_progress[emp_id] = {}
-                        for course in default_path.get('learning_path', []):
-                            course_id = course.get('id')
-                            if course_id:
-                                st.session_state.learning_path_progress[emp_id][course_id] = {
-                                    "status": "Not Started", 
-                                    "start_date": None, 
-                                    "completion_date": None
-                                }
-                        for course in default_path.get('udemy_courses', []):
-                            course_id = course.get('id')
-                            if course_id:
-                                st.session_state.learning_path_progress[emp_id][course_id] = {
-                                    "status": "Not Started", 
-                                    "start_date": None, 
-                                    "completion_date": None
-                                }
-                        generated_count += 1
-                
+            # Create a default learning preference for the general path
+            default_learning_preferences = LearningPreference(
+                time_available_weeks=20,  # 12-week default
+                preferred_learning_style="Mixed",
+                difficulty_preference="Progressive",
+                specific_skills_requested=["Data Analysis", "Project Management", "Communication"], # Generic skills
+                learning_urgency="Medium"
+            )
+            default_requirements = {"mentioned_skills": default_learning_preferences.specific_skills_requested}
+            # Through the shared path cache; the local planner personalizes role templates.
+            # Use a copy of employee data to avoid modifying it during generation
+            jobs = {
+                emp_id: (st.session_state.employee_database[emp_id].copy(), default_learning_preferences, default_requirements)
+                for emp_id in selected_ids
+            }
+
+            progress_bar = st.progress(0.0, text=f"Generating default learning paths: 0 of {len(jobs)}")
+            generated_count, failures = 0, {}
+            for done, (emp_id, default_path, error) in enumerate(generate_learning_paths_concurrently(jobs), start=1):
+                if default_path:
+                    assign_learning_path_to_employee(emp_id, default_path)
+                    # Initialize progress for the new path
+                    initialize_learning_path_progress(emp_id, default_path)
+                    generated_count += 1
+                elif error:
+                    failures[emp_id] = error
+                progress_bar.progress(done / len(jobs), text=f"Generating default learning paths: {done} of {len(jobs)}")
+            progress_bar.empty()
+
+            if failures:
+                st.success(f"✅ Generated default learning paths for {generated_count} employees.")
+                st.warning(f"{len(failures)} employees failed after {BULK_GENERATION_ATTEMPTS} attempts:")
+                st.dataframe(pd.DataFrame([{"employee_id": emp_id, "error": error} for emp_id, error in failures.items()]),
+                             use_container_width=True)
+            else:
                 st.success(f"✅ Successfully generated default learning paths for {generated_count} employees!")
                 st.rerun()
     
@@ -986,13 +2619,8 @@ def admin_hr_portal_page():
     st.markdown("### 🔍 Manage Individual Employee Learning Paths & Skill Gaps")
 
     # Individual employee selection (similar to manager portal)
-    all_employees_for_individual = st.session_state.employee_database
-    if not all_employees_for_individual:
-        st.info("No employees to manage individually.")
-        return
-
-    employee_options_individual = {f"{emp_data['name']} ({emp_id})": emp_id 
-                                  for emp_id, emp_data in all_employees_for_individual.items()}
+    employee_options_individual = {f"{summary['name']} ({summary['employee_id']})": summary['employee_id']
+                                  for summary in employee_summaries}
     
     selected_employee_display_individual = st.selectbox(
         "Choose an employee to manage their learning path and view skill gaps:",
@@ -1025,16 +2653,7 @@ def display_skill_gap_analysis(employee_id, employee_data):
     """Display skill gap analysis for a selected employee in a table."""
     st.markdown(f"### 📊 Skill Gap Analysis for {employee_data['name']}")
 
-    current_role_reqs = role_requirements.get(employee_data['current_role'], {})
-    career_goal_reqs_list = []
-    for goal in employee_data['career_goals']:
-        career_goal_reqs_list.append(role_requirements.get(goal, {}))
-
-    skill_gaps_data = calculate_skill_gaps(
-        employee_data,
-        current_role_reqs,
-        career_goal_reqs_list
-    )
+    skill_gaps_data = get_employee_skill_gaps(employee_data)
 
     if skill_gaps_data:
         st.markdown("#### Identified Skill Gaps for Career Progression")
@@ -1449,8 +3068,7 @@ def dashboard_page():
     st.title("📈 Learning Path Dashboard")
     st.markdown("*Comprehensive overview of learning paths and employee progress.*")
 
-    employees_with_paths = {emp_id: emp_data for emp_id, emp_data in st.session_state.employee_database.items()
-                            if emp_data.get('assigned_learning_path')}
+    employees_with_paths = st.session_state.employee_database.employees_with_learning_paths()
 
     if not employees_with_paths:
         st.info("No learning paths have been assigned to employees yet. Assign paths from the Manager or Admin portals.")
@@ -1505,7 +3123,7 @@ def dashboard_page():
             elif path_start_date:
                 # For courses without individual start dates, calculate based on path start date
                 # Assume courses start sequentially or use path start date as fallback
-                expected_completion_date = path_start_date + timedelta(weeks=course_duration_weeks)
+                expected_completion_date = path_start_date + timedelta(weeks=course.get('earliest_start_week', 0) + course_duration_weeks)
             
             # A course is overdue if it's not completed and past expected completion date
             if (status_info['status'] != "Completed" and 
@@ -1585,6 +3203,17 @@ def dashboard_page():
         overdue_employees = [summary['name'] for summary in employees_summary.values() if summary['has_overdue']]
         st.warning(f"**{total_overdue_employees} employees have overdue courses:** {', '.join(overdue_employees)}")
     
+    # Skill gap heatmaps from the incrementally maintained rollups
+    st.markdown("### 🔥 Skill Gaps by Team")
+    heatmap_scope = st.radio("Group by", options=list(SKILL_GAP_ROLLUP_SCOPES),
+                             format_func=SKILL_GAP_ROLLUP_SCOPES.get, horizontal=True, key="dashboard_gap_scope")
+    group_names = current_skill_gap_rollups().group_names(heatmap_scope)
+    if group_names:
+        heatmap_group = st.selectbox(SKILL_GAP_ROLLUP_SCOPES[heatmap_scope], options=group_names, key="dashboard_gap_group")
+        display_skill_gap_heatmap(heatmap_scope, heatmap_group)
+    else:
+        st.info("No skill gaps to show.")
+    
     st.markdown("---")
     
     # Employee Selection Section
@@ -1690,7 +3319,7 @@ def dashboard_page():
                         course_start = datetime.fromisoformat(status_info['start_date'])
                         expected_completion_date = course_start + timedelta(weeks=course_duration_weeks)
                     elif path_start_date:
-                        expected_completion_date = path_start_date + timedelta(weeks=course_duration_weeks)
+                        expected_completion_date = path_start_date + timedelta(weeks=course.get('earliest_start_week', 0) + course_duration_weeks)
                     
                     if (status_info['status'] != "Completed" and 
                         expected_completion_date and 
@@ -1714,7 +3343,7 @@ def dashboard_page():
                     for overdue_course in overdue_courses:
                         overdue_course_id = overdue_course.get('id')
                         if overdue_course_id and overdue_course_id in st.session_state.learning_path_progress[selected_emp_id]:
-                            del st.session_state.learning_path_progress[selected_emp_id][overdue_course_id]
+                            set_course_progress(selected_emp_id, overdue_course_id, None)
                     
                     # Collect skills from overdue courses and remaining path
                     skills_to_cover = set()
@@ -1755,23 +3384,7 @@ def dashboard_page():
                     if new_learning_path:
                         assign_learning_path_to_employee(selected_emp_id, new_learning_path)
                         # Re-initialize progress for the new path
-                        st.session_state.learning_path_progress[selected_emp_id] = {}
-                        for course in new_learning_path.get('learning_path', []):
-                            course_id = course.get('id')
-                            if course_id:
-                                st.session_state.learning_path_progress[selected_emp_id][course_id] = {
-                                    "status": "Not Started", 
-                                    "start_date": datetime.now().isoformat(),
-                                    "completion_date": None
-                                }
-                        for course in new_learning_path.get('udemy_courses', []):
-                            course_id = course.get('id')
-                            if course_id:
-                                st.session_state.learning_path_progress[selected_emp_id][course_id] = {
-                                    "status": "Not Started", 
-                                    "start_date": datetime.now().isoformat(),
-                                    "completion_date": None
-                                }
+                        initialize_learning_path_progress(selected_emp_id, new_learning_path, start_date=datetime.now().isoformat())
                         st.success(f"✅ Shorter learning path generated and assigned to {emp_data['name']}!")
                         st.rerun()
                     else:
@@ -1808,7 +3421,7 @@ def display_courses(courses, progress_data, path_start_date, course_type):
             expected_completion_date = course_start + timedelta(weeks=course_duration_weeks)
         elif path_start_date:
             # For courses without individual start dates, calculate based on path start date
-            expected_completion_date = path_start_date + timedelta(weeks=course_duration_weeks)
+            expected_completion_date = path_start_date + timedelta(weeks=course.get('earliest_start_week', 0) + course_duration_weeks)
 
         is_overdue = False
         if (display_status != "Completed" and 
@@ -1848,8 +3461,9 @@ def display_courses(courses, progress_data, path_start_date, course_type):
 def main_with_navigation():
     """Main function with navigation between Manager, Employee, Admin, and Dashboard portals"""
     
-    # Initialize both session states
+    # Initialize session states and attach the shared data
     initialize_session_state()
+    initialize_shared_session_state()
     initialize_manager_session_state()
     
     # Navigation
@@ -1951,17 +3565,7 @@ def generate_dynamic_learning_report(learning_path, employee_profile, learning_p
     roi_percentage = ((budget - estimated_cost) / estimated_cost * 100) if estimated_cost > 0 else 1200
     
     # Generate skill proficiency data for report
-    # This will now use the calculate_skill_gaps function for more accurate data
-    current_role_reqs = role_requirements.get(employee_profile['current_role'], {})
-    career_goal_reqs_list = []
-    for goal in employee_profile['career_goals']:
-        career_goal_reqs_list.append(role_requirements.get(goal, {}))
-
-    skill_data = calculate_skill_gaps(
-        employee_profile,
-        current_role_reqs,
-        career_goal_reqs_list
-    )
+    skill_data = get_employee_skill_gaps(employee_profile)
     
     # Create the HTML report
     html_content = f"""
@@ -2620,55 +4224,456 @@ def get_proficiency_label_from_value(value: int) -> str:
     }
     return proficiency_map.get(value, "Unknown")
 
-def calculate_skill_gaps(employee_profile: Dict, current_role_reqs: Dict, career_goal_reqs_list: List[Dict]) -> List[Dict]:
+# --- Workforce Skill Gaps ---
+ROLE_TARGET_CACHE_SIZE = 512  # Compiled (current role, career goals) target vectors kept per requirements version
+
+@dataclass
+class RoleTargetVector:
+    """Target proficiency per skill for one (current role, career goals) combination, in requirement order (current role first)"""
+    skill_names: List[str]
+    columns: np.ndarray  # Columns of the RoleRequirementMatrix
+    targets: np.ndarray  # Target proficiency values
+
+class RoleRequirementMatrix:
     """
-    Calculates skill gaps based on current proficiency vs. target role requirements.
-    Returns a list of dictionaries, each representing a skill gap.
+    role_requirements compiled into a roles x skills matrix of target proficiency values
+    (the higher of required and preferred; 0 where a role has no requirement). Columns are
+    taxonomy skills, so aliases in employee profiles ("Python 3") match role skills.
+
+    Target vectors depend only on (current role, career goals) and most employees share a
+    handful of combinations, so they are memoized in an LRU. A matrix belongs to one
+    role-requirements version; a new version gets a new matrix and so an empty cache.
     """
-    skill_gaps_data = []
-    employee_proficiency = employee_profile.get("skill_proficiency", {})
-    
-    # Combine required and preferred skills from current role and all career goals
-    target_skills_with_proficiency = {}
-    
-    # Add skills from current role requirements
-    for skill, proficiency in current_role_reqs.get("required_skills", {}).items():
-        target_skills_with_proficiency[skill] = max(
-            get_proficiency_value(target_skills_with_proficiency.get(skill, "Beginner")),
-            get_proficiency_value(proficiency)
-        )
-    for skill, proficiency in current_role_reqs.get("preferred_skills", {}).items():
-        target_skills_with_proficiency[skill] = max(
-            get_proficiency_value(target_skills_with_proficiency.get(skill, "Beginner")),
-            get_proficiency_value(proficiency)
+
+    def __init__(self, role_requirements: Dict, taxonomy: SkillTaxonomy, cache_size: int = ROLE_TARGET_CACHE_SIZE):
+        self.taxonomy = taxonomy
+        self._target_vectors = OrderedDict()  # (current role, career goals) -> RoleTargetVector
+        self._cache_size = cache_size
+        self._cache_lock = threading.Lock()
+        self.roles = list(role_requirements)
+        self.role_rows = {role: row for row, role in enumerate(self.roles)}
+        self.skill_names = []  # column -> skill name
+        self.skill_columns = {}  # taxonomy skill id -> column
+        self.role_columns = {}  # role -> columns in requirement order (required, then preferred)
+        rows, columns, values = [], [], []
+        for row, role in enumerate(self.roles):
+            role_columns = {}
+            for kind in ("required_skills", "preferred_skills"):
+                taxonomy.register(role_requirements[role].get(kind, {}))
+                for skill, label in role_requirements[role].get(kind, {}).items():
+                    skill_id = taxonomy.intern(skill)
+                    if skill_id not in self.skill_columns:
+                        self.skill_columns[skill_id] = len(self.skill_names)
+                        self.skill_names.append(skill)
+                    column = self.skill_columns[skill_id]
+                    role_columns.setdefault(column, None)
+                    rows.append(row)
+                    columns.append(column)
+                    values.append(get_proficiency_value(label))
+            self.role_columns[role] = list(role_columns)
+        self.targets = np.zeros((len(self.roles), len(self.skill_names)), dtype=np.int8)
+        np.maximum.at(self.targets, (np.array(rows, dtype=np.int64), np.array(columns, dtype=np.int64)),
+                      np.array(values, dtype=np.int8))
+
+    def column_of(self, skill: str) -> Optional[int]:
+        return self.skill_columns.get(self.taxonomy.resolve(skill))
+
+    def target_vector(self, current_role: str, career_goals) -> RoleTargetVector:
+        """Highest target per skill across the current role and every career goal (memoized, LRU)"""
+        key = (current_role, tuple(career_goals))
+        with self._cache_lock:
+            target_vector = self._target_vectors.get(key)
+            if target_vector is not None:
+                self._target_vectors.move_to_end(key)
+                return target_vector
+        target_vector = self._compile_target_vector(*key)
+        with self._cache_lock:
+            self._target_vectors[key] = target_vector
+            while len(self._target_vectors) > self._cache_size:
+                self._target_vectors.popitem(last=False)
+        return target_vector
+
+    def _compile_target_vector(self, current_role: str, career_goals: tuple) -> RoleTargetVector:
+        roles = [role for role in (current_role, *career_goals) if role in self.role_rows]
+        columns = np.fromiter(
+            dict.fromkeys(column for role in roles for column in self.role_columns[role]), dtype=np.int64
         )
+        if roles and len(columns):
+            rows = [self.role_rows[role] for role in roles]
+            targets = self.targets[np.ix_(rows, columns)].max(axis=0)
+        else:
+            targets = np.zeros(len(columns), dtype=np.int8)
+        return RoleTargetVector([self.skill_names[column] for column in columns], columns, targets)
+
+def compute_role_requirements_version(requirements: Dict) -> str:
+    """Content hash of the role requirements; caches derived from them key on it"""
+    return hashlib.sha256(json.dumps(requirements, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+@st.cache_resource(max_entries=2)
+def get_role_requirement_matrix(requirements_version: str, _role_requirements: Dict) -> RoleRequirementMatrix:
+    """Compiled role requirements for a requirements version, shared by all sessions"""
+    return RoleRequirementMatrix(_role_requirements, get_skill_taxonomy())
+
+def skill_gaps_from_targets(target_vector: RoleTargetVector, current_values) -> List[Dict]:
+    """Gap rows ({"Skill", "Current Proficiency", "Target Proficiency", "Gap"}); `current_values` maps matrix column -> proficiency value"""
+    gaps = []
+    for skill, column, target_value in zip(target_vector.skill_names, target_vector.columns.tolist(), target_vector.targets.tolist()):
+        current_value = current_values[column]
+        if current_value < target_value:
+            current_label = get_proficiency_label_from_value(current_value)
+            target_label = get_proficiency_label_from_value(target_value)
+            gaps.append({
+                "Skill": skill,
+                "Current Proficiency": current_label,
+                "Target Proficiency": target_label,
+                "Gap": f"{current_label} to {target_label}"
+            })
+    return gaps
 
-    # Add skills from career goal requirements
-    for goal_reqs in career_goal_reqs_list:
-        for skill, proficiency in goal_reqs.get("required_skills", {}).items():
-            target_skills_with_proficiency[skill] = max(
-                get_proficiency_value(target_skills_with_proficiency.get(skill, "Beginner")),
-                get_proficiency_value(proficiency)
-            )
-        for skill, proficiency in goal_reqs.get("preferred_skills", {}).items():
-            target_skills_with_proficiency[skill] = max(
-                get_proficiency_value(target_skills_with_proficiency.get(skill, "Beginner")),
-                get_proficiency_value(proficiency)
+def calculate_employee_skill_gaps(employee_profile: Dict) -> List[Dict]:
+    """
+    Skill gaps for an employee's own role and career goals, using the memoized target vector
+    for that combination instead of re-merging the requirement dicts.
+    """
+    role_matrix = get_role_requirement_matrix(role_requirements_version, role_requirements)
+    target_vector = role_matrix.target_vector(
+        employee_profile.get("current_role"), tuple(employee_profile.get("career_goals") or ())
+    )
+    current_values = {}
+    for skill, label in (employee_profile.get("skill_proficiency") or {}).items():
+        column = role_matrix.column_of(skill)
+        if column is not None:
+            current_values[column] = get_proficiency_value(label)
+    return skill_gaps_from_targets(target_vector, defaultdict(lambda: 1, current_values))  # Unlisted skills count as Beginner
+
+SKILL_GAP_CACHE_SIZE = 50000  # Employees whose gap lists are kept
+
+def skill_gap_profile_hash(employee_profile: Dict) -> str:
+    """Hash of the profile fields skill gaps depend on"""
+    relevant = {field: employee_profile.get(field) for field in ("current_role", "career_goals", "skill_proficiency")}
+    return hashlib.sha1(json.dumps(relevant, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+class SkillGapCache:
+    """
+    Per-employee skill gap lists, shared by all sessions. An entry is valid while both the
+    profile content hash and the role-requirements version match, so reruns and reports reuse
+    it until the employee's profile or the requirements change; profile writes also drop the
+    entry explicitly. LRU-bounded to SKILL_GAP_CACHE_SIZE employees.
+    """
+
+    def __init__(self, max_entries: int = SKILL_GAP_CACHE_SIZE):
+        self._entries = OrderedDict()  # employee id -> ((profile hash, requirements version), gaps)
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, employee_id: str, employee_profile: Dict, requirements_version: str, compute) -> List[Dict]:
+        key = (skill_gap_profile_hash(employee_profile), requirements_version)
+        with self._lock:
+            entry = self._entries.get(employee_id)
+            if entry is not None and entry[0] == key:
+                self._entries.move_to_end(employee_id)
+                self.hits += 1
+                return [dict(gap) for gap in entry[1]]
+            self.misses += 1
+        gaps = compute(employee_profile)
+        with self._lock:
+            self._entries[employee_id] = (key, gaps)
+            self._entries.move_to_end(employee_id)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return [dict(gap) for gap in gaps]
+
+    def invalidate(self, employee_id: str):
+        with self._lock:
+            self._entries.pop(employee_id, None)
+
+@st.cache_resource
+def get_skill_gap_cache() -> SkillGapCache:
+    return SkillGapCache()
+
+def get_employee_skill_gaps(employee_profile: Dict) -> List[Dict]:
+    """Skill gaps for a profile, served from the shared cache when the profile belongs to an employee"""
+    employee_id = employee_profile.get("employee_id")
+    if not employee_id:
+        return calculate_employee_skill_gaps(employee_profile)
+    return get_skill_gap_cache().get(employee_id, employee_profile, role_requirements_version, calculate_employee_skill_gaps)
+
+@dataclass
+class WorkforceSkillGaps:
+    """
+    Skill gaps for many employees at once. `current` and `target` are employees x skills
+    proficiency matrices over the role matrix columns (Beginner where a profile lists no level;
+    target 0 where no role or goal asks for the skill).
+    """
+    employee_ids: List[str]
+    skill_names: List[str]
+    current: np.ndarray
+    target: np.ndarray
+    target_vectors: List[RoleTargetVector]  # One per distinct (current role, career goals)
+    target_vector_index: np.ndarray  # Employee row -> target_vectors index
+    employee_rows: Dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if not self.employee_rows:
+            self.employee_rows = {employee_id: row for row, employee_id in enumerate(self.employee_ids)}
+
+    @property
+    def gap(self) -> np.ndarray:
+        """Levels missing per employee and skill (0 where there is no gap)"""
+        return np.maximum(self.target.astype(np.int16) - self.current, 0).astype(np.int8)
+
+    def gaps_for(self, employee_id: str) -> List[Dict]:
+        """One employee's gaps in the skill_gaps_from_targets format"""
+        row = self.employee_rows[employee_id]
+        return skill_gaps_from_targets(self.target_vectors[self.target_vector_index[row]], self.current[row].tolist())
+
+    def skill_summary(self) -> List[Dict]:
+        """Per skill: employees with a gap, employees two or more levels short, and the average gap, largest first"""
+        gap = self.gap
+        employees_with_gap = (gap > 0).sum(axis=0)
+        critical = (gap >= 2).sum(axis=0)
+        total_gap = gap.sum(axis=0, dtype=np.int64)
+        summary = [
+            {
+                "Skill": self.skill_names[column],
+                "Employees With Gap": int(employees_with_gap[column]),
+                "Critical Gaps (2+ levels)": int(critical[column]),
+                "Average Gap (levels)": round(float(total_gap[column]) / int(employees_with_gap[column]), 2),
+            }
+            for column in np.flatnonzero(employees_with_gap)
+        ]
+        summary.sort(key=lambda row: (-row["Employees With Gap"], -row["Critical Gaps (2+ levels)"]))
+        return summary
+
+def compute_workforce_skill_gaps(employees, role_matrix: RoleRequirementMatrix) -> WorkforceSkillGaps:
+    """
+    Skill gaps for every (employee_id, record) in `employees` in one pass: profiles are
+    scattered into an employees x skills matrix, each distinct role/goal combination's target
+    vector is compiled once and gathered per employee, and the gaps are a single subtraction.
+    """
+    employee_ids, rows, columns, values = [], [], [], []
+    target_vectors, target_vector_keys, target_vector_index = [], {}, []
+    label_values, skill_columns = {}, {}  # Per-spelling lookups, memoized for the pass
+    for row, (employee_id, record) in enumerate(employees):
+        employee_ids.append(employee_id)
+        key = (record.get("current_role"), tuple(record.get("career_goals") or ()))
+        if key not in target_vector_keys:
+            target_vector_keys[key] = len(target_vectors)
+            target_vectors.append(role_matrix.target_vector(*key))
+        target_vector_index.append(target_vector_keys[key])
+        for skill, label in (record.get("skill_proficiency") or {}).items():
+            if skill not in skill_columns:
+                skill_columns[skill] = role_matrix.column_of(skill)
+            column = skill_columns[skill]
+            if column is not None:
+                if label not in label_values:
+                    label_values[label] = get_proficiency_value(label)
+                rows.append(row)
+                columns.append(column)
+                values.append(label_values[label])
+
+    skill_count = len(role_matrix.skill_names)
+    current = np.ones((len(employee_ids), skill_count), dtype=np.int8)  # Unlisted skills count as Beginner
+    if rows:
+        current[np.array(rows, dtype=np.int64), np.array(columns, dtype=np.int64)] = np.array(values, dtype=np.int8)
+    combination_targets = np.zeros((len(target_vectors), skill_count), dtype=np.int8)
+    for i, target_vector in enumerate(target_vectors):
+        combination_targets[i, target_vector.columns] = target_vector.targets
+    target_vector_index = np.array(target_vector_index, dtype=np.int64)
+    target = combination_targets[target_vector_index] if len(employee_ids) else np.zeros((0, skill_count), dtype=np.int8)
+    return WorkforceSkillGaps(employee_ids, list(role_matrix.skill_names), current, target,
+                              target_vectors, target_vector_index)
+
+def display_workforce_skill_gaps():
+    """Admin UI: organization-wide skill gap summary from one batch computation"""
+    with st.expander("📊 Organization-wide Skill Gaps"):
+        if st.button("Analyze all employees", key="analyze_workforce_gaps"):
+            started = time.perf_counter()
+            workforce_gaps = compute_workforce_skill_gaps(
+                st.session_state.employee_database.items(),
+                get_role_requirement_matrix(role_requirements_version, role_requirements)
             )
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            st.caption(f"Analyzed {len(workforce_gaps.employee_ids):,} employees across "
+                       f"{len(workforce_gaps.skill_names)} skills in {elapsed_ms:.0f} ms")
+            summary = workforce_gaps.skill_summary()
+            if summary:
+                st.dataframe(pd.DataFrame(summary).set_index("Skill"), use_container_width=True)
+            else:
+                st.info("No skill gaps across the organization.")
 
-    for skill, target_proficiency_value in target_skills_with_proficiency.items():
-        current_proficiency_label = employee_proficiency.get(skill, "Beginner")
-        current_proficiency_value = get_proficiency_value(current_proficiency_label)
+SKILL_GAP_ROLLUP_SCOPES = {"department": "Department", "manager": "Manager"}  # Rollup scope -> profile field label
 
-        if current_proficiency_value < target_proficiency_value:
-            skill_gaps_data.append({
-                "Skill": skill,
-                "Current Proficiency": current_proficiency_label,
-                "Target Proficiency": get_proficiency_label_from_value(target_proficiency_value),
-                "Gap": f"{current_proficiency_label} to {get_proficiency_label_from_value(target_proficiency_value)}"
-            })
-    
-    return skill_gaps_data
+def skill_gap_levels(gaps: List[Dict]) -> tuple:
+    """(skill, levels missing) pairs for gap rows in the skill_gaps_from_targets format"""
+    return tuple(
+        (gap["Skill"], get_proficiency_value(gap["Target Proficiency"]) - get_proficiency_value(gap["Current Proficiency"]))
+        for gap in gaps
+    )
+
+class SkillGapRollups:
+    """
+    Employee counts per (skill, gap size) for every department and manager, shared by all
+    sessions. Built once from a batch gap computation; afterwards a profile change only moves
+    that employee's contribution between groups. Each group carries a revision that changes
+    whenever its counts do, so rendered heatmaps can be cached per revision.
+    The rollups remember the store's data version and each employee's record version, so
+    writes made by other worker processes are picked up by re-reading only the changed rows.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requirements_version = None
+        self._data_version = None
+        self._contributions = {}  # employee id -> (department, manager id, ((skill, gap levels), ...))
+        self._versions = {}  # employee id -> store version its contribution was computed from
+        self._counts = {}  # (scope, group name) -> {(skill, gap levels): employees}
+        self._revisions = {}  # (scope, group name) -> revision of its last change
+        self._revision = 0
+
+    def _groups_of(self, department, manager_id):
+        return [("department", department), ("manager", manager_id)]
+
+    def _apply(self, contribution, sign: int):
+        department, manager_id, gap_levels = contribution
+        self._revision += 1
+        for group in self._groups_of(department, manager_id):
+            if group[1] is None:
+                continue
+            counts = self._counts.setdefault(group, {})
+            for key in gap_levels:
+                count = counts.get(key, 0) + sign
+                if count:
+                    counts[key] = count
+                else:
+                    del counts[key]
+            self._revisions[group] = self._revision
+
+    def _contribution(self, employee_id: str, record: Dict):
+        return (record.get("department"), record.get("manager_id"),
+                skill_gap_levels(get_employee_skill_gaps(dict(record, employee_id=employee_id))))
+
+    def _replace(self, employee_id: str, record: Optional[Dict], version: Optional[int]):
+        previous = self._contributions.pop(employee_id, None)
+        self._versions.pop(employee_id, None)
+        if previous is not None:
+            self._apply(previous, -1)
+        if record is not None:
+            contribution = self._contribution(employee_id, record)
+            self._contributions[employee_id] = contribution
+            self._versions[employee_id] = version
+            self._apply(contribution, 1)
+
+    def _rebuild(self, employee_store: EmployeeStore, role_matrix: RoleRequirementMatrix, requirements_version: str):
+        # Read versions before records: a write in between leaves an older version behind,
+        # so the next sync re-reads that employee instead of missing the write
+        self._data_version = employee_store.data_version()
+        self._versions = employee_store.versions()
+        records = list(employee_store.items())
+        workforce_gaps = compute_workforce_skill_gaps(records, role_matrix)
+        gap = workforce_gaps.gap
+        gap_levels = [[] for _ in records]
+        for row, column in zip(*(indices.tolist() for indices in np.nonzero(gap))):
+            gap_levels[row].append((workforce_gaps.skill_names[column], int(gap[row, column])))
+        self._contributions, self._counts = {}, {}
+        for (employee_id, record), levels in zip(records, gap_levels):
+            contribution = (record.get("department"), record.get("manager_id"), tuple(levels))
+            self._contributions[employee_id] = contribution
+            self._apply(contribution, 1)
+        self._requirements_version = requirements_version
+
+    def _sync(self, employee_store: EmployeeStore, data_version):
+        versions = employee_store.versions()
+        for employee_id in set(self._contributions) - set(versions):
+            self._replace(employee_id, None, None)
+        for employee_id, version in versions.items():
+            if self._versions.get(employee_id) != version:
+                record, version = employee_store.get_versioned(employee_id)
+                self._replace(employee_id, record, version)
+        self._data_version = data_version
+
+    def ensure_current(self, employee_store: EmployeeStore, role_matrix: RoleRequirementMatrix, requirements_version: str):
+        """
+        Build the rollups if they were never built, were reset, or the role requirements changed;
+        otherwise re-read the employees whose saved version differs from the one counted
+        """
+        with self._lock:
+            if self._requirements_version != requirements_version:
+                self._rebuild(employee_store, role_matrix, requirements_version)
+                return
+            data_version = employee_store.data_version()
+            if data_version != self._data_version:
+                self._sync(employee_store, data_version)
+
+    def group(self, scope: str, name: str):
+        """(revision, {(skill, gap levels): employees}) for one department or manager"""
+        with self._lock:
+            return self._revisions.get((scope, name), 0), dict(self._counts.get((scope, name), {}))
+
+    def group_names(self, scope: str) -> List[str]:
+        with self._lock:
+            return sorted(name for group_scope, name in self._counts if group_scope == scope)
+
+    def update_employee(self, employee_id: str, record: Optional[Dict], version: Optional[int] = None):
+        """Move one employee's contribution to their saved profile (None removes them)"""
+        with self._lock:
+            if self._requirements_version is None:
+                return  # Not built yet; the first build reads the saved profile
+            self._replace(employee_id, record, version)
+
+    def reset(self):
+        """Rebuild on next use (after bulk changes such as an import or a reload)"""
+        with self._lock:
+            self._requirements_version = None
+            self._data_version = None
+
+@st.cache_resource
+def get_skill_gap_rollups() -> SkillGapRollups:
+    return SkillGapRollups()
+
+def current_skill_gap_rollups() -> SkillGapRollups:
+    """The shared rollups, built for the current employee store and role requirements"""
+    rollups = get_skill_gap_rollups()
+    rollups.ensure_current(st.session_state.employee_database,
+                           get_role_requirement_matrix(role_requirements_version, role_requirements),
+                           role_requirements_version)
+    return rollups
+
+def record_employee_profile_change(employee_id: str):
+    """Drop the employee's cached skill gaps and move their rollup contribution to the saved profile"""
+    get_skill_gap_cache().invalidate(employee_id)
+    get_skill_gap_rollups().update_employee(employee_id, *st.session_state.employee_database.get_versioned(employee_id))
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def build_skill_gap_heatmap(scope: str, name: str, revision: int, _counts: Dict):
+    """Skills x gap size heatmap of employee counts; cached per group revision"""
+    skill_totals = defaultdict(int)
+    for (skill, _), count in _counts.items():
+        skill_totals[skill] += count
+    skills = sorted(skill_totals, key=lambda skill: (-skill_totals[skill], skill))
+    gap_sizes = sorted({levels for _, levels in _counts})
+    matrix = [[_counts.get((skill, levels), 0) for levels in gap_sizes] for skill in skills]
+    fig = px.imshow(
+        matrix,
+        x=[f"{levels} level{'s' if levels > 1 else ''}" for levels in gap_sizes],
+        y=skills,
+        labels=dict(x="Gap size", y="Skill", color="Employees"),
+        color_continuous_scale="Reds",
+        text_auto=True,
+        aspect="auto"
+    )
+    fig.update_layout(title=f"{SKILL_GAP_ROLLUP_SCOPES[scope]} {name}: skill gaps", height=max(300, 28 * len(skills) + 120))
+    return fig
+
+def display_skill_gap_heatmap(scope: str, name: str):
+    """Render the rollup heatmap for one department or manager"""
+    revision, counts = current_skill_gap_rollups().group(scope, name)
+    if not counts:
+        st.info(f"No skill gaps for {SKILL_GAP_ROLLUP_SCOPES[scope].lower()} {name}.")
+        return
+    st.plotly_chart(build_skill_gap_heatmap(scope, name, revision, counts), use_container_width=True)
 
 def generate_dynamic_skill_categories_html(skill_data):
     """Generate dynamic HTML for skill categories based on proficiency levels"""
@@ -2806,7 +4811,7 @@ def generate_udemy_courses_html(courses):
 def generate_competency_table_html(skill_data):
     """Generate competency comparison table HTML"""
     html = ""
-    # Use the skill_data from calculate_skill_gaps
+    # Use the skill_data from get_employee_skill_gaps
     for skill_info in skill_data[:8]:  # Limit to 8 skills
         skill_name = skill_info['Skill']
         current_prof_label = skill_info['Current Proficiency']
@@ -2885,26 +4890,12 @@ def enhanced_learning_path_management():
                 if 'id' not in course:
                     course['id'] = f"udemy_{str(uuid.uuid4())}" # Ensure ID for Udemy courses
                 st.session_state.selected_courses_for_plan[current_employee_id][course['id']] = True
+            # Store records are copies, so persist the generated IDs to keep them stable across reruns
+            assign_learning_path_to_employee(current_employee_id, st.session_state.learning_path)
 
         # Initialize learning path progress for this employee if not present
         if current_employee_id not in st.session_state.learning_path_progress:
-            st.session_state.learning_path_progress[current_employee_id] = {}
-            for course in st.session_state.learning_path.get('learning_path', []):
-                course_id = course.get('id')
-                if course_id:
-                    st.session_state.learning_path_progress[current_employee_id][course_id] = {
-                        "status": "Not Started", 
-                        "start_date": None, 
-                        "completion_date": None
-                    }
-            for course in st.session_state.learning_path.get('udemy_courses', []):
-                course_id = course.get('id')
-                if course_id:
-                    st.session_state.learning_path_progress[current_employee_id][course_id] = {
-                        "status": "Not Started", 
-                        "start_date": None, 
-                        "completion_date": None
-                    }
+            initialize_learning_path_progress(current_employee_id, st.session_state.learning_path)
 
 
         selected_internal_courses = []
@@ -2947,28 +4938,29 @@ def enhanced_learning_path_management():
             
             # Update completion status
             if new_is_completed and not is_completed: # Just marked complete
-                st.session_state.learning_path_progress[current_employee_id][course_id] = {
+                set_course_progress(current_employee_id, course_id, {
                     "status": "Completed",
                     "start_date": current_status_info.get("start_date") or datetime.now().isoformat(),
                     "completion_date": datetime.now().isoformat()
-                }
+                })
                 st.success(f"Marked '{course.get('title')}' as Completed!")
             elif not new_is_completed and is_completed: # Just unchecked complete
-                st.session_state.learning_path_progress[current_employee_id][course_id] = {
+                set_course_progress(current_employee_id, course_id, {
                     "status": "Not Started", # Reset to Not Started
                     "start_date": None,
                     "completion_date": None
-                }
+                })
                 st.info(f"Marked '{course.get('title')}' as Not Started.")
             elif new_is_completed and is_completed: # Still completed, ensure start date is there
                 if not current_status_info.get("start_date"):
-                     st.session_state.learning_path_progress[current_employee_id][course_id]["start_date"] = datetime.now().isoformat()
+                    set_course_progress(current_employee_id, course_id, dict(current_status_info, start_date=datetime.now().isoformat()))
             elif not new_is_completed and not is_completed: # Still not completed, ensure start date is set if user interacted
                 if st.session_state.learning_path_progress[current_employee_id].get(course_id, {}).get("status") == "Not Started" and \
                    st.session_state.learning_path_progress[current_employee_id].get(course_id, {}).get("start_date") is None:
                     # If user didn't mark as completed but interacted, assume they started
-                    st.session_state.learning_path_progress[current_employee_id][course_id]["status"] = "In Progress"
-                    st.session_state.learning_path_progress[current_employee_id][course_id]["start_date"] = datetime.now().isoformat()
+                    set_course_progress(current_employee_id, course_id, dict(
+                        current_status_info, status="In Progress", start_date=datetime.now().isoformat()
+                    ))
 
 
             if is_selected:
@@ -3040,28 +5032,29 @@ def enhanced_learning_path_management():
 
                 # Update completion status
                 if new_is_completed and not is_completed: # Just marked complete
-                    st.session_state.learning_path_progress[current_employee_id][course_id] = {
+                    set_course_progress(current_employee_id, course_id, {
                         "status": "Completed",
                         "start_date": current_status_info.get("start_date") or datetime.now().isoformat(),
                         "completion_date": datetime.now().isoformat()
-                    }
+                    })
                     st.success(f"Marked '{course.get('title')}' as Completed!")
                 elif not new_is_completed and is_completed: # Just unchecked complete
-                    st.session_state.learning_path_progress[current_employee_id][course_id] = {
+                    set_course_progress(current_employee_id, course_id, {
                         "status": "Not Started", # Reset to Not Started
                         "start_date": None,
                         "completion_date": None
-                    }
+                    })
                     st.info(f"Marked '{course.get('title')}' as Not Started.")
                 elif new_is_completed and is_completed: # Still completed, ensure start date is there
                     if not current_status_info.get("start_date"):
-                        st.session_state.learning_path_progress[current_employee_id][course_id]["start_date"] = datetime.now().isoformat()
+                        set_course_progress(current_employee_id, course_id, dict(current_status_info, start_date=datetime.now().isoformat()))
                 elif not new_is_completed and not is_completed: # Still not completed, ensure start date is set if user interacted
                     if st.session_state.learning_path_progress[current_employee_id].get(course_id, {}).get("status") == "Not Started" and \
                        st.session_state.learning_path_progress[current_employee_id].get(course_id, {}).get("start_date") is None:
                         # If user didn't mark as completed but interacted, assume they started
-                        st.session_state.learning_path_progress[current_employee_id][course_id]["status"] = "In Progress"
-                        st.session_state.learning_path_progress[current_employee_id][course_id]["start_date"] = datetime.now().isoformat()
+                        set_course_progress(current_employee_id, course_id, dict(
+                            current_status_info, status="In Progress", start_date=datetime.now().isoformat()
+                        ))
 
 
                 if is_selected:
@@ -3150,23 +5143,7 @@ def enhanced_learning_path_management():
                     if new_learning_path:
                         st.success("✅ Learning path regenerated and synchronized!")
                         # Reset progress for the new path
-                        st.session_state.learning_path_progress[current_employee_id] = {}
-                        for course in new_learning_path.get('learning_path', []):
-                            course_id = course.get('id')
-                            if course_id:
-                                st.session_state.learning_path_progress[current_employee_id][course_id] = {
-                                    "status": "Not Started", 
-                                    "start_date": None, 
-                                    "completion_date": None
-                                }
-                        for course in new_learning_path.get('udemy_courses', []):
-                            course_id = course.get('id')
-                            if course_id:
-                                st.session_state.learning_path_progress[current_employee_id][course_id] = {
-                                    "status": "Not Started", 
-                                    "start_date": None, 
-                                    "completion_date": None
-                                }
+                        initialize_learning_path_progress(current_employee_id, new_learning_path)
                         st.rerun()
                     else:
                         st.error("Failed to regenerate learning path. Please try again.")
@@ -3247,7 +5224,7 @@ def enhanced_learning_path_management():
                     if current_employee_id in st.session_state.selected_courses_for_plan:
                         st.session_state.selected_courses_for_plan[current_employee_id] = {}
                     if current_employee_id in st.session_state.learning_path_progress:
-                        st.session_state.learning_path_progress[current_employee_id] = {}
+                        set_employee_progress(current_employee_id, {})
                 
                 st.success("Learning path cleared!")
                 st.rerun()
@@ -3273,11 +5250,16 @@ def enhanced_learning_path_management():
 
 # First, add these helper functions to your code:
 
-def sync_employee_profile_changes(employee_id, updated_profile):
-    """Sync any changes made to employee profile back to the database"""
+def sync_employee_profile_changes(employee_id, updated_profile, edit_base=None):
+    """
+    Sync any changes made to employee profile back to the database.
+    `edit_base` is the (record, version) the editor started from; concurrent changes made
+    since then are merged instead of being overwritten.
+    """
     if employee_id and employee_id in st.session_state.employee_database:
         # Get current database entry
-        db_entry = st.session_state.employee_database[employee_id]
+        db_entry, db_version = st.session_state.employee_database.get_versioned(employee_id)
+        base_record, base_version = edit_base or (db_entry, db_version)
         
         # Preserve manager-specific fields that shouldn't be changed by employee
         preserved_fields = ['manager_id', 'employee_id', 'department'] # Added department to preserved fields
@@ -3286,8 +5268,14 @@ def sync_employee_profile_changes(employee_id, updated_profile):
             if field in db_entry:
                 updated_profile[field] = db_entry[field]
         
-        # Update database
-        st.session_state.employee_database[employee_id].update(updated_profile)
+        # Update database (compare-and-swap, merging concurrent edits)
+        success, conflicts = update_employee_with_merge(employee_id, updated_profile, base_record, base_version)
+        if not success:
+            return False
+        record_employee_profile_change(employee_id)
+        if conflicts:
+            st.session_state.setdefault('profile_merge_notices', {})[employee_id] = conflicts
+        updated_profile = st.session_state.employee_database[employee_id]
         
         # Also update session state employee profile if it exists and matches the current employee
         if 'employee_profile' in st.session_state and st.session_state.employee_profile.get('employee_id') == employee_id:
@@ -3309,8 +5297,11 @@ def enhanced_employee_profile_editing():
         
         # Get current employee data
         if current_employee_id in st.session_state.employee_database:
+            edit_base = track_profile_edit_base("employee_portal", current_employee_id)
             employee_data = st.session_state.employee_database[current_employee_id]
+            show_profile_merge_notice(current_employee_id)
         else:
+            edit_base = None
             employee_data = st.session_state.get('employee_profile', {})
     else:
         st.warning("No employee profile found. Please ensure you're logged in correctly.")
@@ -3344,15 +5335,9 @@ def enhanced_employee_profile_editing():
     with col2:
         st.markdown("#### Skills & Proficiency")
         
-        # Get all available skills from role requirements
-        all_skills = set()
-        for role_data in role_requirements.values():
-            all_skills.update(role_data["required_skills"].keys())
-            all_skills.update(role_data["preferred_skills"].keys())
-        
         skills = st.multiselect(
             "Current Skills", 
-            options=sorted(list(all_skills)), 
+            options=list(skill_taxonomy.sorted_names), 
             default=list(employee_data.get("skill_proficiency", {}).keys()), # Use keys from skill_proficiency
             key="emp_skills"
         )
@@ -3415,7 +5400,8 @@ def enhanced_employee_profile_editing():
             }
             
             # Sync changes
-            if sync_employee_profile_changes(current_employee_id, updated_profile):
+            if sync_employee_profile_changes(current_employee_id, updated_profile, edit_base):
+                discard_profile_edit_base("employee_portal", current_employee_id)
                 st.success("✅ Profile changes saved and synchronized!")
                 
                 # Update current session profile
@@ -3431,6 +5417,9 @@ def enhanced_employee_profile_editing():
     
     with col_cancel:
         if st.button("🔄 Reset Changes", key="reset_profile"):
+            widget_keys = ["emp_name", "emp_role", "emp_exp", "emp_skills", "emp_goals", "emp_courses"]
+            widget_keys += [key for key in st.session_state if isinstance(key, str) and key.startswith("emp_prof_")]
+            discard_profile_edit_base("employee_portal", current_employee_id, widget_keys)
             st.rerun()
 
 
@@ -3621,6 +5610,34 @@ class AISearchAgent:
             'search_summary': f"Found {len(unique_results)} learning resources for {skill}"
         }
 
+UDEMY_SEARCHES_PER_SECOND = 2.0  # Shared by every session and worker thread
+
+class RateLimiter:
+    """Token bucket shared by threads: acquire() blocks until the next call is allowed"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self._interval = 1.0 / rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._burst, self._tokens + (now - self._updated) / self._interval)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) * self._interval
+            time.sleep(wait)
+
+@st.cache_resource
+def get_udemy_rate_limiter() -> RateLimiter:
+    return RateLimiter(UDEMY_SEARCHES_PER_SECOND)
+
 # Enhanced Udemy Course Search Agent
 class UdemyCourseAgent:
     def __init__(self):
@@ -3635,6 +5652,8 @@ class UdemyCourseAgent:
         all_courses = []
         
         for skill in skills:
+            # Space searches out across all threads to avoid rate limiting
+            get_udemy_rate_limiter().acquire()
             # Search for real Udemy courses
             search_results = self.search_agent.search_udemy_courses(skill,current_role, max_results=2)
             
@@ -3643,9 +5662,6 @@ class UdemyCourseAgent:
                 course = self._create_course_from_search_result(result, skill)
                 if course:
                     all_courses.append(course)
-            
-            # Small delay to avoid rate limiting
-            time.sleep(0.5)
         
         # If we found real courses, return them
         if all_courses:
@@ -3785,127 +5801,688 @@ class UdemyCourseAgent:
 search_agent = AISearchAgent()
 udemy_agent = UdemyCourseAgent()
 
-# Enhanced course catalog with duration parsing
-@st.cache_data
-def load_enhanced_course_catalog():
-    return pd.DataFrame([
-        {"id": "COURSE001", "title": "Python Programming Essentials", "type": "Course", "duration": "4 weeks", "duration_weeks": 4,
-         "skills": ["Python", "Programming"], "difficulty": "Beginner", "learning_style": "Hands-on",
-         "description": "Learn Python programming fundamentals with practical exercises"},
-        {"id": "COURSE002", "title": "Machine Learning Fundamentals", "type": "Course", "duration": "6 weeks", "duration_weeks": 6,
-         "skills": ["Machine Learning", "Python", "Statistics"], "difficulty": "Intermediate", "learning_style": "Mixed",
-         "description": "Introduction to machine learning algorithms and applications"},
-        {"id": "COURSE003", "title": "Data Leadership Workshop", "type": "Workshop", "duration": "2 days", "duration_weeks": 0.5,
-         "skills": ["Leadership", "Management", "Data Strategy"], "difficulty": "Advanced", "learning_style": "Interactive",
-         "description": "Leadership skills for data professionals"},
-        {"id": "COURSE004", "title": "Advanced SQL for Data Analysis", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
-         "skills": ["SQL", "Database", "Data Analysis"], "difficulty": "Intermediate", "learning_style": "Hands-on",
-         "description": "Advanced SQL techniques for complex data analysis"},
-        {"id": "COURSE005", "title": "Data Visualization with Tableau", "type": "Course", "duration": "2 weeks", "duration_weeks": 2,
-         "skills": ["Data Visualization", "Tableau"], "difficulty": "Beginner", "learning_style": "Visual",
-         "description": "Create impactful data visualizations using Tableau"},
-        {"id": "COURSE006", "title": "Statistics for Data Science", "type": "Course", "duration": "5 weeks", "duration_weeks": 5,
-         "skills": ["Statistics", "Data Science"], "difficulty": "Intermediate", "learning_style": "Mixed",
-         "description": "Statistical methods essential for data science"},
-        {"id": "COURSE007", "title": "Deep Learning Specialization", "type": "Course", "duration": "12 weeks", "duration_weeks": 12,
-         "skills": ["Deep Learning", "Neural Networks", "Python"], "difficulty": "Advanced", "learning_style": "Hands-on",
-         "description": "Comprehensive deep learning techniques and applications"},
-        {"id": "COURSE008", "title": "Agile Project Management", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
-         "skills": ["Project Management", "Agile"], "difficulty": "Beginner", "learning_style": "Interactive",
-         "description": "Agile methodologies for project management"},
-        {"id": "COURSE009", "title": "Quick Data Analysis Bootcamp", "type": "Intensive", "duration": "1 week", "duration_weeks": 1,
-         "skills": ["Data Analysis", "Statistics"], "difficulty": "Intermediate", "learning_style": "Intensive",
-         "description": "Rapid introduction to data analysis techniques"},
-        {"id": "COURSE010", "title": "Python for Data Science - Fast Track", "type": "Bootcamp", "duration": "2 weeks", "duration_weeks": 2,
-         "skills": ["Python", "Data Science"], "difficulty": "Intermediate", "learning_style": "Intensive",
-         "description": "Accelerated Python course for data science applications"},
-        {"id": "COURSE011", "title": "Business Intelligence Essentials", "type": "Course", "duration": "4 weeks", "duration_weeks": 4,
-         "skills": ["Business Intelligence", "Data Analysis"], "difficulty": "Beginner", "learning_style": "Mixed",
-         "description": "Introduction to BI tools and methodologies"},
-        {"id": "COURSE012", "title": "Cloud Computing Fundamentals", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
-         "skills": ["Cloud Computing", "AWS"], "difficulty": "Beginner", "learning_style": "Hands-on",
-         "description": "Learn cloud computing basics with AWS"},
-        {"id": "COURSE013", "title": "Data Analysis Fundamentals", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
-         "skills": ["Data Analysis", "Statistics"], "difficulty": "Beginner", "learning_style": "Hands-on",
-         "description": "Learn Data Analysis basics"},
-        {"id": "COURSE014", "title": "Excel Advanced", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
-         "skills": ["Data Analysis", "Excel"], "difficulty": "Intermediate", "learning_style": "Hands-on",
-         "description": "Learn Excel"},
-        {"id": "COURSE015", "title": "Object-Oriented Programming", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
-         "skills": ["Python", "Java", "Programming"], "difficulty": "Intermediate", "learning_style": "Hands-on",
-         "description": "Learn object-oriented programming concepts"},
-        {"id": "COURSE016", "title": "SQL Intermediate", "type": "Course", "duration": "2 weeks", "duration_weeks": 2,
-         "skills": ["SQL", "Database"], "difficulty": "Intermediate", "learning_style": "Hands-on",
-         "description": "Intermediate SQL techniques and database management"},
-        {"id": "COURSE017", "title": "Python Basics", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
-         "skills": ["Python", "Programming"], "difficulty": "Beginner", "learning_style": "Hands-on",
-         "description": "Introduction to Python programming language"},
-        {"id": "COURSE018", "title": "Business Analysis Fundamentals", "type": "Course", "duration": "4 weeks", "duration_weeks": 4,
-         "skills": ["Business Analysis", "Requirements Gathering"], "difficulty": "Beginner", "learning_style": "Mixed",
-         "description": "Learn business analysis principles and techniques"},
-        {"id": "COURSE019", "title": "SQL Basics", "type": "Course", "duration": "2 weeks", "duration_weeks": 2,
-         "skills": ["SQL", "Database"], "difficulty": "Beginner", "learning_style": "Hands-on",
-         "description": "Introduction to SQL and database basics"},
-        {"id": "COURSE020", "title": "Database Design", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
-         "skills": ["Database", "SQL", "Data Modeling"], "difficulty": "Intermediate", "learning_style": "Mixed",
-         "description": "Learn database design principles and normalization"},
-        {"id": "COURSE021", "title": "Statistical Analysis", "type": "Course", "duration": "4 weeks", "duration_weeks": 4,
-         "skills": ["Statistics", "Data Analysis"], "difficulty": "Intermediate", "learning_style": "Mixed",
-         "description": "Statistical methods for data analysis and interpretation"},
-        {"id": "COURSE022", "title": "Deep Learning Basics", "type": "Course", "duration": "6 weeks", "duration_weeks": 6,
-         "skills": ["Deep Learning", "Neural Networks", "Python"], "difficulty": "Intermediate", "learning_style": "Hands-on",
-         "description": "Introduction to deep learning and neural networks"},
-        {"id": "COURSE023", "title": "Programming Fundamentals", "type": "Course", "duration": "4 weeks", "duration_weeks": 4,
-         "skills": ["Programming", "Problem Solving"], "difficulty": "Beginner", "learning_style": "Hands-on",
-         "description": "Basic programming concepts and problem-solving techniques"},
-        {"id": "COURSE024", "title": "Version Control", "type": "Course", "duration": "1 week", "duration_weeks": 1,
-         "skills": ["Git", "Version Control"], "difficulty": "Beginner", "learning_style": "Hands-on",
-         "description": "Learn Git and version control best practices"},
-        {"id": "COURSE025", "title": "Linux Administration", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
-         "skills": ["Linux", "System Administration"], "difficulty": "Intermediate", "learning_style": "Hands-on",
-         "description": "Linux system administration and command line"},
-        {"id": "COURSE026", "title": "Docker Essentials", "type": "Course", "duration": "2 weeks", "duration_weeks": 2,
-         "skills": ["Docker", "Containerization"], "difficulty": "Intermediate", "learning_style": "Hands-on",
-         "description": "Docker containerization fundamentals"},
-        {"id": "COURSE027", "title": "AWS Fundamentals", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
-         "skills": ["AWS", "Cloud Computing"], "difficulty": "Beginner", "learning_style": "Mixed",
-         "description": "Introduction to Amazon Web Services"},
-        {"id": "COURSE028", "title": "Web Development Fundamentals", "type": "Course", "duration": "4 weeks", "duration_weeks": 4,
-         "skills": ["HTML", "CSS", "JavaScript", "Web Development"], "difficulty": "Beginner", "learning_style": "Hands-on",
-         "description": "Basic web development with HTML, CSS, and JavaScript"},
-        {"id": "COURSE029", "title": "React Basics", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
-         "skills": ["React", "JavaScript", "Frontend"], "difficulty": "Intermediate", "learning_style": "Hands-on",
-         "description": "Introduction to React framework"},
-        {"id": "COURSE030", "title": "Data Engineering Fundamentals", "type": "Course", "duration": "5 weeks", "duration_weeks": 5,
-         "skills": ["Data Engineering", "ETL", "Python"], "difficulty": "Intermediate", "learning_style": "Mixed",
-         "description": "Introduction to data engineering and ETL processes"},
-        {"id": "COURSE031", "title": "Big Data Processing", "type": "Course", "duration": "4 weeks", "duration_weeks": 4,
-         "skills": ["Big Data", "Apache Spark", "Data Processing"], "difficulty": "Advanced", "learning_style": "Hands-on",
-         "description": "Processing large datasets with Apache Spark"},
-        {"id": "COURSE032", "title": "Software Testing Fundamentals", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
-         "skills": ["Testing", "Quality Assurance"], "difficulty": "Beginner", "learning_style": "Mixed",
-         "description": "Software testing principles and methodologies"},
-        {"id": "COURSE033", "title": "Test Automation", "type": "Course", "duration": "4 weeks", "duration_weeks": 4,
-         "skills": ["Test Automation", "Selenium", "Testing"], "difficulty": "Intermediate", "learning_style": "Hands-on",
-         "description": "Automated testing with Selenium and other tools"},
-        {"id": "COURSE034", "title": "Advanced Machine Learning", "type": "Course", "duration": "8 weeks", "duration_weeks": 8,
-         "skills": ["Machine Learning", "Advanced Analytics", "Python"], "difficulty": "Advanced", "learning_style": "Mixed",
-         "description": "Advanced machine learning algorithms and techniques"},
-        {"id": "COURSE035", "title": "MLOps Pipeline", "type": "Course", "duration": "6 weeks", "duration_weeks": 6,
-         "skills": ["MLOps", "Machine Learning", "DevOps"], "difficulty": "Advanced", "learning_style": "Hands-on",
-         "description": "Machine learning operations and deployment pipelines"},
-        {"id": "COURSE036", "title": "System Design Mastery", "type": "Course", "duration": "6 weeks", "duration_weeks": 6,
-         "skills": ["System Design", "Architecture", "Scalability"], "difficulty": "Advanced", "learning_style": "Mixed",
-         "description": "Large-scale system design and architecture"},
-        {"id": "COURSE037", "title": "Cloud Architecture", "type": "Course", "duration": "5 weeks", "duration_weeks": 5,
-         "skills": ["Cloud Architecture", "AWS", "System Design"], "difficulty": "Advanced", "learning_style": "Mixed",
-         "description": "Design and implement cloud-based architectures"},
-        {"id": "COURSE038", "title": "Leadership Essentials", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
-         "skills": ["Leadership", "Team Management", "Communication"], "difficulty": "Intermediate", "learning_style": "Interactive",
-         "description": "Essential leadership skills for technical professionals"}
-    ])
-
-course_catalog = load_enhanced_course_catalog()
+# Set-bit count of every byte value, for popcounts over the bit-packed skill matrix
+BYTE_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+class CourseCatalogIndex:
+    """
+    Precomputed lookup structures over the course catalog:
+    - an inverted index from taxonomy skill id to course ids (in catalog order),
+    - a bit-packed course x skill matrix (column = skill id, eight skills per byte),
+    - difficulty and duration vectors aligned with the matrix rows.
+    Candidate rows come from the inverted index, so work stays O(matching courses); the
+    proficiency and time checks and the relevance scoring for a whole gap set are then
+    a few NumPy operations over those rows.
+
+    Instances are treated as immutable once built: with_changes() returns an updated copy
+    that only rebuilds the rows and posting lists of the changed courses.
+    """
+
+    def __init__(self, courses: List[Dict], taxonomy: SkillTaxonomy):
+        self.taxonomy = taxonomy
+        self.courses = {}  # course id -> record dict
+        self.positions = {}  # course id -> row position in the catalog
+        self.course_ids = []  # row position -> course id (None for removed courses)
+        self.skill_to_course_ids = {}  # skill id -> [course ids]
+        self.difficulty_vector = np.zeros(0, dtype=np.int8)
+        self.duration_vector = np.zeros(0, dtype=np.float64)
+        self.skill_matrix = np.zeros((0, 0), dtype=np.uint8)
+        self._apply(list(courses), [])
+
+    def with_changes(self, upserted_courses: List[Dict], removed_ids: List[str]) -> "CourseCatalogIndex":
+        """Copy of the index with courses added or replaced (by id) and removed"""
+        removed_rows = sum(course_id is None for course_id in self.course_ids) + len(removed_ids)
+        if removed_rows > len(self.course_ids) // 2:
+            # Mostly tombstones: a full rebuild is cheaper than carrying the dead rows
+            removed = set(removed_ids)
+            upserted = {course["id"]: course for course in upserted_courses}
+            return CourseCatalogIndex([
+                upserted.pop(course["id"], course) for course in self.ordered_courses() if course["id"] not in removed
+            ] + list(upserted.values()), self.taxonomy)
+        index = copy.copy(self)
+        index.courses = dict(self.courses)
+        index.positions = dict(self.positions)
+        index.course_ids = list(self.course_ids)
+        index.skill_to_course_ids = dict(self.skill_to_course_ids)  # Posting lists are copied on write
+        index._apply(upserted_courses, removed_ids)
+        return index
+
+    def _apply(self, upserted_courses: List[Dict], removed_ids: List[str]):
+        copied_postings = set()
+
+        def postings(skill_id):
+            if skill_id not in copied_postings:
+                self.skill_to_course_ids[skill_id] = list(self.skill_to_course_ids.get(skill_id, ()))
+                copied_postings.add(skill_id)
+            return self.skill_to_course_ids[skill_id]
+
+        # Unlink removed and replaced courses from the skills they used to teach
+        cleared_rows = []
+        for course_id in [*removed_ids, *(course["id"] for course in upserted_courses)]:
+            previous = self.courses.get(course_id)
+            if previous is not None:
+                for skill_id in self.taxonomy.ids(previous["skills"]):
+                    postings(skill_id).remove(course_id)
+                cleared_rows.append(self.positions[course_id])
+        for course_id in removed_ids:
+            if course_id in self.courses:
+                del self.courses[course_id]
+                self.course_ids[self.positions.pop(course_id)] = None
+
+        difficulty_values, durations, bit_rows, bit_columns = {}, {}, [], []
+        for course in upserted_courses:
+            course_id = course["id"]
+            if course_id not in self.positions:
+                self.positions[course_id] = len(self.course_ids)
+                self.course_ids.append(course_id)
+            position = self.positions[course_id]
+            self.courses[course_id] = course
+            difficulty_values[position] = get_proficiency_value(course["difficulty"])
+            durations[position] = course["duration_weeks"]
+            for skill_id in self.taxonomy.ids(course["skills"]):
+                course_ids = postings(skill_id)
+                if course_ids and self.positions[course_ids[-1]] > position:
+                    bisect.insort(course_ids, course_id, key=self.positions.__getitem__)
+                else:
+                    course_ids.append(course_id)
+                bit_rows.append(position)
+                bit_columns.append(skill_id)
+        for skill_id in copied_postings:
+            if not self.skill_to_course_ids[skill_id]:
+                del self.skill_to_course_ids[skill_id]
+        self.taxonomy.register(skill for course in upserted_courses for skill in course["skills"])
+
+        # Grow the vectors and matrix for new rows and skills, then rewrite the touched rows
+        row_count = len(self.course_ids)
+        byte_count = max(self.skill_matrix.shape[1], (max(bit_columns, default=-1) + 8) // 8)
+        difficulty_vector = np.zeros(row_count, dtype=np.int8)
+        difficulty_vector[:len(self.difficulty_vector)] = self.difficulty_vector
+        duration_vector = np.zeros(row_count, dtype=np.float64)
+        duration_vector[:len(self.duration_vector)] = self.duration_vector
+        skill_matrix = np.zeros((row_count, byte_count), dtype=np.uint8)
+        skill_matrix[:self.skill_matrix.shape[0], :self.skill_matrix.shape[1]] = self.skill_matrix
+        if cleared_rows:
+            skill_matrix[cleared_rows] = 0
+        if difficulty_values:
+            rows = np.fromiter(difficulty_values, dtype=np.int64, count=len(difficulty_values))
+            difficulty_vector[rows] = list(difficulty_values.values())
+            duration_vector[rows] = list(durations.values())
+        if bit_rows:
+            bit_columns = np.array(bit_columns)
+            np.bitwise_or.at(
+                skill_matrix,
+                (np.array(bit_rows), bit_columns >> 3),
+                (0x80 >> (bit_columns & 7)).astype(np.uint8)
+            )
+        self.difficulty_vector = difficulty_vector
+        self.duration_vector = duration_vector
+        self.skill_matrix = skill_matrix
+
+    def ordered_courses(self) -> List[Dict]:
+        """Course records in catalog order"""
+        return [self.courses[course_id] for course_id in self.course_ids if course_id is not None]
+
+    def course_ids_for_skill(self, skill: str) -> List[str]:
+        return self.skill_to_course_ids.get(self.taxonomy.resolve(skill), [])
+
+    def course_ids_for_skills(self, skills) -> List[str]:
+        """Courses teaching any of the skills, in catalog order"""
+        course_ids = set()
+        for skill in skills:
+            course_ids.update(self.course_ids_for_skill(skill))
+        return self.in_catalog_order(course_ids)
+
+    def in_catalog_order(self, course_ids) -> List[str]:
+        return sorted(course_ids, key=self.positions.__getitem__)
+
+    def skill_mask(self, skills) -> np.ndarray:
+        """Bit-packed row with the given skills set (skills missing from the catalog are ignored)"""
+        mask = np.zeros(self.skill_matrix.shape[1], dtype=np.uint8)
+        for skill in skills:
+            column = self.taxonomy.resolve(skill)
+            if column is not None and column >> 3 < len(mask):
+                mask[column >> 3] |= 0x80 >> (column & 7)
+        return mask
+
+    def rank_courses_for_gaps(self, skill_gaps, time_constraint: int = 0, excluded_titles=(),
+                              prefer_shorter: bool = False) -> List[Dict]:
+        """
+        Catalog courses that close at least one gap, ranked by relevance.
+
+        `skill_gaps` is a list of (skill, current_value, target_value) with proficiency values
+        from get_proficiency_value. A course matches a gap when it teaches the skill at a
+        difficulty between the current and target level. Relevance adds, for every matched gap,
+        the size of the gap, so courses covering several or larger gaps come first; ties keep
+        catalog order. With `prefer_shorter`, shorter courses come first and relevance breaks ties.
+        """
+        candidate_ids = self.course_ids_for_skills(skill for skill, _, _ in skill_gaps)
+        if not candidate_ids:
+            return []
+        rows = np.array([self.positions[course_id] for course_id in candidate_ids])
+        candidate_skills = self.skill_matrix[rows]
+        candidate_difficulty = self.difficulty_vector[rows]
+
+        # Gaps with the same (current, target) band share one mask, so the number of NumPy
+        # passes is bounded by the handful of proficiency bands rather than the number of gaps
+        bands = {}
+        for skill, current_value, target_value in skill_gaps:
+            bands.setdefault((current_value, target_value), []).append(skill)
+        scores = np.zeros(len(rows), dtype=np.int32)
+        for (current_value, target_value), band_skills in bands.items():
+            in_band = (candidate_difficulty >= current_value) & (candidate_difficulty <= target_value)
+            matched_gaps = BYTE_POPCOUNT[candidate_skills & self.skill_mask(band_skills)].sum(axis=1, dtype=np.int32)
+            scores += np.where(in_band, matched_gaps * max(1, target_value - current_value), 0)
+
+        selected = scores > 0
+        if time_constraint > 0:
+            durations = self.duration_vector[rows]
+            selected &= (durations <= time_constraint + 1) & (durations >= max(1, time_constraint - 2))
+        if excluded_titles:
+            excluded_titles = set(excluded_titles)
+            selected &= np.array([self.courses[course_id]["title"] not in excluded_titles for course_id in candidate_ids])
+
+        selected_rows = np.flatnonzero(selected)
+        # np.lexsort sorts by the last key first; rows are already in catalog order for ties
+        if prefer_shorter:
+            order = np.lexsort((-scores[selected_rows], self.duration_vector[rows[selected_rows]]))
+        else:
+            order = np.lexsort((-scores[selected_rows],))
+        return [
+            dict(self.courses[candidate_ids[i]], relevance_score=int(scores[i]))
+            for i in selected_rows[order]
+        ]
+
+SEARCH_STOP_WORDS = {
+    "a", "an", "and", "about", "are", "as", "at", "be", "by", "course", "courses", "for", "from", "how", "i",
+    "in", "into", "is", "it", "me", "my", "of", "on", "or", "some", "that", "the", "to", "with", "want",
+    "resources", "training", "tutorial", "tutorials"
+}
+SEARCH_FIELD_WEIGHTS = {"title": 2, "skills": 2, "description": 1}  # Token repeats per field occurrence
+
+def tokenize_search_text(text: str) -> List[str]:
+    """Lower-cased word tokens (keeping c++, c#, .net style tokens) without stop words"""
+    return [token for token in re.findall(r"[a-z0-9.+#]*[a-z0-9+#]", str(text).lower()) if token not in SEARCH_STOP_WORDS]
+
+class CourseSearchIndex:
+    """
+    In-process BM25 index over course title, skills and description (title and skills
+    weighted double). Per-term BM25 weights are precomputed at build time, so a query is
+    a sum of a few posting arrays and answers in milliseconds without any network call.
+    """
+
+    def __init__(self, courses: List[Dict], k1: float = 1.5, b: float = 0.75):
+        self.courses = courses
+        term_frequencies = {}  # term -> {document: tf}
+        document_lengths = np.zeros(len(courses), dtype=np.float64)
+        for document, course in enumerate(courses):
+            tokens = []
+            for field_name, weight in SEARCH_FIELD_WEIGHTS.items():
+                value = course.get(field_name, "")
+                field_tokens = tokenize_search_text(" ".join(value) if isinstance(value, list) else value)
+                tokens.extend(field_tokens * weight)
+            document_lengths[document] = len(tokens)
+            for token in tokens:
+                postings = term_frequencies.setdefault(token, {})
+                postings[document] = postings.get(document, 0) + 1
+
+        average_length = document_lengths.mean() if len(courses) else 1.0
+        self.postings = {}  # term -> (documents, bm25 weights)
+        for term, postings in term_frequencies.items():
+            documents = np.fromiter(postings, dtype=np.int64, count=len(postings))
+            tf = np.fromiter(postings.values(), dtype=np.float64, count=len(postings))
+            idf = np.log(1 + (len(courses) - len(postings) + 0.5) / (len(postings) + 0.5))
+            norm = k1 * (1 - b + b * document_lengths[documents] / average_length)
+            self.postings[term] = (documents, idf * tf * (k1 + 1) / (tf + norm))
+
+    def search(self, query: str, max_results: int = 5, min_term_coverage: float = 0.5) -> List[Dict]:
+        """
+        Best-matching courses for the query. A course must match at least `min_term_coverage`
+        of the distinct query terms, so broad queries that only brush the catalog
+        ("latest machine learning trends") return nothing and can go to web search instead.
+        """
+        terms = list(dict.fromkeys(tokenize_search_text(query)))
+        if not terms or not self.courses:
+            return []
+        scores = np.zeros(len(self.courses), dtype=np.float64)
+        matched_terms = np.zeros(len(self.courses), dtype=np.int32)
+        for term in terms:
+            if term in self.postings:
+                documents, weights = self.postings[term]
+                scores[documents] += weights
+                matched_terms[documents] += 1
+        scores[matched_terms < max(1, int(np.ceil(len(terms) * min_term_coverage)))] = 0
+        candidates = np.flatnonzero(scores)
+        top = candidates[np.argsort(-scores[candidates], kind="stable")[:max_results]]
+        return [dict(self.courses[document], search_score=round(float(scores[document]), 3)) for document in top]
+
+class CoursePrerequisiteGraph:
+    """
+    Catalog prerequisites compiled into a DAG once per catalog version and shared by every
+    path. Unknown prerequisite ids are ignored; edges that would close a cycle are dropped
+    and listed in `cycles`. ancestors_of() gives a course's transitive prerequisites (memoized
+    for the graph's lifetime), so a path is ordered correctly even when an intermediate
+    course is not part of it.
+    """
+
+    def __init__(self, courses: List[Dict]):
+        self.title_to_id = {course["title"]: course["id"] for course in courses}
+        self.prerequisites = {
+            course["id"]: tuple(dict.fromkeys(course.get("prerequisites") or ()))
+            for course in courses
+        }
+        for course_id, prerequisite_ids in self.prerequisites.items():
+            self.prerequisites[course_id] = tuple(p for p in prerequisite_ids if p in self.prerequisites and p != course_id)
+        self.cycles = []  # (course id, prerequisite id) edges dropped to break cycles
+
+        # Iterative DFS over prerequisites; an edge back to a course still being visited closes a cycle
+        state = {}
+        for root in self.prerequisites:
+            if root in state:
+                continue
+            state[root] = "visiting"
+            stack = [(root, iter(self.prerequisites[root]))]
+            while stack:
+                course_id, pending = stack[-1]
+                for prerequisite_id in pending:
+                    if state.get(prerequisite_id) == "visiting":
+                        self.cycles.append((course_id, prerequisite_id))
+                    elif prerequisite_id not in state:
+                        state[prerequisite_id] = "visiting"
+                        stack.append((prerequisite_id, iter(self.prerequisites[prerequisite_id])))
+                        break
+                else:
+                    state[course_id] = "done"
+                    stack.pop()
+        for course_id, prerequisite_id in self.cycles:
+            self.prerequisites[course_id] = tuple(p for p in self.prerequisites[course_id] if p != prerequisite_id)
+        self._ancestors = {}  # course id -> frozenset of transitive prerequisite ids
+
+    def ancestors_of(self, course_id: str) -> frozenset:
+        ancestors = self._ancestors.get(course_id)
+        if ancestors is not None:
+            return ancestors
+        # Resolve prerequisites before their dependents; iterative because chains can be deep
+        stack = [course_id]
+        while stack:
+            current = stack[-1]
+            prerequisite_ids = self.prerequisites.get(current, ())
+            unresolved = [p for p in prerequisite_ids if p not in self._ancestors]
+            if unresolved:
+                stack.extend(unresolved)
+                continue
+            stack.pop()
+            self._ancestors[current] = frozenset(prerequisite_ids).union(*(self._ancestors[p] for p in prerequisite_ids))
+        return self._ancestors[course_id]
+
+    def resolve(self, course: Dict) -> Optional[str]:
+        """Catalog id of a path course (by id, or by title when the model omitted the id)"""
+        course_id = course.get("id")
+        if course_id in self.prerequisites:
+            return course_id
+        return self.title_to_id.get(course.get("title"))
+
+def schedule_learning_path(learning_path: Dict, prerequisite_graph: CoursePrerequisiteGraph) -> Dict:
+    """
+    Orders the path's internal courses topologically (keeping the given order among
+    independent courses) and sets each course's earliest feasible start week: when all of
+    its prerequisites in the path are finished. Adds "critical_path_weeks", the earliest
+    completion when independent courses run in parallel.
+    """
+    if not learning_path:
+        return learning_path
+    courses = learning_path.get("learning_path", [])
+    course_ids = [prerequisite_graph.resolve(course) for course in courses]
+    ancestors = [prerequisite_graph.ancestors_of(course_id) if course_id else frozenset() for course_id in course_ids]
+    depends_on = {
+        i: [j for j, other_id in enumerate(course_ids) if j != i and other_id in ancestors[i]]
+        for i in range(len(courses))
+    }
+
+    # Kahn's algorithm; the heap picks the earliest original position among ready courses
+    remaining = {i: len(dependencies) for i, dependencies in depends_on.items()}
+    dependents = {i: [] for i in depends_on}
+    for i, dependencies in depends_on.items():
+        for j in dependencies:
+            dependents[j].append(i)
+    ready = [i for i, count in remaining.items() if count == 0]
+    heapq.heapify(ready)
+    order, earliest_start, finish = [], {}, {}
+    while ready:
+        i = heapq.heappop(ready)
+        order.append(i)
+        try:
+            duration_weeks = float(courses[i].get("duration_weeks") or 0)
+        except (TypeError, ValueError):
+            duration_weeks = 0.0
+        earliest_start[i] = max((finish[j] for j in depends_on[i]), default=0.0)
+        finish[i] = earliest_start[i] + duration_weeks
+        for k in dependents[i]:
+            remaining[k] -= 1
+            if remaining[k] == 0:
+                heapq.heappush(ready, k)
+
+    for i in order:
+        courses[i]["earliest_start_week"] = earliest_start[i]
+        courses[i]["prerequisites"] = [course_ids[j] for j in depends_on[i]]
+    learning_path["learning_path"] = [courses[i] for i in order]
+    learning_path["critical_path_weeks"] = max(finish.values(), default=0.0)
+    return learning_path
+
+def course_fits_time_window(duration_weeks, time_constraint) -> bool:
+    """Time constraint filter used when picking catalog courses (allows some flexibility, ±1 week)"""
+    return time_constraint <= 0 or max(1, time_constraint - 2) <= duration_weeks <= time_constraint + 1
+
+# Built-in course catalog, used when COURSE_CATALOG_PATH does not exist
+BUILTIN_COURSE_CATALOG = [
+    {"id": "COURSE001", "title": "Python Programming Essentials", "type": "Course", "duration": "4 weeks", "duration_weeks": 4,
+     "skills": ["Python", "Programming"], "difficulty": "Beginner", "learning_style": "Hands-on",
+     "description": "Learn Python programming fundamentals with practical exercises"},
+    {"id": "COURSE002", "title": "Machine Learning Fundamentals", "type": "Course", "duration": "6 weeks", "duration_weeks": 6,
+     "skills": ["Machine Learning", "Python", "Statistics"], "difficulty": "Intermediate", "learning_style": "Mixed",
+     "prerequisites": ["COURSE001"], "description": "Introduction to machine learning algorithms and applications"},
+    {"id": "COURSE003", "title": "Data Leadership Workshop", "type": "Workshop", "duration": "2 days", "duration_weeks": 0.5,
+     "skills": ["Leadership", "Management", "Data Strategy"], "difficulty": "Advanced", "learning_style": "Interactive",
+     "description": "Leadership skills for data professionals"},
+    {"id": "COURSE004", "title": "Advanced SQL for Data Analysis", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
+     "skills": ["SQL", "Database", "Data Analysis"], "difficulty": "Intermediate", "learning_style": "Hands-on",
+     "prerequisites": ["COURSE016"], "description": "Advanced SQL techniques for complex data analysis"},
+    {"id": "COURSE005", "title": "Data Visualization with Tableau", "type": "Course", "duration": "2 weeks", "duration_weeks": 2,
+     "skills": ["Data Visualization", "Tableau"], "difficulty": "Beginner", "learning_style": "Visual",
+     "description": "Create impactful data visualizations using Tableau"},
+    {"id": "COURSE006", "title": "Statistics for Data Science", "type": "Course", "duration": "5 weeks", "duration_weeks": 5,
+     "skills": ["Statistics", "Data Science"], "difficulty": "Intermediate", "learning_style": "Mixed",
+     "description": "Statistical methods essential for data science"},
+    {"id": "COURSE007", "title": "Deep Learning Specialization", "type": "Course", "duration": "12 weeks", "duration_weeks": 12,
+     "skills": ["Deep Learning", "Neural Networks", "Python"], "difficulty": "Advanced", "learning_style": "Hands-on",
+     "prerequisites": ["COURSE022"], "description": "Comprehensive deep learning techniques and applications"},
+    {"id": "COURSE008", "title": "Agile Project Management", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
+     "skills": ["Project Management", "Agile"], "difficulty": "Beginner", "learning_style": "Interactive",
+     "description": "Agile methodologies for project management"},
+    {"id": "COURSE009", "title": "Quick Data Analysis Bootcamp", "type": "Intensive", "duration": "1 week", "duration_weeks": 1,
+     "skills": ["Data Analysis", "Statistics"], "difficulty": "Intermediate", "learning_style": "Intensive",
+     "description": "Rapid introduction to data analysis techniques"},
+    {"id": "COURSE010", "title": "Python for Data Science - Fast Track", "type": "Bootcamp", "duration": "2 weeks", "duration_weeks": 2,
+     "skills": ["Python", "Data Science"], "difficulty": "Intermediate", "learning_style": "Intensive",
+     "description": "Accelerated Python course for data science applications"},
+    {"id": "COURSE011", "title": "Business Intelligence Essentials", "type": "Course", "duration": "4 weeks", "duration_weeks": 4,
+     "skills": ["Business Intelligence", "Data Analysis"], "difficulty": "Beginner", "learning_style": "Mixed",
+     "description": "Introduction to BI tools and methodologies"},
+    {"id": "COURSE012", "title": "Cloud Computing Fundamentals", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
+     "skills": ["Cloud Computing", "AWS"], "difficulty": "Beginner", "learning_style": "Hands-on",
+     "description": "Learn cloud computing basics with AWS"},
+    {"id": "COURSE013", "title": "Data Analysis Fundamentals", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
+     "skills": ["Data Analysis", "Statistics"], "difficulty": "Beginner", "learning_style": "Hands-on",
+     "description": "Learn Data Analysis basics"},
+    {"id": "COURSE014", "title": "Excel Advanced", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
+     "skills": ["Data Analysis", "Excel"], "difficulty": "Intermediate", "learning_style": "Hands-on",
+     "description": "Learn Excel"},
+    {"id": "COURSE015", "title": "Object-Oriented Programming", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
+     "skills": ["Python", "Java", "Programming"], "difficulty": "Intermediate", "learning_style": "Hands-on",
+     "prerequisites": ["COURSE023"], "description": "Learn object-oriented programming concepts"},
+    {"id": "COURSE016", "title": "SQL Intermediate", "type": "Course", "duration": "2 weeks", "duration_weeks": 2,
+     "skills": ["SQL", "Database"], "difficulty": "Intermediate", "learning_style": "Hands-on",
+     "prerequisites": ["COURSE019"], "description": "Intermediate SQL techniques and database management"},
+    {"id": "COURSE017", "title": "Python Basics", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
+     "skills": ["Python", "Programming"], "difficulty": "Beginner", "learning_style": "Hands-on",
+     "description": "Introduction to Python programming language"},
+    {"id": "COURSE018", "title": "Business Analysis Fundamentals", "type": "Course", "duration": "4 weeks", "duration_weeks": 4,
+     "skills": ["Business Analysis", "Requirements Gathering"], "difficulty": "Beginner", "learning_style": "Mixed",
+     "description": "Learn business analysis principles and techniques"},
+    {"id": "COURSE019", "title": "SQL Basics", "type": "Course", "duration": "2 weeks", "duration_weeks": 2,
+     "skills": ["SQL", "Database"], "difficulty": "Beginner", "learning_style": "Hands-on",
+     "description": "Introduction to SQL and database basics"},
+    {"id": "COURSE020", "title": "Database Design", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
+     "skills": ["Database", "SQL", "Data Modeling"], "difficulty": "Intermediate", "learning_style": "Mixed",
+     "prerequisites": ["COURSE019"], "description": "Learn database design principles and normalization"},
+    {"id": "COURSE021", "title": "Statistical Analysis", "type": "Course", "duration": "4 weeks", "duration_weeks": 4,
+     "skills": ["Statistics", "Data Analysis"], "difficulty": "Intermediate", "learning_style": "Mixed",
+     "description": "Statistical methods for data analysis and interpretation"},
+    {"id": "COURSE022", "title": "Deep Learning Basics", "type": "Course", "duration": "6 weeks", "duration_weeks": 6,
+     "skills": ["Deep Learning", "Neural Networks", "Python"], "difficulty": "Intermediate", "learning_style": "Hands-on",
+     "prerequisites": ["COURSE002"], "description": "Introduction to deep learning and neural networks"},
+    {"id": "COURSE023", "title": "Programming Fundamentals", "type": "Course", "duration": "4 weeks", "duration_weeks": 4,
+     "skills": ["Programming", "Problem Solving"], "difficulty": "Beginner", "learning_style": "Hands-on",
+     "description": "Basic programming concepts and problem-solving techniques"},
+    {"id": "COURSE024", "title": "Version Control", "type": "Course", "duration": "1 week", "duration_weeks": 1,
+     "skills": ["Git", "Version Control"], "difficulty": "Beginner", "learning_style": "Hands-on",
+     "description": "Learn Git and version control best practices"},
+    {"id": "COURSE025", "title": "Linux Administration", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
+     "skills": ["Linux", "System Administration"], "difficulty": "Intermediate", "learning_style": "Hands-on",
+     "description": "Linux system administration and command line"},
+    {"id": "COURSE026", "title": "Docker Essentials", "type": "Course", "duration": "2 weeks", "duration_weeks": 2,
+     "skills": ["Docker", "Containerization"], "difficulty": "Intermediate", "learning_style": "Hands-on",
+     "prerequisites": ["COURSE025"], "description": "Docker containerization fundamentals"},
+    {"id": "COURSE027", "title": "AWS Fundamentals", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
+     "skills": ["AWS", "Cloud Computing"], "difficulty": "Beginner", "learning_style": "Mixed",
+     "description": "Introduction to Amazon Web Services"},
+    {"id": "COURSE028", "title": "Web Development Fundamentals", "type": "Course", "duration": "4 weeks", "duration_weeks": 4,
+     "skills": ["HTML", "CSS", "JavaScript", "Web Development"], "difficulty": "Beginner", "learning_style": "Hands-on",
+     "description": "Basic web development with HTML, CSS, and JavaScript"},
+    {"id": "COURSE029", "title": "React Basics", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
+     "skills": ["React", "JavaScript", "Frontend"], "difficulty": "Intermediate", "learning_style": "Hands-on",
+     "prerequisites": ["COURSE028"], "description": "Introduction to React framework"},
+    {"id": "COURSE030", "title": "Data Engineering Fundamentals", "type": "Course", "duration": "5 weeks", "duration_weeks": 5,
+     "skills": ["Data Engineering", "ETL", "Python"], "difficulty": "Intermediate", "learning_style": "Mixed",
+     "description": "Introduction to data engineering and ETL processes"},
+    {"id": "COURSE031", "title": "Big Data Processing", "type": "Course", "duration": "4 weeks", "duration_weeks": 4,
+     "skills": ["Big Data", "Apache Spark", "Data Processing"], "difficulty": "Advanced", "learning_style": "Hands-on",
+     "prerequisites": ["COURSE030"], "description": "Processing large datasets with Apache Spark"},
+    {"id": "COURSE032", "title": "Software Testing Fundamentals", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
+     "skills": ["Testing", "Quality Assurance"], "difficulty": "Beginner", "learning_style": "Mixed",
+     "description": "Software testing principles and methodologies"},
+    {"id": "COURSE033", "title": "Test Automation", "type": "Course", "duration": "4 weeks", "duration_weeks": 4,
+     "skills": ["Test Automation", "Selenium", "Testing"], "difficulty": "Intermediate", "learning_style": "Hands-on",
+     "prerequisites": ["COURSE032"], "description": "Automated testing with Selenium and other tools"},
+    {"id": "COURSE034", "title": "Advanced Machine Learning", "type": "Course", "duration": "8 weeks", "duration_weeks": 8,
+     "skills": ["Machine Learning", "Advanced Analytics", "Python"], "difficulty": "Advanced", "learning_style": "Mixed",
+     "prerequisites": ["COURSE002"], "description": "Advanced machine learning algorithms and techniques"},
+    {"id": "COURSE035", "title": "MLOps Pipeline", "type": "Course", "duration": "6 weeks", "duration_weeks": 6,
+     "skills": ["MLOps", "Machine Learning", "DevOps"], "difficulty": "Advanced", "learning_style": "Hands-on",
+     "prerequisites": ["COURSE002"], "description": "Machine learning operations and deployment pipelines"},
+    {"id": "COURSE036", "title": "System Design Mastery", "type": "Course", "duration": "6 weeks", "duration_weeks": 6,
+     "skills": ["System Design", "Architecture", "Scalability"], "difficulty": "Advanced", "learning_style": "Mixed",
+     "description": "Large-scale system design and architecture"},
+    {"id": "COURSE037", "title": "Cloud Architecture", "type": "Course", "duration": "5 weeks", "duration_weeks": 5,
+     "skills": ["Cloud Architecture", "AWS", "System Design"], "difficulty": "Advanced", "learning_style": "Mixed",
+     "prerequisites": ["COURSE027"], "description": "Design and implement cloud-based architectures"},
+    {"id": "COURSE038", "title": "Leadership Essentials", "type": "Course", "duration": "3 weeks", "duration_weeks": 3,
+     "skills": ["Leadership", "Team Management", "Communication"], "difficulty": "Intermediate", "learning_style": "Interactive",
+     "description": "Essential leadership skills for technical professionals"}
+]
+
+COURSE_CATALOG_PATH = os.environ.get("COURSE_CATALOG_PATH", "course_catalog")  # File or directory of catalog files
+COURSE_CATALOG_EXTENSIONS = (".json", ".csv", ".parquet")
+COURSE_CATALOG_CHECK_INTERVAL = 5.0  # Seconds between checks of the catalog files for changes
+COURSE_CATALOG_COLUMNS = ["id", "title", "type", "duration", "duration_weeks", "skills", "difficulty", "learning_style", "description", "prerequisites", "cost"]
+
+def _split_catalog_list(value) -> List[str]:
+    if isinstance(value, str):
+        return [item.strip() for item in re.split(r"[;,|]", value) if item.strip()]
+    if value is None:
+        return []
+    return [str(item).strip() for item in value if str(item).strip()]
+
+def normalize_course_record(raw: Dict) -> Optional[Dict]:
+    """Coerces a catalog row from any source format to the catalog columns; rows without an id or title are skipped"""
+    course_id = str(raw.get("id") or "").strip()
+    title = str(raw.get("title") or "").strip()
+    if not course_id or not title:
+        return None
+    duration = str(raw.get("duration") or "").strip()
+    try:
+        duration_weeks = float(raw["duration_weeks"])
+    except (KeyError, TypeError, ValueError):
+        # Fall back to parsing the duration text ("4 weeks", "2 days", ...)
+        match = re.match(r"\s*(\d+(?:\.\d+)?)\s*(day|week|month)", duration, re.IGNORECASE)
+        if not match:
+            return None
+        unit_weeks = {"day": 0.25, "week": 1, "month": 4}[match.group(2).lower()]
+        duration_weeks = float(match.group(1)) * unit_weeks
+    if duration_weeks.is_integer():
+        duration_weeks = int(duration_weeks)
+    try:
+        cost = max(0.0, float(raw.get("cost") or 0))
+    except (TypeError, ValueError):
+        cost = 0.0
+    return {
+        "id": course_id,
+        "title": title,
+        "type": str(raw.get("type") or "Course"),
+        "duration": duration or f"{duration_weeks} weeks",
+        "duration_weeks": duration_weeks,
+        "skills": _split_catalog_list(raw.get("skills")),
+        "difficulty": str(raw.get("difficulty") or "Beginner").strip().title(),
+        "learning_style": str(raw.get("learning_style") or "Mixed"),
+        "description": str(raw.get("description") or ""),
+        "prerequisites": _split_catalog_list(raw.get("prerequisites")),  # Course ids
+        "cost": cost,  # Per-seat cost; internal courses default to 0
+    }
+
+def read_course_catalog_file(path: str, content: bytes) -> List[Dict]:
+    """Parses one catalog file (JSON list or {"courses": [...]}, CSV, or Parquet) into normalized course records"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        data = json.loads(content.decode("utf-8"))
+        rows = data.get("courses", []) if isinstance(data, dict) else data
+    elif extension == ".csv":
+        rows = csv.DictReader(io.StringIO(content.decode("utf-8-sig")))
+    elif extension == ".parquet":
+        rows = pd.read_parquet(io.BytesIO(content)).to_dict("records")
+    else:
+        raise ValueError(f"Unsupported catalog file: {path}")
+    courses = []
+    for raw in rows:
+        course = normalize_course_record(raw)
+        if course is not None:
+            courses.append(course)
+    return courses
+
+@dataclass
+class CourseCatalogSnapshot:
+    """One consistent catalog state; downstream caches key on `version`"""
+    version: str
+    frame: pd.DataFrame
+    index: CourseCatalogIndex
+    prerequisites: CoursePrerequisiteGraph
+
+@dataclass
+class CourseCatalogFile:
+    stat_key: tuple  # (mtime_ns, size)
+    digest: str
+    courses: List[Dict]
+
+class CourseCatalog:
+    """
+    Course catalog loaded from COURSE_CATALOG_PATH: a JSON/CSV/Parquet file, or a directory of
+    them (later files override earlier ones on the same course id). The built-in catalog is used
+    when the path does not exist.
+
+    refresh() stats the files at most every COURSE_CATALOG_CHECK_INTERVAL seconds and only reads
+    files whose mtime or size changed; a file is only re-parsed when its content hash changed.
+    Changed courses are applied to the skill index incrementally and a new snapshot with a new
+    version id is published, so edits take effect on the next rerun without a restart.
+    A file that fails to parse keeps its previous courses and is reported in `last_error`.
+    """
+
+    def __init__(self, path: str, builtin_courses: List[Dict], taxonomy: SkillTaxonomy):
+        self.path = path
+        self.taxonomy = taxonomy
+        self._builtin_courses = [normalize_course_record(course) for course in builtin_courses]
+        self._lock = threading.Lock()
+        self._files = {}  # path -> CourseCatalogFile
+        self._last_check = 0.0
+        self.last_error = None
+        self.source_description = "built-in catalog"
+        self._snapshot = None
+        self.refresh(force=True)
+
+    def current(self) -> CourseCatalogSnapshot:
+        return self._snapshot
+
+    def _catalog_files(self) -> List[str]:
+        if os.path.isdir(self.path):
+            files = []
+            for root, _, names in os.walk(self.path):
+                files.extend(os.path.join(root, name) for name in names
+                             if name.lower().endswith(COURSE_CATALOG_EXTENSIONS))
+            return sorted(files)
+        if os.path.isfile(self.path):
+            return [self.path]
+        return []
+
+    def refresh(self, force: bool = False) -> bool:
+        """Picks up catalog file changes; returns True when a new snapshot was published"""
+        if not force and time.monotonic() - self._last_check < COURSE_CATALOG_CHECK_INTERVAL:
+            return False
+        with self._lock:
+            self._last_check = time.monotonic()
+            changed = False
+            errors = []
+            current_files = self._catalog_files()
+            for removed_path in set(self._files) - set(current_files):
+                del self._files[removed_path]
+                changed = True
+            for path in current_files:
+                try:
+                    stat = os.stat(path)
+                    stat_key = (stat.st_mtime_ns, stat.st_size)
+                    cached = self._files.get(path)
+                    if cached is not None and cached.stat_key == stat_key:
+                        continue
+                    with open(path, 'rb') as f:
+                        content = f.read()
+                    digest = hashlib.sha256(content).hexdigest()
+                    if cached is not None and cached.digest == digest:
+                        cached.stat_key = stat_key  # Touched but unchanged
+                        continue
+                    self._files[path] = CourseCatalogFile(stat_key, digest, read_course_catalog_file(path, content))
+                    changed = True
+                except Exception as e:
+                    errors.append(f"{path}: {e}")
+            self.last_error = "; ".join(errors) or None
+            if changed or self._snapshot is None:
+                self._publish()
+                return True
+            return False
+
+    def _publish(self):
+        if self._files:
+            courses_by_id = {}
+            for path in sorted(self._files):
+                for course in self._files[path].courses:
+                    courses_by_id[course["id"]] = course
+            version = hashlib.sha256(
+                "\n".join(f"{path}:{self._files[path].digest}" for path in sorted(self._files)).encode("utf-8")
+            ).hexdigest()[:12]
+            self.source_description = self.path
+        else:
+            courses_by_id = {course["id"]: course for course in self._builtin_courses if course is not None}
+            version = "builtin"
+            self.source_description = "built-in catalog"
+
+        previous = self._snapshot
+        if previous is None:
+            index = CourseCatalogIndex(list(courses_by_id.values()), self.taxonomy)
+        else:
+            upserted = [course for course_id, course in courses_by_id.items()
+                        if previous.index.courses.get(course_id) != course]
+            removed_ids = [course_id for course_id in previous.index.courses if course_id not in courses_by_id]
+            index = previous.index.with_changes(upserted, removed_ids)
+        courses = index.ordered_courses()
+        frame = pd.DataFrame(courses, columns=COURSE_CATALOG_COLUMNS)
+        self._snapshot = CourseCatalogSnapshot(version, frame, index, CoursePrerequisiteGraph(courses))
+
+@st.cache_resource
+def get_course_catalog() -> CourseCatalog:
+    """Process-wide catalog shared by all sessions"""
+    return CourseCatalog(COURSE_CATALOG_PATH, BUILTIN_COURSE_CATALOG, get_skill_taxonomy())
+
+def load_enhanced_course_catalog() -> CourseCatalogSnapshot:
+    """Current catalog snapshot, after picking up any changes to the catalog files"""
+    catalog = get_course_catalog()
+    catalog.refresh()
+    return catalog.current()
+
 
 # Enhanced role requirements with skill proficiency levels
 @st.cache_data
@@ -4077,6 +6654,23 @@ def load_enhanced_role_requirements():
 
 
 role_requirements = load_enhanced_role_requirements()
+role_requirements_version = compute_role_requirements_version(role_requirements)
+skill_taxonomy = get_skill_taxonomy()
+
+# Bound once per rerun, so every function in a rerun sees the same catalog version
+course_catalog_snapshot = load_enhanced_course_catalog()
+course_catalog = course_catalog_snapshot.frame
+course_index = course_catalog_snapshot.index
+course_prerequisites = course_catalog_snapshot.prerequisites
+course_catalog_version = course_catalog_snapshot.version
+
+@st.cache_resource(max_entries=2)
+def get_course_search_index(catalog_version: str, _catalog_index: CourseCatalogIndex) -> CourseSearchIndex:
+    """Search index for a catalog version, built on first search and shared by all sessions"""
+    return CourseSearchIndex(_catalog_index.ordered_courses())
+
+def search_course_catalog(query: str, max_results: int = 5) -> List[Dict]:
+    return get_course_search_index(course_catalog_version, course_index).search(query, max_results)
 
 def enhanced_intent_detection_with_gemini(user_input, conversation_history, current_learning_path):
     """
@@ -4197,17 +6791,8 @@ def extract_learning_requirements(user_input):
                 time_available = time_value
             break
     
-    # Extract specific skills mentioned
-    all_skills = set()
-    for skills_dict in role_requirements.values():
-        all_skills.update(skills_dict["required_skills"].keys())
-        all_skills.update(skills_dict["preferred_skills"].keys())
-    
-    # Add skills from course catalog
-    for _, course in course_catalog.iterrows():
-        all_skills.update(course["skills"])
-    
-    mentioned_skills = [skill for skill in all_skills if skill.lower() in user_input_lower]
+    # Extract specific skills mentioned (role and catalog skills, including aliases)
+    mentioned_skills = skill_taxonomy.mentioned_in(user_input)
     
     # Extract urgency indicators
     urgency_keywords = {
@@ -4230,20 +6815,625 @@ def extract_learning_requirements(user_input):
     }
 
 # Enhanced learning path generation with Udemy integration
-def generate_enhanced_learning_path(employee_profile, learning_preferences, specific_requirements=None):
-    # Prepare context
-    current_role_reqs = role_requirements.get(employee_profile["current_role"], {})
-    
-    career_goal_reqs_list = []
-    for goal in employee_profile["career_goals"]:
-        career_goal_reqs_list.append(role_requirements.get(goal, {}))
-    
-    # Calculate skill gaps based on proficiency
-    skill_gaps_with_proficiency = calculate_skill_gaps(
+LEARNING_PATH_PLANNER = os.environ.get("LEARNING_PATH_PLANNER", "local")  # local, llm
+LEARNING_PATH_NARRATIVE = os.environ.get("LEARNING_PATH_NARRATIVE", "template")  # template, llm
+LOCAL_PLANNER_MAX_COURSES = 6
+
+CRITICAL_GAP_WEIGHT = 3  # Objective multiplier for gaps of two or more levels
+COURSE_SELECTION_TIME_LIMIT = 0.03  # Seconds before the best selection found so far is returned
+
+def optimize_course_selection(covers: List[int], weeks: List[float], costs: List[float], gap_weights: List[float],
+                              max_weeks: float = 0, max_cost: float = 0, max_courses: int = LOCAL_PLANNER_MAX_COURSES,
+                              initial: Optional[List[int]] = None,
+                              time_limit: float = COURSE_SELECTION_TIME_LIMIT) -> List[int]:
+    """
+    Indices of the courses whose covered gaps have the largest total weight within the total
+    weeks, total cost and course count budgets (0 means no limit); ties go to fewer weeks.
+
+    `covers[i]` is the bitmask of gaps course i covers. The search is seeded with a greedy
+    selection (most uncovered weight per week), or `initial` when that is better, so the
+    result is never empty while some course fits. Per gap set only the courses not beaten on
+    both weeks and cost are kept, and courses whose gaps are a strict subset of a no longer,
+    no more expensive course are dropped. Branch and bound then explores selections in order
+    of value per week; a branch is cut when its value plus a bound on the remaining courses'
+    marginal gains (the fractional knapsack over weeks and the best gains that fit the course
+    count, valid because coverage is submodular) cannot beat the best selection. The search
+    stops once every coverable gap is covered or when `time_limit` seconds, counted from the
+    call and including the preprocessing, have passed.
+    """
+    deadline = time.perf_counter() + time_limit
+    weeks_limit = max_weeks if max_weeks > 0 else float("inf")
+    cost_limit = max_cost if max_cost > 0 else float("inf")
+    gap_count = len(gap_weights)
+    gap_weight_vector = np.array(gap_weights, dtype=np.float64)
+    all_weeks = np.array(weeks, dtype=np.float64)
+    all_costs = np.array(costs, dtype=np.float64)
+
+    mask_values = {}
+
+    def value_of(mask: int) -> float:
+        value = mask_values.get(mask)
+        if value is None:
+            value = mask_values[mask] = float(sum(weight for gap, weight in enumerate(gap_weights) if mask >> gap & 1))
+        return value
+
+    fitting = np.flatnonzero((all_weeks <= weeks_limit) & (all_costs <= cost_limit)
+                             & np.array([mask != 0 for mask in covers], dtype=bool))
+    # Unpack the bitmasks 32 gaps at a time, so masks of any width stay vectorized
+    fitting_masks = [covers[i] for i in fitting.tolist()]
+    coverage = np.zeros((len(fitting), gap_count), dtype=bool)
+    for low in range(0, gap_count, 32):
+        width = min(32, gap_count - low)
+        chunk = np.array([mask >> low & 0xFFFFFFFF for mask in fitting_masks], dtype=np.uint64)
+        coverage[:, low:low + width] = (chunk[:, None] >> np.arange(width, dtype=np.uint64)) & np.uint64(1)
+    fitting_weeks, fitting_costs = all_weeks[fitting], all_costs[fitting]
+
+    # Greedy seed: repeatedly take the course adding the most uncovered weight per week
+    greedy, covered = [], np.zeros(gap_count, dtype=bool)
+    weeks_used = cost_used = 0.0
+    while len(greedy) < max_courses:
+        gains = coverage @ np.where(covered, 0.0, gap_weight_vector)
+        fits = (gains > 0) & (fitting_weeks <= weeks_limit - weeks_used) & (fitting_costs <= cost_limit - cost_used)
+        if not fits.any():
+            break
+        row = int(np.argmax(np.where(fits, gains / np.maximum(fitting_weeks, 1e-9), -1.0)))
+        greedy.append(int(fitting[row]))
+        covered |= coverage[row]
+        weeks_used += float(fitting_weeks[row])
+        cost_used += float(fitting_costs[row])
+
+    def mask_of(selection: List[int]) -> int:
+        mask = 0
+        for i in selection:
+            mask |= covers[i]
+        return mask
+
+    best = {"value": value_of(mask_of(greedy)), "weeks": weeks_used, "selection": greedy}
+    if initial:
+        initial_value, initial_weeks = value_of(mask_of(initial)), sum(weeks[i] for i in initial)
+        if initial_value > best["value"] or (initial_value == best["value"] and initial_weeks < best["weeks"]):
+            best.update(value=initial_value, weeks=initial_weeks, selection=list(initial))
+    # Nothing can beat covering every gap some fitting course covers
+    coverable_value = float(gap_weight_vector[coverage.any(axis=0)].sum()) if len(fitting) else 0.0
+    if best["value"] >= coverable_value or time.perf_counter() > deadline:
+        return best["selection"]
+
+    # Per gap set keep the courses not beaten on both weeks and cost
+    frame = pd.DataFrame({"mask": [covers[i] for i in fitting], "weeks": fitting_weeks, "cost": fitting_costs,
+                          "row": np.arange(len(fitting))}).sort_values(["weeks", "cost", "row"], kind="stable")
+    previous_cheapest = frame.groupby("mask", sort=False)["cost"].cummin().groupby(frame["mask"], sort=False).shift(1)
+    rows = frame["row"].to_numpy()[(previous_cheapest.isna() | (frame["cost"] < previous_cheapest)).to_numpy()]
+    dominated = np.zeros(len(rows), dtype=bool)
+    distinct_masks = list(dict.fromkeys(covers[fitting[row]] for row in rows.tolist()))
+    # Drop courses whose gaps are a strict subset of an earlier, no more expensive course;
+    # skipped for very wide gap sets or when the mask comparison would be too large to be worth it
+    if gap_count <= 63 and len(distinct_masks) * len(rows) <= 4_000_000:
+        mask_positions = {mask: position for position, mask in enumerate(distinct_masks)}
+        distinct_array = np.array(distinct_masks, dtype=np.uint64)
+        strict_superset = (((distinct_array[:, None] & distinct_array[None, :]) == distinct_array[None, :])
+                           & (distinct_array[:, None] != distinct_array[None, :]))
+        row_masks = np.array([mask_positions[covers[fitting[row]]] for row in rows.tolist()], dtype=np.int64)
+        cheapest = np.full(len(distinct_masks), np.inf)
+        for course_weeks in np.unique(fitting_weeks[rows]):
+            group = np.flatnonzero(fitting_weeks[rows] == course_weeks)
+            np.minimum.at(cheapest, row_masks[group], fitting_costs[rows][group])
+            cheapest_superset = np.where(strict_superset[:, row_masks[group]], cheapest[:, None], np.inf).min(axis=0)
+            dominated[group] = cheapest_superset <= fitting_costs[rows][group]
+    rows = rows[~dominated]
+    values = coverage[rows].astype(np.float64) @ gap_weight_vector
+    rows = rows[np.argsort(-values / np.maximum(fitting_weeks[rows], 1e-9), kind="stable")]
+    kept = fitting[rows].tolist()
+    coverage, kept_weeks, kept_costs = coverage[rows], fitting_weeks[rows], fitting_costs[rows]
+
+    def finished() -> bool:
+        return best["value"] >= coverable_value or time.perf_counter() > deadline
+
+    def search(start: int, mask: int, covered: np.ndarray, weeks_used: float, cost_used: float, selection: List[int]):
+        value = value_of(mask)
+        if value > best["value"] or (value == best["value"] and weeks_used < best["weeks"]):
+            best.update(value=value, weeks=weeks_used, selection=list(selection))
+        courses_left = max_courses - len(selection)
+        if courses_left <= 0 or finished():
+            return
+        weeks_left = weeks_limit - weeks_used
+        gains = coverage[start:] @ np.where(covered, 0.0, gap_weight_vector)
+        fits = (gains > 0) & (kept_weeks[start:] <= weeks_left) & (kept_costs[start:] <= cost_limit - cost_used)
+        positions = np.flatnonzero(fits)
+        if not len(positions):
+            return
+        fitting_gains, fitting_weeks = gains[positions], kept_weeks[start:][positions]
+        by_ratio = np.argsort(-fitting_gains / np.maximum(fitting_weeks, 1e-9), kind="stable")
+        cumulative_weeks = np.cumsum(fitting_weeks[by_ratio])
+        whole = int(np.searchsorted(cumulative_weeks, weeks_left, side="right"))
+        weeks_bound = float(fitting_gains[by_ratio[:whole]].sum())
+        if whole < len(by_ratio):
+            spare_weeks = weeks_left - (cumulative_weeks[whole - 1] if whole else 0.0)
+            weeks_bound += float(fitting_gains[by_ratio[whole]]) * spare_weeks / max(float(fitting_weeks[by_ratio[whole]]), 1e-9)
+        count_bound = float(np.sort(fitting_gains)[-courses_left:].sum())
+        bound = value + min(weeks_bound, count_bound, float(gap_weight_vector[~covered].sum()))
+        if bound < best["value"] or (bound == best["value"] and weeks_used >= best["weeks"]):
+            return
+        for position in (start + positions).tolist():
+            if finished():
+                return
+            if covers[kept[position]] | mask == mask or weeks_used + kept_weeks[position] > weeks_limit \
+                    or cost_used + kept_costs[position] > cost_limit:
+                continue
+            selection.append(kept[position])
+            search(position + 1, mask | covers[kept[position]], covered | coverage[position],
+                   weeks_used + float(kept_weeks[position]), cost_used + float(kept_costs[position]), selection)
+            selection.pop()
+
+    search(0, 0, np.zeros(gap_count, dtype=bool), 0.0, 0.0, [])
+    return best["selection"]
+
+def planner_gap_targets(skill_gaps_with_proficiency: List[Dict], requested_skills, skill_proficiency: Dict) -> List[tuple]:
+    """
+    (skill, current_value, target_value, weight) for every gap, plus requested skills that are
+    not gaps (weight 1, any level above the current one). Weight is the number of levels missing.
+    Gaps keep the current level they were computed with; requested skills are looked up in the
+    profile by taxonomy id, so aliases such as "python3" find "Python".
+    """
+    targets, seen = [], set()
+    for gap in skill_gaps_with_proficiency:
+        current_value = get_proficiency_value(gap["Current Proficiency"])
+        target_value = get_proficiency_value(gap["Target Proficiency"])
+        targets.append((gap["Skill"], current_value, target_value, max(1, target_value - current_value)))
+        seen.add(skill_key(gap["Skill"]))
+    proficiency_by_id = {skill_taxonomy.intern(skill): label for skill, label in (skill_proficiency or {}).items()}
+    for skill in requested_skills:
+        if skill_key(skill) not in seen:
+            seen.add(skill_key(skill))
+            current_label = proficiency_by_id.get(skill_taxonomy.intern(skill), "Beginner")
+            targets.append((skill, get_proficiency_value(current_label), 4, 1))
+    return targets
+
+def plan_learning_path_locally(employee_profile: Dict, gap_targets: List[tuple], time_constraint: int,
+                               shorten_duration: bool = False, max_courses: int = LOCAL_PLANNER_MAX_COURSES,
+                               budget: float = 0, candidates: Optional[List[Dict]] = None) -> Dict:
+    """
+    Deterministic learning path in the generate_enhanced_learning_path format, without an LLM.
+
+    Greedy weighted set cover: each gap is an element weighted by its size, a catalog course
+    covers the gaps it teaches at a difficulty within the gap's band, and the course covering
+    the most uncovered weight per week (per week squared with `shorten_duration`) is taken
+    until every gap is covered, `max_courses` is reached or nothing else fits the
+    `time_constraint` total or the cost `budget`. optimize_course_selection then improves on
+    that selection within the same budgets (with `shorten_duration`, within the greedy path's
+    weeks), weighting critical gaps higher. Completed courses are skipped and the chosen
+    courses are ordered by difficulty, so schedule_learning_path only has to pull prerequisites forward.
+    `candidates` replaces the catalog ranking with a precomputed course pool (a role template).
+    """
+    completed_titles = set(employee_profile.get("completed_courses", []))
+    if candidates is None:
+        candidates = course_index.rank_courses_for_gaps(
+            [(skill, current_value, target_value) for skill, current_value, target_value, _ in gap_targets],
+            excluded_titles=completed_titles
+        )
+    else:
+        candidates = [course for course in candidates if course["title"] not in completed_titles]
+    gap_ids = [skill_taxonomy.resolve(skill) for skill, _, _, _ in gap_targets]
+    covers = []
+    for course in candidates:
+        course_skill_ids = skill_taxonomy.ids(course["skills"])
+        difficulty = get_proficiency_value(course["difficulty"])
+        covers.append({
+            gap for gap, (skill_id, (_, current_value, target_value, _)) in enumerate(zip(gap_ids, gap_targets))
+            if skill_id in course_skill_ids and current_value <= difficulty <= target_value
+        })
+
+    # The same weeks are checked against the time constraint, summed into the total and given to the optimizer;
+    # only the greedy ranking floors them at one week so very short courses don't dominate
+    course_weeks = [course["duration_weeks"] for course in candidates]
+    chosen, covered, total_weeks, total_cost = [], set(), 0, 0
+    remaining = list(range(len(candidates)))
+    while remaining and len(chosen) < max_courses:
+        best, best_score = None, 0.0
+        for i in remaining:
+            if time_constraint > 0 and total_weeks + course_weeks[i] > time_constraint:
+                continue
+            if budget > 0 and total_cost + candidates[i].get("cost", 0) > budget:
+                continue
+            gain = sum(gap_targets[gap][3] for gap in covers[i] - covered)
+            ranking_weeks = max(1, course_weeks[i])
+            score = gain / (ranking_weeks ** 2 if shorten_duration else ranking_weeks)
+            if score > best_score:
+                best, best_score = i, score
+        if best is None:
+            break
+        chosen.append(best)
+        covered |= covers[best]
+        total_weeks += course_weeks[best]
+        total_cost += candidates[best].get("cost", 0)
+        remaining.remove(best)
+
+    greedy_weeks = total_weeks
+    chosen = optimize_course_selection(
+        [sum(1 << gap for gap in course_covers) for course_covers in covers],
+        course_weeks,
+        [course.get("cost", 0) for course in candidates],
+        [levels * (CRITICAL_GAP_WEIGHT if levels >= 2 else 1) for _, _, _, levels in gap_targets],
+        max_weeks=(greedy_weeks or time_constraint) if shorten_duration else time_constraint,
+        max_cost=budget,
+        max_courses=max_courses,
+        initial=chosen
+    )
+    covered = set().union(*(covers[i] for i in chosen))
+    total_weeks = sum(course_weeks[i] for i in chosen)
+    total_cost = sum(candidates[i].get("cost", 0) for i in chosen)
+
+    learning_path = []
+    for i in sorted(chosen, key=lambda i: (get_proficiency_value(candidates[i]["difficulty"]), chosen.index(i))):
+        course = candidates[i]
+        course_gaps = sorted(covers[i], key=lambda gap: -gap_targets[gap][3])
+        largest_gap = gap_targets[course_gaps[0]][3] if course_gaps else 0
+        learning_path.append({
+            "id": course["id"],
+            "title": course["title"],
+            "type": course["type"],
+            "duration": f"{course['duration_weeks']} weeks",
+            "duration_weeks": course["duration_weeks"],
+            "priority": "Critical" if largest_gap >= 2 else "High",
+            "reason": "Builds " + ", ".join(
+                f"{gap_targets[gap][0]} toward {get_proficiency_label_from_value(gap_targets[gap][2])}"
+                for gap in course_gaps
+            ) + f" at {course['difficulty']} level.",
+            "skills_gained": course["skills"],
+            "fits_constraints": (f"{course['duration_weeks']} of the {time_constraint} weeks available"
+                                 if time_constraint > 0 else f"{course['duration_weeks']} weeks")
+        })
+
+    addressed = [gap_targets[gap][0] for gap in sorted(covered)]
+    # Gaps no candidate teaches at all need external courses; the rest were squeezed out by the limits
+    teachable = set().union(*covers)
+    untaught = [gap_targets[gap][0] for gap in range(len(gap_targets)) if gap not in teachable]
+    unfitted = [gap_targets[gap][0] for gap in sorted(teachable - covered)]
+    limits = ([f"the {greedy_weeks}-week shortened schedule"] if shorten_duration and greedy_weeks else
+              [f"the {time_constraint} weeks available"] if time_constraint > 0 else [])
+    if budget > 0:
+        limits.append(f"the {budget:,.0f} budget")
+    if len(chosen) >= max_courses:
+        limits.append(f"the {max_courses}-course limit")
+    suggestions = []
+    if untaught:
+        suggestions.append(f"No catalog course teaches {', '.join(untaught)} at the level needed.")
+    if unfitted:
+        suggestions.append(f"Catalog courses for {', '.join(unfitted)} don't fit within {' and '.join(limits) or 'this path'}.")
+    suggestions.append("See the Udemy recommendations for external options" +
+                       (" on these skills." if suggestions else " on the same skills."))
+    difficulties = [course["difficulty"] for course in (candidates[i] for i in chosen)]
+    progression = sorted(set(difficulties), key=get_proficiency_value)
+    return {
+        "learning_path": learning_path,
+        "total_duration_weeks": total_weeks,
+        "explanation": (f"{len(learning_path)} course{'s' if len(learning_path) != 1 else ''} covering {len(addressed)} of {len(gap_targets)} skill gaps"
+                        f" in {total_weeks} weeks" + (f" for {total_cost:,.0f} of the {budget:,.0f} budget" if budget > 0 else "")
+                        + ", closing the largest and most critical gaps within the time available."
+                        if learning_path else "No catalog course closes the identified skill gaps within the time available."),
+        "skill_gaps_addressed": addressed,
+        "progression_notes": (f"Courses progress from {' to '.join(progression)} level; prerequisites are scheduled first."
+                              if len(progression) > 1 else
+                              f"All courses are at {progression[0]} level; prerequisites are scheduled first."
+                              if progression else ""),
+        "alternative_suggestions": " ".join(suggestions),
+        "udemy_courses": []
+    }
+
+def narrate_learning_path(learning_path: Dict, employee_profile: Dict) -> Dict:
+    """Replace the planner's templated explanation and progression notes with LLM-written ones (kept on failure)"""
+    prompt = f"""
+    Write a short explanation and progression notes for this learning path of a {employee_profile['current_role']}
+    with career goals {', '.join(employee_profile['career_goals'])}. Do not add or remove courses.
+
+    LEARNING PATH:
+    {json.dumps([{key: course.get(key) for key in ('title', 'duration_weeks', 'priority', 'reason')} for course in learning_path['learning_path']])}
+
+    SKILL GAPS ADDRESSED: {', '.join(learning_path['skill_gaps_addressed'])}
+
+    Return JSON: {{"explanation": "...", "progression_notes": "..."}}
+    """
+    try:
+        response = gemini_model.generate_content(prompt, generation_config={"temperature": 0.3, "max_output_tokens": 512})
+        raw_text = response.text
+        match = re.search(r'```json\s*(\{[\s\S]*\})\s*```', raw_text)
+        narrative = json.loads(match.group(1) if match else raw_text)
+        for key in ("explanation", "progression_notes"):
+            if isinstance(narrative.get(key), str) and narrative[key].strip():
+                learning_path[key] = narrative[key]
+    except Exception:
+        pass
+    return learning_path
+
+ROLE_TEMPLATE_CACHE_SIZE = 256  # (role, career goals) templates kept per catalog and requirements version
+
+@dataclass
+class RoleLearningPathTemplate:
+    """
+    Shared starting point for every employee with the same role and career goals: the catalog
+    courses that teach any of the combination's target skills at or below the target level
+    (a superset of what any one employee's gaps can use), and Udemy results per skill, fetched
+    the first time an employee with this template needs the skill and refetched once older
+    than LEARNING_PATH_CACHE_TTL. A fetch runs outside the lock; concurrent callers needing
+    the same skill wait on its future instead of searching again.
+    """
+    current_role: str
+    career_goals: tuple
+    candidates: List[Dict]
+    udemy_courses: Dict[str, tuple] = field(default_factory=dict)  # skill -> (fetched at, Future of course dicts)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def _udemy_courses_for_skill(self, skill: str) -> List[Dict]:
+        with self.lock:
+            entry = self.udemy_courses.get(skill)
+            fetch = (entry is None or (entry[1].done() and time.time() - entry[0] > LEARNING_PATH_CACHE_TTL))
+            if fetch:
+                entry = self.udemy_courses[skill] = (time.time(), Future())
+        future = entry[1]
+        if fetch:
+            try:
+                future.set_result([
+                    {
+                        "id": course.id,
+                        "title": course.title,
+                        "url": course.url,
+                        "description": course.description,
+                        "rating": course.rating,
+                        "price": course.price,
+                        "duration": course.duration,
+                        "level": course.level
+                    }
+                    for course in udemy_agent.generate_udemy_courses([skill], self.current_role)
+                ])
+            except Exception as e:
+                # Do not memoize the failure; the next caller searches again
+                with self.lock:
+                    if self.udemy_courses.get(skill) is entry:
+                        del self.udemy_courses[skill]
+                future.set_exception(e)
+        return future.result()
+
+    def udemy_courses_for(self, skills: List[str]) -> List[Dict]:
+        return [dict(course) for skill in skills for course in self._udemy_courses_for_skill(skill)]
+
+class RoleTemplateLibrary:
+    """LRU of role templates, built on first use, for one catalog and role requirements version"""
+
+    def __init__(self, catalog_index: CourseCatalogIndex, role_matrix: RoleRequirementMatrix,
+                 max_entries: int = ROLE_TEMPLATE_CACHE_SIZE):
+        self._catalog_index = catalog_index
+        self._role_matrix = role_matrix
+        self._templates = OrderedDict()  # (current role, career goals) -> RoleLearningPathTemplate
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def template(self, current_role: str, career_goals) -> RoleLearningPathTemplate:
+        key = (current_role, tuple(career_goals or ()))
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self._templates.move_to_end(key)
+                return template
+        target_vector = self._role_matrix.target_vector(*key)
+        template = RoleLearningPathTemplate(
+            current_role, key[1],
+            self._catalog_index.rank_courses_for_gaps(
+                [(skill, 0, target_value) for skill, target_value in zip(target_vector.skill_names, target_vector.targets.tolist())]
+            )
+        )
+        with self._lock:
+            template = self._templates.setdefault(key, template)
+            self._templates.move_to_end(key)
+            while len(self._templates) > self._max_entries:
+                self._templates.popitem(last=False)
+        return template
+
+@st.cache_resource(max_entries=2)
+def get_role_template_library(catalog_version: str, requirements_version: str, _catalog_index: CourseCatalogIndex,
+                              _role_requirements: Dict) -> RoleTemplateLibrary:
+    return RoleTemplateLibrary(_catalog_index, get_role_requirement_matrix(requirements_version, _role_requirements))
+
+def generate_template_learning_path(employee_profile: Dict, learning_preferences, specific_requirements=None,
+                                    narrate: bool = False) -> Dict:
+    """
+    Learning path personalized from the employee's role template without an LLM call: the
+    template's courses are planned against the employee's own gaps (so completed courses and
+    proficiency already met drop out), requested skills add their catalog courses, and Udemy
+    results come from the template's per-skill memo. `narrate` has Gemini rewrite the
+    explanation afterwards.
+    """
+    template = get_role_template_library(
+        course_catalog_version, role_requirements_version, course_index, role_requirements
+    ).template(employee_profile.get("current_role"), employee_profile.get("career_goals"))
+
+    skill_gaps_with_proficiency = get_employee_skill_gaps(employee_profile)
+    requested_skills = list(learning_preferences.specific_skills_requested or [])
+    for requirement in ("mentioned_skills", "skills_to_focus"):
+        if specific_requirements and specific_requirements.get(requirement):
+            requested_skills.extend(specific_requirements[requirement])
+    gap_skills = {gap["Skill"] for gap in skill_gaps_with_proficiency}
+    requested_skills = sorted(set(requested_skills) - gap_skills)
+    skill_proficiency = employee_profile.get("skill_proficiency", {})
+    gap_targets = planner_gap_targets(skill_gaps_with_proficiency, requested_skills, skill_proficiency)
+
+    candidates = list(template.candidates)
+    template_ids = {course["id"] for course in candidates}
+    requested_targets = [(skill, current_value, target_value) for skill, current_value, target_value, _ in gap_targets
+                         if skill not in gap_skills]
+    if requested_targets:
+        candidates += [course for course in course_index.rank_courses_for_gaps(requested_targets)
+                       if course["id"] not in template_ids]
+
+    time_constraint = learning_preferences.time_available_weeks
+    if specific_requirements and specific_requirements.get("time_available_weeks"):
+        time_constraint = specific_requirements["time_available_weeks"]
+    result = plan_learning_path_locally(
         employee_profile,
-        current_role_reqs,
-        career_goal_reqs_list
+        gap_targets,
+        time_constraint,
+        shorten_duration=bool(specific_requirements and specific_requirements.get("shorten_duration")),
+        budget=learning_preferences.budget,
+        candidates=candidates
     )
+    if narrate:
+        result = narrate_learning_path(result, employee_profile)
+    result["udemy_courses"] = template.udemy_courses_for([skill for skill, _, _, _ in gap_targets])
+    # Prerequisites first, with each course's earliest feasible start
+    return schedule_learning_path(result, course_prerequisites)
+
+LEARNING_PATH_CACHE_SIZE = 1024  # Generated paths kept in memory
+LEARNING_PATH_CACHE_TTL = float(os.environ.get("LEARNING_PATH_CACHE_TTL", 24 * 3600))  # Seconds; Udemy results go stale
+LEARNING_PATH_CACHE_DIR = os.environ.get("LEARNING_PATH_CACHE_DIR", "")  # Optional on-disk tier; empty disables it
+
+def learning_path_cache_key(employee_profile: Dict, learning_preferences, specific_requirements: Optional[Dict]) -> str:
+    """
+    Content hash of everything a generated path depends on: the profile fields used for
+    generation, the learning preferences, the specific requirements, the catalog and role
+    requirements versions, and the planner settings. List order does not matter.
+    """
+    preferences = {name: getattr(learning_preferences, name) for name in learning_preferences.__dataclass_fields__}
+    preferences["specific_skills_requested"] = sorted(preferences.get("specific_skills_requested") or [])
+    content = {
+        "current_role": employee_profile.get("current_role"),
+        "skill_proficiency": employee_profile.get("skill_proficiency") or {},
+        "completed_courses": sorted(employee_profile.get("completed_courses") or []),
+        "career_goals": sorted(employee_profile.get("career_goals") or []),
+        "preferences": preferences,
+        "specific_requirements": specific_requirements or {},
+        "course_catalog_version": course_catalog_version,
+        "role_requirements_version": role_requirements_version,
+        "planner": [LEARNING_PATH_PLANNER, LEARNING_PATH_NARRATIVE],
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+class LearningPathCache:
+    """
+    Generated learning paths by content hash, shared by all sessions. The memory tier is an
+    LRU of `max_entries`; with `cache_dir` set, paths are also written as one JSON file per
+    key, so they survive restarts and are shared between worker processes. Entries older
+    than `ttl` seconds are ignored in both tiers. Callers get their own copy of a path.
+    """
+
+    def __init__(self, max_entries: int = LEARNING_PATH_CACHE_SIZE, ttl: float = LEARNING_PATH_CACHE_TTL,
+                 cache_dir: str = LEARNING_PATH_CACHE_DIR):
+        self._entries = OrderedDict()  # key -> (stored_at, learning path)
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._cache_dir, key[:2], f"{key}.json")
+
+    def _store_in_memory(self, key: str, stored_at: float, learning_path: Dict):
+        self._entries[key] = (stored_at, learning_path)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] > self._ttl:
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None and self._cache_dir:
+            try:
+                with open(self._path(key), 'r', encoding='utf-8') as f:
+                    saved = json.load(f)
+                if now - saved["stored_at"] <= self._ttl:
+                    entry = (saved["stored_at"], saved["learning_path"])
+                    with self._lock:
+                        self._store_in_memory(key, *entry)
+            except (OSError, ValueError, KeyError):
+                entry = None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return copy.deepcopy(entry[1])
+
+    def put(self, key: str, learning_path: Dict):
+        stored_at = time.time()
+        learning_path = copy.deepcopy(learning_path)
+        with self._lock:
+            self._store_in_memory(key, stored_at, learning_path)
+        if self._cache_dir:
+            path = self._path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({"stored_at": stored_at, "learning_path": learning_path}, f)
+                os.replace(tmp_path, path)
+            except OSError:
+                pass  # The disk tier is best effort; the memory tier still has the path
+
+@st.cache_resource
+def get_learning_path_cache() -> LearningPathCache:
+    return LearningPathCache()
+
+def generate_enhanced_learning_path(employee_profile, learning_preferences, specific_requirements=None):
+    """
+    build_enhanced_learning_path through the shared cache: an unchanged profile, preferences
+    and requirements under the same catalog and role requirements return the cached path
+    without planning, LLM or Udemy calls. Empty paths are not cached.
+    """
+    cache = get_learning_path_cache()
+    key = learning_path_cache_key(employee_profile, learning_preferences, specific_requirements)
+    learning_path = cache.get(key)
+    if learning_path is None:
+        learning_path = build_enhanced_learning_path(employee_profile, learning_preferences, specific_requirements)
+        if learning_path.get("learning_path") or learning_path.get("udemy_courses"):
+            cache.put(key, learning_path)
+    return learning_path
+
+BULK_GENERATION_WORKERS = int(os.environ.get("BULK_GENERATION_WORKERS", 8))
+BULK_GENERATION_ATTEMPTS = 3  # Tries per employee before it is reported as failed
+BULK_GENERATION_RETRY_DELAY = 1.0  # Seconds before the first retry; doubles for each further retry
+
+def generate_learning_paths_concurrently(jobs: Dict[str, tuple], generate=None, max_workers: int = BULK_GENERATION_WORKERS,
+                                         max_attempts: int = BULK_GENERATION_ATTEMPTS) -> Iterator[Tuple[str, Optional[Dict], Optional[str]]]:
+    """
+    Run `generate(*args)` (generate_enhanced_learning_path by default) for every
+    employee_id -> args in `jobs` on a bounded thread pool, yielding (employee_id, learning
+    path, None) or (employee_id, None, error) as each employee finishes. A failing employee is
+    retried with backoff on its own worker, so one failure never restarts the batch. Results
+    are yielded on the calling thread, which can safely update session state and progress.
+    """
+    generate = generate or generate_enhanced_learning_path
+
+    def run(args):
+        for attempt in range(max_attempts):
+            try:
+                return generate(*args)
+            except Exception:
+                if attempt == max_attempts - 1:
+                    raise
+                time.sleep(BULK_GENERATION_RETRY_DELAY * 2 ** attempt)
+
+    script_run_ctx = get_script_run_ctx()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(jobs))),
+                            initializer=lambda: add_script_run_ctx(threading.current_thread(), script_run_ctx)) as executor:
+        futures = {executor.submit(run, args): employee_id for employee_id, args in jobs.items()}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, str(e)
+
+def build_enhanced_learning_path(employee_profile, learning_preferences, specific_requirements=None):
+    if LEARNING_PATH_PLANNER == "local":
+        return generate_template_learning_path(employee_profile, learning_preferences, specific_requirements,
+                                               narrate=LEARNING_PATH_NARRATIVE == "llm")
+
+    # Calculate skill gaps based on proficiency
+    skill_gaps_with_proficiency = get_employee_skill_gaps(employee_profile)
     
     # Extract just the skill names from the gaps
     skill_gaps = [gap['Skill'] for gap in skill_gaps_with_proficiency]
@@ -4265,48 +7455,19 @@ def generate_enhanced_learning_path(employee_profile, learning_preferences, spec
     # Remove duplicates
     skill_gaps = list(set(skill_gaps))
     
-    # Filter courses based on time constraints and preferences
-    filtered_courses = course_catalog.copy()
-    
-    # Time constraint filtering
+    # Time constraint for course filtering
     time_constraint = learning_preferences.time_available_weeks
     if specific_requirements and specific_requirements.get("time_available_weeks"):
         time_constraint = specific_requirements["time_available_weeks"]
-    
-    if time_constraint > 0:
-        # Allow some flexibility (±1 week)
-        filtered_courses = filtered_courses[
-            (filtered_courses["duration_weeks"] <= time_constraint + 1) &
-            (filtered_courses["duration_weeks"] >= max(1, time_constraint - 2))
-        ]
-    
-    # If shortening duration is requested, prioritize shorter courses
-    if specific_requirements and specific_requirements.get("shorten_duration"):
-        filtered_courses = filtered_courses.sort_values(by="duration_weeks", ascending=True)
 
-    # Filter by relevant skills and proficiency
-    relevant_courses = []
+    # Gap bands for ranking catalog courses against the whole gap set at once
     employee_current_proficiency = employee_profile.get("skill_proficiency", {})
-
-    for _, course in filtered_courses.iterrows():
-        course_skills = course["skills"]
-        course_difficulty = course["difficulty"]
-        
-        # Check if course addresses any identified skill gap at the appropriate proficiency level
-        for gap_info in skill_gaps_with_proficiency:
-            gap_skill = gap_info['Skill']
-            target_proficiency = gap_info['Target Proficiency']
-            current_proficiency = employee_current_proficiency.get(gap_skill, "Beginner")
-
-            if gap_skill in course_skills:
-                # Prioritize courses that move proficiency towards the target
-                # This is a simplified logic; a more complex model could use a scoring system
-                if get_proficiency_value(course_difficulty) >= get_proficiency_value(current_proficiency) and \
-                   get_proficiency_value(course_difficulty) <= get_proficiency_value(target_proficiency):
-                    if course["title"] not in employee_profile["completed_courses"]:
-                        relevant_courses.append(course.to_dict())
-                        break # Move to next course once a relevant gap is found
-
+    gap_levels = [
+        (gap_info['Skill'],
+         get_proficiency_value(gap_info['Current Proficiency']),
+         get_proficiency_value(gap_info['Target Proficiency']))
+        for gap_info in skill_gaps_with_proficiency
+    ]
     # Generate Udemy courses for alternative suggestions
     udemy_courses = []
     skills_for_udemy = skill_gaps or learning_preferences.specific_skills_requested or []
@@ -4314,6 +7475,45 @@ def generate_enhanced_learning_path(employee_profile, learning_preferences, spec
         with st.spinner("🔍 Finding top Udemy courses..."):
             udemy_courses = udemy_agent.generate_udemy_courses(skills_for_udemy,employee_profile["current_role"])  # Limit to 3 skills
     
+    udemy_course_dicts = [
+        {
+            "id": course.id, # Include ID for Udemy courses
+            "title": course.title,
+            "url": course.url,
+            "description": course.description,
+            "rating": course.rating,
+            "price": course.price,
+            "duration": course.duration,
+            "level": course.level
+        }
+        for course in udemy_courses
+    ]
+    shorten_duration = bool(specific_requirements and specific_requirements.get("shorten_duration"))
+    requested_skills = [skill for skill in skill_gaps if skill not in {gap['Skill'] for gap in skill_gaps_with_proficiency}]
+
+    def plan_locally():
+        # Fallback when the AI planner fails; the Udemy results are already fetched
+        result = plan_learning_path_locally(
+            employee_profile,
+            planner_gap_targets(skill_gaps_with_proficiency, sorted(requested_skills), employee_current_proficiency),
+            time_constraint,
+            shorten_duration=shorten_duration,
+            budget=learning_preferences.budget
+        )
+        if LEARNING_PATH_NARRATIVE == "llm":
+            result = narrate_learning_path(result, employee_profile)
+        result["udemy_courses"] = udemy_course_dicts
+        # Prerequisites first, with each course's earliest feasible start
+        return schedule_learning_path(result, course_prerequisites)
+
+    relevant_courses = course_index.rank_courses_for_gaps(
+        gap_levels,
+        time_constraint=time_constraint,
+        excluded_titles=employee_profile["completed_courses"],
+        # If shortening duration is requested, prioritize shorter courses
+        prefer_shorter=shorten_duration
+    )
+
     # Create enhanced prompt
     prompt = f"""
     You are an expert learning path advisor. Create a personalized learning path for an employee.
@@ -4408,33 +7608,14 @@ def generate_enhanced_learning_path(employee_profile, learning_preferences, spec
             result = json.loads(raw_text)
         
         # Add Udemy courses to the result
-        result["udemy_courses"] = [
-            {
-                "id": course.id, # Include ID for Udemy courses
-                "title": course.title,
-                "url": course.url,
-                "description": course.description,
-                "rating": course.rating,
-                "price": course.price,
-                "duration": course.duration,
-                "level": course.level
-            }
-            for course in udemy_courses
-        ]
+        result["udemy_courses"] = udemy_course_dicts
         
-        return result
+        # Prerequisites first, with each course's earliest feasible start
+        return schedule_learning_path(result, course_prerequisites)
         
     except Exception as e:
-        st.error(f"Error generating learning path: {e}")
-        return {
-            "learning_path": [],
-            "explanation": "Error generating learning path. Please try again.",
-            "skill_gaps_addressed": [],
-            "total_duration_weeks": 0,
-            "progression_notes": "",
-            "alternative_suggestions": "",
-            "udemy_courses": []
-        }
+        st.warning(f"AI planner unavailable ({e}); using the local planner instead.")
+        return plan_locally()
 
 #update
 def add_courses_to_learning_path(current_path, skills_to_add, employee_profile, learning_preferences):
@@ -4444,34 +7625,30 @@ def add_courses_to_learning_path(current_path, skills_to_add, employee_profile,
     
     # Filter courses for the new skills
     new_courses = []
-    filtered_courses = course_catalog.copy()
     
     # Apply existing time constraints
     time_constraint = learning_preferences.time_available_weeks
-    if time_constraint > 0:
-        filtered_courses = filtered_courses[
-            (filtered_courses["duration_weeks"] <= time_constraint + 1) &
-            (filtered_courses["duration_weeks"] >= max(1, time_constraint - 2))
-        ]
-    
-    # Find courses for new skills
-    for _, course in filtered_courses.iterrows():
-        if any(skill.lower() in [s.lower() for s in course["skills"]] for skill in skills_to_add):
-            if course["title"] not in employee_profile["completed_courses"]:
-                # Check if course is not already in learning path
-                existing_titles = [c.get("title", "") for c in current_path.get("learning_path", [])] if current_path else []
-                if course["title"] not in existing_titles:
-                    new_courses.append({
-                        "id": course["id"], # Include ID
-                        "title": course["title"],
-                        "type": course["type"],
-                        "duration": f"{course['duration_weeks']} weeks",
-                        "duration_weeks": course["duration_weeks"],
-                        "priority": "High",  # New requested skills get high priority
-                        "reason": f"Added based on your request to learn {', '.join(skills_to_add)}",
-                        "skills_gained": course["skills"],
-                        "fits_constraints": "Matches your learning preferences and time constraints"
-                    })
+    existing_titles = {c.get("title", "") for c in current_path.get("learning_path", [])} if current_path else set()
+    
+    # Find courses for new skills through the skill index
+    for course_id in course_index.course_ids_for_skills(skills_to_add):
+        course = course_index.courses[course_id]
+        if not course_fits_time_window(course["duration_weeks"], time_constraint):
+            continue
+        # Skip completed courses and courses already in the learning path
+        if course["title"] in employee_profile["completed_courses"] or course["title"] in existing_titles:
+            continue
+        new_courses.append({
+            "id": course["id"], # Include ID
+            "title": course["title"],
+            "type": course["type"],
+            "duration": f"{course['duration_weeks']} weeks",
+            "duration_weeks": course["duration_weeks"],
+            "priority": "High",  # New requested skills get high priority
+            "reason": f"Added based on your request to learn {', '.join(skills_to_add)}",
+            "skills_gained": course["skills"],
+            "fits_constraints": "Matches your learning preferences and time constraints"
+        })
     
     # Generate Udemy courses for new skills
     new_udemy_courses = []
@@ -4512,7 +7689,7 @@ def add_courses_to_learning_path(current_path, skills_to_add, employee_profile,
     updated_path["skill_gaps_addressed"].extend(skills_to_add)
     updated_path["explanation"] += f"\n\n🆕 Added courses for: {', '.join(skills_to_add)}"
     
-    return updated_path, new_courses
+    return schedule_learning_path(updated_path, course_prerequisites), new_courses
 
 def remove_courses_from_learning_path(current_path, skills_to_remove):
     """
@@ -4522,12 +7699,13 @@ def remove_courses_from_learning_path(current_path, skills_to_remove):
         updated_path = current_path.copy()
     removed_courses = []
     
+    skill_ids_to_remove = skill_taxonomy.ids(skills_to_remove)
+    
     # Remove internal courses
     remaining_courses = []
     for course in updated_path.get("learning_path", []):
-        course_skills = course.get("skills_gained", [])
         # Check if any of the course skills match skills to remove
-        if any(skill.lower() in [s.lower() for s in course_skills] for skill in skills_to_remove):
+        if skill_taxonomy.ids(course.get("skills_gained", [])) & skill_ids_to_remove:
             removed_courses.append(course["title"])
         else:
             remaining_courses.append(course)
@@ -4547,10 +7725,38 @@ def remove_courses_from_learning_path(current_path, skills_to_remove):
     # Update metadata
     updated_path["total_duration_weeks"] = sum(c.get("duration_weeks", 0) for c in updated_path["learning_path"])
     updated_path["skill_gaps_addressed"] = [s for s in updated_path.get("skill_gaps_addressed", []) 
-                                          if s.lower() not in [skill.lower() for skill in skills_to_remove]]
+                                          if skill_taxonomy.intern(s) not in skill_ids_to_remove]
     updated_path["explanation"] += f"\n\n🗑️ Removed courses for skills you already know: {', '.join(skills_to_remove)}"
     
-    return updated_path, removed_courses
+    return schedule_learning_path(updated_path, course_prerequisites), removed_courses
+
+# Only explicit course searches short-circuit: a verb plus a course/training noun phrase
+# ("find courses about X", "show me trainings on X") or "search for X". Anything else, such as
+# "recommend a learning path for me", goes through intent detection.
+CATALOG_SEARCH_PATTERN = re.compile(
+    r"^\s*(?:please\s+)?(?:"
+    r"(?:find|search(?:\s+for)?|show(?:\s+me)?|list|look\s+for|recommend)\s+(?:me\s+)?"
+    r"(?:internal\s+|catalog\s+|some\s+|any\s+)?(?:courses?|trainings?|learning\s+resources)\s+(?:about|on|for|in|covering)\s+"
+    r"|search\s+(?:the\s+catalog\s+)?for\s+"
+    r")(?P<query>.+?)[\s.?!]*$",
+    re.IGNORECASE
+)
+
+def extract_catalog_search_query(user_input: str) -> Optional[str]:
+    """Search topic of a "find courses about X" / "search for X" request; Udemy and web requests are left to intent detection"""
+    match = CATALOG_SEARCH_PATTERN.match(user_input)
+    if not match or re.search(r"\b(?:udemy|web|online|internet|news|latest)\b", user_input, re.IGNORECASE):
+        return None
+    return match.group("query")
+
+def format_catalog_search_results(query: str, results: List[Dict]) -> str:
+    response = f"📚 **Catalog courses for: {query}**\n\n"
+    for i, course in enumerate(results, 1):
+        response += f"**{i}. {course['title']}** ({course['id']})\n"
+        response += f"⏱️ {course['duration']} • 📊 {course['difficulty']} • 🎯 {', '.join(course['skills'])}\n"
+        response += f"📝 {course['description']}\n\n"
+    response += "Would you like me to add any of these courses to your learning path?"
+    return response
 
 def process_enhanced_user_input(user_input):
     """
@@ -4562,6 +7768,15 @@ def process_enhanced_user_input(user_input):
         message_placeholder = st.empty()
         message_placeholder.markdown("🤔 Understanding your request...")
     
+    # Catalog searches are answered from the local search index, without an intent round trip
+    catalog_query = extract_catalog_search_query(user_input)
+    catalog_results = search_course_catalog(catalog_query) if catalog_query else []
+    if catalog_results:
+        response = format_catalog_search_results(catalog_query, catalog_results)
+        st.session_state.messages.append({"role": "assistant", "content": response})
+        message_placeholder.markdown(response)
+        return
+    
     # Get current learning path
     current_learning_path = st.session_state.get('learning_path', {})
     conversation_history = st.session_state.get('messages', [])
@@ -4599,14 +7814,12 @@ def process_enhanced_user_input(user_input):
                 # Initialize progress for newly added courses
                 for course in new_courses:
                     course_id = course.get('id')
-                    if course_id and employee_id not in st.session_state.learning_path_progress:
-                        st.session_state.learning_path_progress[employee_id] = {}
                     if course_id:
-                        st.session_state.learning_path_progress[employee_id][course_id] = {
+                        set_course_progress(employee_id, course_id, {
                             "status": "Not Started", 
                             "start_date": None, 
                             "completion_date": None
-                        }
+                        })
             
             response = f"✅ **Added {len(new_courses)} new courses to your learning path for: {', '.join(skills_to_add)}**\n\n"
             response += "**New Courses Added:**\n"
@@ -4647,7 +7860,7 @@ def process_enhanced_user_input(user_input):
                             if course_id_to_remove: break
 
                         if course_id_to_remove and course_id_to_remove in st.session_state.learning_path_progress[employee_id]:
-                            del st.session_state.learning_path_progress[employee_id][course_id_to_remove]
+                            set_course_progress(employee_id, course_id_to_remove, None)
 
             
             response = f"✅ **Removed courses for skills you already know: {', '.join(skills_to_remove)}**\n\n"
@@ -4685,23 +7898,7 @@ def process_enhanced_user_input(user_input):
         # Reset progress for the new path
         employee_id = get_current_employee_id()
         if employee_id:
-            st.session_state.learning_path_progress[employee_id] = {}
-            for course in result.get('learning_path', []):
-                course_id = course.get('id')
-                if course_id:
-                    st.session_state.learning_path_progress[employee_id][course_id] = {
-                        "status": "Not Started", 
-                        "start_date": None, 
-                        "completion_date": None
-                    }
-            for course in result.get('udemy_courses', []):
-                course_id = course.get('id')
-                if course_id:
-                    st.session_state.learning_path_progress[employee_id][course_id] = {
-                        "status": "Not Started", 
-                        "start_date": None, 
-                        "completion_date": None
-                    }
+            initialize_learning_path_progress(employee_id, result)
 
         response = f"🔄 **Complete Learning Path Regenerated!**\n\n"
         response += f"**Reason:** {intent_result['reasoning']}\n\n"
@@ -4712,12 +7909,17 @@ def process_enhanced_user_input(user_input):
         response += f"**Strategy:** {result.get('explanation', '')}"
     
     elif intent_result["action_required"] == "search_web":
-        message_placeholder.markdown("🔍 Searching the web for information...")
-        
-        search_query = intent_result["extracted_info"].get("search_query", user_input)
-        search_results = search_agent.search_web(search_query, max_results=5)
-        
-        if search_results:
+        search_query = intent_result["extracted_info"].get("search_query") or user_input
+        # Internal catalog first; the web is only searched when it has nothing relevant
+        catalog_results = search_course_catalog(search_query)
+        search_results = []
+        if not catalog_results:
+            message_placeholder.markdown("🔍 Searching the web for information...")
+            search_results = search_agent.search_web(search_query, max_results=5)
+        
+        if catalog_results:
+            response = format_catalog_search_results(search_query, catalog_results)
+        elif search_results:
             response = f"🔍 **Search Results for: {search_query}**\n\n"
             for i, result in enumerate(search_results, 1):
                 response += f"**{i}. {result['title']}**\n"
@@ -4769,19 +7971,9 @@ def update_employee_profile():
         # Skills Section
         st.markdown("#### Skills & Proficiency")
         
-        # Get all available skills from role requirements
-        all_skills = set()
-        for role_data in role_requirements.values():
-            all_skills.update(role_data["required_skills"].keys())
-            all_skills.update(role_data["preferred_skills"].keys())
-        
-        # Add skills from course catalog
-        for _, course in course_catalog.iterrows():
-            all_skills.update(course["skills"])
-        
         skills = st.multiselect(
             "Current Skills", 
-            options=sorted(list(all_skills)), 
+            options=list(skill_taxonomy.sorted_names), 
             default=list(st.session_state.employee_profile.get("skill_proficiency", {}).keys()), # Use keys from skill_proficiency
             help="Select all skills you currently possess"
         )
@@ -4882,38 +8074,69 @@ def update_employee_profile():
 
 # --- Save/Load Functions for Persistence ---
 def save_all_learning_paths():
-    """Saves the entire employee database and learning path progress to a JSON file."""
-    data_to_save = {
-        "employee_database": st.session_state.employee_database,
-        "learning_path_progress": st.session_state.learning_path_progress
-    }
+    """
+    Queues the learning path and progress changes made since the last save for the background writer.
+    Changes are appended to the journal; once it grows past its threshold, only the shards of
+    employees it touched are rewritten.
+    """
     try:
-        with open(st.session_state.saved_learning_paths_file, 'w') as f:
-            json.dump(data_to_save, f, indent=4)
-        st.success("All learning paths and progress saved successfully!")
+        st.session_state.learning_path_saver.save(
+            st.session_state.employee_database,
+            st.session_state.learning_path_progress
+        )
+        st.info("Saving learning paths and progress in the background...")
     except Exception as e:
         st.error(f"Error saving data: {e}")
 
+def display_save_status():
+    """Shows the background saver's status and last-save latency in the sidebar"""
+    saver = st.session_state.learning_path_saver
+    if saver.status == "saving":
+        st.caption("⏳ Saving in background...")
+    elif saver.status == "saved":
+        st.caption(f"✅ Saved at {saver.last_saved_at.strftime('%H:%M:%S')} "
+                   f"({saver.last_result}, {saver.last_latency_ms:.0f} ms)")
+    elif saver.status == "failed":
+        st.caption(f"❌ Last save failed after {saver.last_latency_ms:.0f} ms: {saver.last_error}")
+
+def display_course_catalog_status():
+    """Shows which catalog version is loaded and any file that failed to parse"""
+    catalog = get_course_catalog()
+    st.caption(f"📚 Course catalog {course_catalog_version}: {len(course_catalog)} courses from {catalog.source_description}")
+    if catalog.last_error:
+        st.caption(f"⚠️ Catalog files not reloaded: {catalog.last_error}")
+    if course_prerequisites.cycles:
+        cycles = ", ".join(f"{course_id} → {prerequisite_id}" for course_id, prerequisite_id in course_prerequisites.cycles)
+        st.caption(f"⚠️ Prerequisite cycles ignored: {cycles}")
+
 def load_all_learning_paths():
-    """Loads the entire employee database and learning path progress from a JSON file."""
+    """
+    Loads learning path progress from the saved shards or legacy snapshot; both are read lazily per employee.
+    Employees missing from the employee store are restored from the saved records, and existing
+    employees get their saved learning path back. Other profile fields of existing employees are
+    kept as they are in the store, which is the live copy.
+    """
     try:
-        if os.path.exists(st.session_state.saved_learning_paths_file):
-            with open(st.session_state.saved_learning_paths_file, 'r') as f:
-                loaded_data = json.load(f)
-            
-            st.session_state.employee_database = loaded_data.get("employee_database", load_employee_database())
-            st.session_state.learning_path_progress = loaded_data.get("learning_path_progress", {})
+        # Let queued saves land first so the load sees them
+        st.session_state.learning_path_saver.wait()
+        learning_path_progress = st.session_state.progress_journal.load()
+        if learning_path_progress is not None:
+            if learning_path_progress.restore_saved_employees(st.session_state.employee_database):
+                get_skill_gap_rollups().reset()
+            st.session_state.learning_path_progress.replace(learning_path_progress)
             
             st.success("Learning paths and progress loaded successfully!")
             st.rerun()
         else:
             st.warning("No saved data found. Starting with default employee data.")
-            st.session_state.employee_database = load_employee_database()
-            st.session_state.learning_path_progress = {} # Ensure it's initialized if no file
+            st.session_state.employee_database.replace_all(load_employee_database())
+            get_skill_gap_rollups().reset()
+            st.session_state.learning_path_progress.replace({}) # Ensure it's initialized if no file
     except Exception as e:
         st.error(f"Error loading data: {e}")
-        st.session_state.employee_database = load_employee_database() # Fallback to default
-        st.session_state.learning_path_progress = {}
+        st.session_state.employee_database.replace_all(load_employee_database()) # Fallback to default
+        get_skill_gap_rollups().reset()
+        st.session_state.learning_path_progress.replace({})
 
 
 # Enhanced sidebar with learning preferences and search features
@@ -4990,14 +8213,9 @@ def enhanced_sidebar():
             )
             
             # Skill request interface
-            all_skills = set()
-            for role_data in role_requirements.values():
-                all_skills.update(role_data["required_skills"].keys())
-                all_skills.update(role_data["preferred_skills"].keys())
-            
             additional_skills = st.multiselect(
                 "Additional Skills to Learn",
-                options=sorted(list(all_skills)),
+                options=list(skill_taxonomy.sorted_names),
                 default=st.session_state.learning_preferences.specific_skills_requested or [],
                 help="Select specific skills you want to focus on"
             )
@@ -5028,9 +8246,25 @@ def enhanced_sidebar():
                 else:
                     process_enhanced_user_input("Search for learning resources about data science")
         
+        # Catalog search, answered from the local search index as the user types
+        with st.expander("📚 Course Catalog Search", expanded=False):
+            catalog_query = st.text_input(
+                "Search the internal catalog:",
+                placeholder="e.g., 'kubernetes deployment'",
+                key="catalog_search_input"
+            )
+            if catalog_query.strip():
+                catalog_results = search_course_catalog(catalog_query)
+                if catalog_results:
+                    for course in catalog_results:
+                        st.markdown(f"**{course['title']}** ({course['id']})")
+                        st.caption(f"⏱️ {course['duration']} • 📊 {course['difficulty']} • 🎯 {', '.join(course['skills'])}")
+                else:
+                    st.info("No catalog courses match that search.")
+        
         # Search Interface
         with st.expander("🔍 AI Search Assistant", expanded=False):
-            st.markdown("**Search the web for learning resources, trends, or information:**")
+            st.markdown("**Search the course catalog, then the web, for learning resources, trends, or information:**")
             search_query = st.text_input(
                 "Enter search query:",
                 placeholder="e.g., 'latest machine learning trends 2024'",
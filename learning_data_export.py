@@ -0,0 +1,405 @@
+"""
+Columnar export of employee learning paths and progress for analytics.
+
+Flattens the employee store and the saved learning path progress into three normalized tables:
+    employees        one row per employee
+    path_courses     one row per course in an employee's assigned learning path
+    progress_events  one row per (employee, course) progress status
+and writes them as CSV or Parquet in streaming chunks, so the warehouse no longer has to
+parse the pretty-printed JSON snapshot.
+
+Reads what the app persists: the SQLite employee store and the per-employee progress shards
+plus their journal (or the legacy single-file snapshot before the first save). It does not
+import the Streamlit app, so it can run from cron or a warehouse job.
+
+Usage:
+    python learning_data_export.py --out exports --format parquet
+"""
+import argparse
+import csv
+import json
+import mmap
+import os
+import re
+import sqlite3
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import unquote_plus
+
+EXPORT_CHUNK_SIZE = 10000  # Rows buffered per table before they are written
+SHARD_COMPLETE_MARKER = ".complete"  # LearningPathShards.COMPLETE_MARKER: the shards replace the snapshot once it exists
+# Structural characters the snapshot scan has to look at (as in the app's SnapshotOffsetIndex)
+SNAPSHOT_TOKEN_PATTERN = re.compile(rb'[\\"{}\[\]:,]')
+
+# Column name -> type ("string", "int" or "float"); also the Parquet schema
+TABLE_COLUMNS = {
+    "employees": {
+        "employee_id": "string",
+        "name": "string",
+        "manager_id": "string",
+        "department": "string",
+        "current_role": "string",
+        "experience_level": "string",
+        "skill_proficiency": "string",
+        "career_goals": "string",
+        "completed_courses": "string",
+        "has_learning_path": "int",
+        "path_total_duration_weeks": "float",
+    },
+    "path_courses": {
+        "employee_id": "string",
+        "position": "int",
+        "source": "string",
+        "course_id": "string",
+        "title": "string",
+        "type": "string",
+        "duration": "string",
+        "duration_weeks": "float",
+        "priority": "string",
+        "skills_gained": "string",
+        "reason": "string",
+        "url": "string",
+        "rating": "float",
+        "price": "string",
+        "level": "string",
+    },
+    "progress_events": {
+        "employee_id": "string",
+        "course_id": "string",
+        "status": "string",
+        "start_date": "string",
+        "completion_date": "string",
+    },
+}
+
+EMPLOYEE_JSON_FIELDS = ("skills", "completed_courses", "career_goals", "skill_proficiency", "assigned_learning_path")
+
+
+# --- Flattening ---
+
+def _join(values) -> str:
+    return "; ".join(str(value) for value in values or [])
+
+def _number(value, kind: str):
+    try:
+        return int(value) if kind == "int" else float(value)
+    except (TypeError, ValueError):
+        return None
+
+def employee_row(record: Dict) -> Dict:
+    learning_path = record.get("assigned_learning_path") or {}
+    return {
+        "employee_id": record.get("employee_id"),
+        "name": record.get("name"),
+        "manager_id": record.get("manager_id"),
+        "department": record.get("department"),
+        "current_role": record.get("current_role"),
+        "experience_level": record.get("experience_level"),
+        "skill_proficiency": _join(f"{skill}:{level}" for skill, level in (record.get("skill_proficiency") or {}).items()),
+        "career_goals": _join(record.get("career_goals")),
+        "completed_courses": _join(record.get("completed_courses")),
+        "has_learning_path": 1 if learning_path else 0,
+        "path_total_duration_weeks": _number(learning_path.get("total_duration_weeks"), "float"),
+    }
+
+def path_course_rows(record: Dict) -> Iterator[Dict]:
+    learning_path = record.get("assigned_learning_path") or {}
+    courses = [("internal", course) for course in learning_path.get("learning_path", [])]
+    courses += [("udemy", course) for course in learning_path.get("udemy_courses", [])]
+    for position, (source, course) in enumerate(courses, start=1):
+        yield {
+            "employee_id": record.get("employee_id"),
+            "position": position,
+            "source": source,
+            "course_id": course.get("id"),
+            "title": course.get("title"),
+            "type": course.get("type"),
+            "duration": course.get("duration"),
+            "duration_weeks": _number(course.get("duration_weeks"), "float"),
+            "priority": course.get("priority"),
+            "skills_gained": _join(course.get("skills_gained")),
+            "reason": course.get("reason"),
+            "url": course.get("url"),
+            "rating": _number(course.get("rating"), "float"),
+            "price": course.get("price"),
+            "level": course.get("level"),
+        }
+
+def progress_event_rows(employee_id: str, progress: Dict) -> Iterator[Dict]:
+    for course_id, status_info in (progress or {}).items():
+        status_info = status_info or {}
+        yield {
+            "employee_id": employee_id,
+            "course_id": course_id,
+            "status": status_info.get("status"),
+            "start_date": status_info.get("start_date"),
+            "completion_date": status_info.get("completion_date"),
+        }
+
+
+# --- Writers ---
+
+class CsvTableWriter:
+    def __init__(self, path: str, columns: Dict[str, str]):
+        self._file = open(path, 'w', encoding='utf-8', newline='')
+        self._writer = csv.DictWriter(self._file, fieldnames=list(columns))
+        self._writer.writeheader()
+
+    def write(self, rows: List[Dict]):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+class ParquetTableWriter:
+    """Writes one Parquet row group per chunk (requires pyarrow)"""
+
+    def __init__(self, path: str, columns: Dict[str, str]):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow); use --format csv otherwise")
+        self._pa = pa
+        arrow_types = {"string": pa.string(), "int": pa.int64(), "float": pa.float64()}
+        self._schema = pa.schema([(name, arrow_types[kind]) for name, kind in columns.items()])
+        self._writer = pq.ParquetWriter(path, self._schema)
+
+    def write(self, rows: List[Dict]):
+        table = self._pa.Table.from_pylist(
+            [{name: (None if row.get(name) is None else row[name]) for name in self._schema.names} for row in rows],
+            schema=self._schema
+        )
+        self._writer.write_table(table)
+
+    def close(self):
+        self._writer.close()
+
+TABLE_WRITERS = {"csv": CsvTableWriter, "parquet": ParquetTableWriter}
+
+class ChunkedTableWriter:
+    """Buffers up to `chunk_size` rows for a table and hands them to the format writer"""
+
+    def __init__(self, writer, columns: Dict[str, str], chunk_size: int):
+        self._writer = writer
+        self._string_columns = [name for name, kind in columns.items() if kind == "string"]
+        self._chunk_size = chunk_size
+        self._rows = []
+        self.row_count = 0
+
+    def add(self, row: Dict):
+        for name in self._string_columns:
+            if row.get(name) is not None and not isinstance(row[name], str):
+                row[name] = str(row[name])
+        self._rows.append(row)
+        if len(self._rows) >= self._chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self._rows:
+            self._writer.write(self._rows)
+            self.row_count += len(self._rows)
+            self._rows = []
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+
+def export_learning_data(employees: Iterable[Dict], progress: Iterable[Tuple[str, Dict]], out_dir: str,
+                         file_format: str = "csv", chunk_size: int = EXPORT_CHUNK_SIZE) -> Dict[str, int]:
+    """
+    Stream employee records and (employee_id, progress) pairs into the three export tables.
+    Returns {table name: rows written}.
+    """
+    if file_format not in TABLE_WRITERS:
+        raise ValueError(f"Unsupported export format: {file_format}")
+    os.makedirs(out_dir, exist_ok=True)
+    extension = "csv" if file_format == "csv" else "parquet"
+    tables = {}
+    try:
+        for table, columns in TABLE_COLUMNS.items():
+            writer = TABLE_WRITERS[file_format](os.path.join(out_dir, f"{table}.{extension}"), columns)
+            tables[table] = ChunkedTableWriter(writer, columns, chunk_size)
+
+        for record in employees:
+            tables["employees"].add(employee_row(record))
+            for row in path_course_rows(record):
+                tables["path_courses"].add(row)
+        for employee_id, employee_progress in progress:
+            for row in progress_event_rows(employee_id, employee_progress):
+                tables["progress_events"].add(row)
+    finally:
+        for table in tables.values():
+            table.close()
+    return {name: table.row_count for name, table in tables.items()}
+
+
+# --- Readers for the app's persisted data ---
+
+def iter_store_employees(store_path: str, batch_size: int = 1000) -> Iterator[Dict]:
+    """Stream employee records from the SQLite employee store"""
+    conn = sqlite3.connect(f"file:{store_path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        cursor = conn.execute("SELECT * FROM employees ORDER BY rowid")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                record = {key: row[key] for key in row.keys() if key not in ("extra", "version")}
+                for field in EMPLOYEE_JSON_FIELDS:
+                    record[field] = json.loads(record[field]) if record.get(field) else None
+                if row["extra"]:
+                    record.update(json.loads(row["extra"]))
+                yield record
+    finally:
+        conn.close()
+
+def _read_journal_by_employee(journal_path: str) -> Dict[str, List[Dict]]:
+    by_employee = {}
+    if not os.path.exists(journal_path):
+        return by_employee
+    with open(journal_path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if entry.get("op") in ("progress", "progress_reset"):
+                by_employee.setdefault(entry["employee_id"], []).append(entry)
+    return by_employee
+
+def _apply_progress_entries(progress: Optional[Dict], entries: List[Dict]) -> Optional[Dict]:
+    for entry in entries:
+        if entry["op"] == "progress_reset":
+            progress = entry["progress"]
+        else:
+            progress = dict(progress or {})
+            if entry["status"] is None:
+                progress.pop(entry["course_id"], None)
+            else:
+                progress[entry["course_id"]] = entry["status"]
+    return progress
+
+def iter_snapshot_section(snapshot_path: str, section: str) -> Iterator[Tuple[str, object]]:
+    """
+    Stream (key, value) from one top-level object of the legacy single-file snapshot, parsing one
+    entry at a time from a memory-mapped scan, so memory stays bounded by the largest entry
+    rather than the whole file. Same state machine as the app's SnapshotOffsetIndex.scan; keep
+    the two in step.
+    """
+    if os.path.getsize(snapshot_path) == 0:
+        return
+    with open(snapshot_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        depth = 0
+        in_string = False
+        skip_until = -1
+        string_start = None
+        last_string = None
+        in_section = False
+        current_key = None
+        value_start = None
+        for match in SNAPSHOT_TOKEN_PATTERN.finditer(mm):
+            pos = match.start()
+            if pos < skip_until:
+                continue
+            token = match.group()
+            if in_string:
+                if token == b'\\':
+                    skip_until = pos + 2  # Skip the escaped character
+                elif token == b'"':
+                    in_string = False
+                    if depth <= 2:
+                        last_string = (string_start, pos)
+                continue
+            if token == b'"':
+                in_string = True
+                string_start = pos + 1
+            elif token in (b'{', b'['):
+                depth += 1
+            elif token in (b'}', b']'):
+                if depth == 2 and in_section:
+                    if current_key is not None:
+                        yield current_key, json.loads(mm[value_start:pos])
+                    return  # The section is closed
+                depth -= 1
+            elif token == b':' and last_string is not None:
+                # Only section names and entry keys are decoded; deeper keys are never used
+                if depth == 1:
+                    in_section = json.loads(b'"' + mm[last_string[0]:last_string[1]] + b'"') == section
+                elif depth == 2 and in_section:
+                    current_key = json.loads(b'"' + mm[last_string[0]:last_string[1]] + b'"')
+                    value_start = pos + 1
+            elif token == b',' and depth == 2 and current_key is not None:
+                yield current_key, json.loads(mm[value_start:pos])
+                current_key = None
+
+def iter_saved_progress(snapshot_path: str) -> Iterator[Tuple[str, Dict]]:
+    """
+    Stream (employee_id, progress) from the progress shards one file at a time, with journal
+    entries saved since the last compaction applied. Like the app, the shards are only trusted
+    once their completion marker exists (or no legacy snapshot is left to prefer); otherwise
+    the legacy snapshot is streamed entry by entry.
+    """
+    journal_entries = _read_journal_by_employee(f"{snapshot_path}.journal")
+    shard_dir = f"{os.path.splitext(snapshot_path)[0]}_shards"
+    shards_complete = os.path.exists(os.path.join(shard_dir, SHARD_COMPLETE_MARKER))
+    if shards_complete or not os.path.exists(snapshot_path):
+        for name in sorted(os.listdir(shard_dir)) if os.path.isdir(shard_dir) else []:
+            if not name.endswith(".json"):
+                continue
+            employee_id = unquote_plus(name[:-len(".json")])
+            with open(os.path.join(shard_dir, name), 'r', encoding='utf-8') as f:
+                progress = json.load(f).get("progress")
+            progress = _apply_progress_entries(progress, journal_entries.pop(employee_id, []))
+            if progress:
+                yield employee_id, progress
+    else:
+        # The legacy snapshot is migrated to shards by the app's first save
+        for employee_id, progress in iter_snapshot_section(snapshot_path, "learning_path_progress"):
+            progress = _apply_progress_entries(progress, journal_entries.pop(employee_id, []))
+            if progress:
+                yield employee_id, progress
+    # Employees whose only saved progress is still in the journal
+    for employee_id, entries in journal_entries.items():
+        progress = _apply_progress_entries(None, entries)
+        if progress:
+            yield employee_id, progress
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export learning paths and progress as normalized CSV/Parquet tables")
+    parser.add_argument("--store", default=os.environ.get("EMPLOYEE_STORE_PATH", "employee_store.db"),
+                        help="SQLite employee store (default: %(default)s)")
+    parser.add_argument("--snapshot", default="learning_paths_data.json",
+                        help="Saved learning paths file; its shards and journal are read too (default: %(default)s)")
+    parser.add_argument("--out", default="exports", help="Output directory (default: %(default)s)")
+    parser.add_argument("--format", choices=sorted(TABLE_WRITERS), default="csv")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.store):
+        parser.error(f"employee store not found: {args.store}")
+
+    started = time.perf_counter()
+    try:
+        row_counts = export_learning_data(
+            iter_store_employees(args.store),
+            iter_saved_progress(args.snapshot),
+            args.out,
+            file_format=args.format,
+            chunk_size=args.chunk_size
+        )
+    except RuntimeError as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - started
+    for table, count in row_counts.items():
+        print(f"{table}: {count:,} rows")
+    print(f"Exported to {args.out} in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
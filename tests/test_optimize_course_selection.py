@@ -0,0 +1,106 @@
+"""
+Tests for optimize_course_selection.
+
+Importing app2606 runs the Streamlit app, so the solver and its constants are compiled
+on their own from the module source.
+"""
+import ast
+import itertools
+import os
+import random
+import time
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app2606.py")
+SOLVER_NAMES = {"LOCAL_PLANNER_MAX_COURSES", "COURSE_SELECTION_TIME_LIMIT", "optimize_course_selection"}
+
+
+def load_solver():
+    with open(APP_PATH, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    nodes = [
+        node for node in tree.body
+        if (isinstance(node, ast.FunctionDef) and node.name in SOLVER_NAMES)
+        or (isinstance(node, ast.Assign) and isinstance(node.targets[0], ast.Name) and node.targets[0].id in SOLVER_NAMES)
+    ]
+    namespace = {"np": np, "pd": pd, "time": time, "List": List, "Optional": Optional}
+    exec(compile(ast.Module(nodes, []), APP_PATH, "exec"), namespace)
+    return namespace
+
+
+SOLVER = load_solver()
+optimize_course_selection = SOLVER["optimize_course_selection"]
+
+
+def coverage_value(selection, covers, gap_weights):
+    mask = 0
+    for i in selection:
+        mask |= covers[i]
+    return sum(weight for gap, weight in enumerate(gap_weights) if mask >> gap & 1)
+
+
+def random_catalog(rng, course_count, gap_count):
+    covers = []
+    for _ in range(course_count):
+        mask = 0
+        for _ in range(rng.randint(1, 3)):
+            mask |= 1 << rng.randrange(gap_count)
+        covers.append(mask)
+    weeks = [rng.choice([0.25, 1, 2, 3, 4, 6, 8, 12]) for _ in range(course_count)]
+    costs = [rng.choice([0, 49, 99, 199, 499, 999]) for _ in range(course_count)]
+    gap_weights = [rng.choice([1, 2, 3, 6, 9]) for _ in range(gap_count)]
+    return covers, weeks, costs, gap_weights
+
+
+def test_matches_brute_force_on_small_catalogs():
+    rng = random.Random(1)
+    for _ in range(200):
+        gap_count, course_count = rng.randint(3, 8), rng.randint(5, 12)
+        covers = [rng.randint(1, 2 ** gap_count - 1) & rng.randint(0, 2 ** gap_count - 1) for _ in range(course_count)]
+        weeks = [rng.choice([1, 2, 3, 4, 6, 8]) for _ in range(course_count)]
+        costs = [rng.choice([0, 100, 300, 500]) for _ in range(course_count)]
+        gap_weights = [rng.choice([1, 2, 3, 6, 9]) for _ in range(gap_count)]
+        max_weeks, max_cost, max_courses = rng.choice([0, 6, 10]), rng.choice([0, 500]), rng.choice([2, 3, 6])
+
+        selection = optimize_course_selection(covers, weeks, costs, gap_weights, max_weeks, max_cost, max_courses,
+                                              time_limit=5)
+
+        assert len(selection) <= max_courses
+        assert not max_weeks or sum(weeks[i] for i in selection) <= max_weeks
+        assert not max_cost or sum(costs[i] for i in selection) <= max_cost
+        best = max(
+            coverage_value(combination, covers, gap_weights)
+            for size in range(max_courses + 1)
+            for combination in itertools.combinations(range(course_count), size)
+            if (not max_weeks or sum(weeks[i] for i in combination) <= max_weeks)
+            and (not max_cost or sum(costs[i] for i in combination) <= max_cost)
+        )
+        assert coverage_value(selection, covers, gap_weights) == best
+
+
+def test_large_catalogs_stay_within_time_limit_and_are_never_empty():
+    rng = random.Random(2)
+    for gap_count in (10, 20, 40, 70):
+        covers, weeks, costs, gap_weights = random_catalog(rng, 5000, gap_count)
+        optimize_course_selection(covers, weeks, costs, gap_weights, 12, 1000)  # Warm up NumPy and pandas
+        for max_weeks, max_cost in ((12, 1000), (0, 0)):
+            started = time.perf_counter()
+            selection = optimize_course_selection(covers, weeks, costs, gap_weights, max_weeks, max_cost)
+            elapsed = time.perf_counter() - started
+
+            assert elapsed < 0.05
+            assert selection
+            assert coverage_value(selection, covers, gap_weights) > 0
+
+
+def test_stops_once_every_coverable_gap_is_covered():
+    covers, weeks, costs, gap_weights = random_catalog(random.Random(3), 1000, 10)
+    started = time.perf_counter()
+    selection = optimize_course_selection(covers, weeks, costs, gap_weights, time_limit=5)
+    elapsed = time.perf_counter() - started
+
+    assert coverage_value(selection, covers, gap_weights) == sum(gap_weights)
+    assert elapsed < 0.05